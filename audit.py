@@ -0,0 +1,119 @@
+import argparse
+import getpass
+import os
+import time
+from collections import Counter
+from itertools import islice
+
+from profiling import add_profile_arguments, run_entry_point
+from result_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, ResultCache
+from strength_record import ResultWriter, issue_labels
+from wordlist_io import WordlistStream
+
+# Environment variable holding the secret of a persisted result cache
+CACHE_SECRET_VARIABLE = "AK_CACHE_SECRET"
+
+# Passwords whose features are extracted together (vectorized when NumPy is installed)
+FEATURE_CHUNK_SIZE = 10000
+
+
+def read_passwords(path):
+    """Yield the passwords of a file, one per line (compressed files work too)."""
+    with WordlistStream(path) as f:
+        for line in f:
+            password = line.rstrip('\r')
+            if password:
+                yield password
+
+
+def run_audit(checker, passwords, check_breaches=False, short_circuit=True, writer=None,
+              chunk_size=FEATURE_CHUNK_SIZE):
+    """
+    Check many passwords as compact records (check_strength_record). Features are
+    extracted chunk_size passwords at a time with batch_password_features. Returns
+    summary counts; each record is also streamed to writer (a ResultWriter), if given.
+    """
+    summary = {'passwords': 0, 'strong': 0, 'weak': 0, 'issues': Counter(), 'seconds': 0.0}
+    issue_masks = Counter()
+    start_time = time.time()
+    passwords = iter(passwords)
+    while True:
+        chunk = list(islice(passwords, chunk_size))
+        if not chunk:
+            break
+        columns = next(checker.batch_password_features(chunk, chunk_size))
+        for position, password in enumerate(chunk):
+            features = {name: column[position] for name, column in columns.items()}
+            record = checker.check_strength_record(password, check_breaches=check_breaches,
+                                                   short_circuit=short_circuit, features=features)
+            summary['passwords'] += 1
+            summary['strong' if record.is_strong else 'weak'] += 1
+            issue_masks[record.issues] += 1
+            if writer is not None:
+                writer.write(record)
+    for issues, count in issue_masks.items():
+        for label in issue_labels(issues):
+            summary['issues'][label] += count
+    summary['seconds'] = time.time() - start_time
+    return summary
+
+
+def print_summary(summary, cache=None, top=10):
+    total = summary['passwords']
+    rate = total / summary['seconds'] if summary['seconds'] else 0
+    print(f"✅ Audited {total:,} passwords in {summary['seconds']:.1f}s ({rate:,.0f}/s)")
+    print(f"• Strong: {summary['strong']:,}  Weak: {summary['weak']:,}")
+    if summary['issues']:
+        print("\n Most common issues:")
+        for issue, count in summary['issues'].most_common(top):
+            print(f"   {count:>9,}  {issue}")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"\n• Result cache: {stats['hit_rate']:.1%} hit rate "
+              f"({stats['hits']:,} hits, {stats['misses']:,} misses, {stats['entries']:,} entries)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the strength of every password in a file.")
+    parser.add_argument("password_file", help="One password per line (.gz/.bz2/.xz accepted)")
+    parser.add_argument("--policy", help="YAML or JSON policy file")
+    parser.add_argument("--breaches", action="store_true", help="Also look passwords up in HaveIBeenPwned")
+    parser.add_argument("--full", action="store_true",
+                        help="Run every check, even for passwords that already fail all policies")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Results kept for repeated passwords (0 disables the cache)")
+    parser.add_argument("--persist-cache", action="store_true",
+                        help=f"Keep cached results across runs in {DEFAULT_CACHE_PATH}, keyed by a secret "
+                             f"from ${CACHE_SECRET_VARIABLE} (prompted for if unset)")
+    parser.add_argument("--output", help="Write a compact result record per password to this file, in order "
+                                         "(read it with strength_record.ResultReader)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    from password_checker import PasswordChecker
+    cache = None
+    if args.cache_size and args.persist_cache:
+        secret = os.environ.get(CACHE_SECRET_VARIABLE) or getpass.getpass("Result cache secret: ")
+        try:
+            cache = ResultCache(args.cache_size, DEFAULT_CACHE_PATH, secret=secret)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+    elif args.cache_size:
+        cache = ResultCache(args.cache_size)
+    checker = PasswordChecker(policy_path=args.policy, result_cache=cache)
+    checker.warm_up()
+
+    writer = ResultWriter(args.output, checker.record_context()) if args.output else None
+    try:
+        summary = run_audit(checker, read_passwords(args.password_file), args.breaches, not args.full, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+    if cache is not None:
+        cache.save()
+    print_summary(summary, cache)
+
+
+if __name__ == "__main__":
+    run_entry_point(main)
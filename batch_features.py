@@ -0,0 +1,77 @@
+import re
+import numpy as np
+
+# Vectorized version of PasswordChecker.password_features for batch audits.
+# A chunk of passwords is packed into a fixed-width uint32 code point matrix and every
+# feature is computed for the whole chunk with array operations.
+
+
+def pack_passwords(passwords):
+    """Pack passwords into an (n, width) uint32 array of code points, zero padded."""
+    width = max((len(password) for password in passwords), default=0) or 1
+    return np.array(passwords, dtype=f'U{width}').view(np.uint32).reshape(len(passwords), width)
+
+
+def extract_features(passwords, required_chars):
+    """
+    Compute length, required character types, most repeated character and its count,
+    longest run and Shannon entropy for a chunk of passwords.
+    Returns a dict of lists with the same values password_features gives per password.
+    """
+    passwords = list(passwords)
+    n = len(passwords)
+    if not n:
+        return {}
+
+    codes = pack_passwords(passwords)
+    width = codes.shape[1]
+    valid = codes != 0
+    lengths = valid.sum(axis=1)
+
+    # Map code points to a compact symbol alphabet for this chunk; symbol 0 is padding
+    symbols, inverse = np.unique(codes, return_inverse=True)
+    inverse = inverse.reshape(n, width)
+    symbol_count = len(symbols)
+    rows = np.repeat(np.arange(n), width)
+    counts = np.bincount(rows * symbol_count + inverse.ravel(),
+                         minlength=n * symbol_count).reshape(n, symbol_count)
+    if symbols[0] == 0:
+        counts[:, 0] = 0
+
+    features = {'length': lengths.tolist()}
+
+    # Character classes: evaluate each pattern once per distinct symbol, then count
+    # each password's symbols in every class with one matrix product
+    present = counts > 0
+    class_matrix = np.array([[bool(code) and re.search(pattern, chr(code)) is not None
+                              for pattern in required_chars.values()]
+                             for code in symbols.tolist()], dtype=np.int32)
+    in_classes = present.astype(np.int32) @ class_matrix
+    for column, char_type in enumerate(required_chars):
+        features[char_type] = (in_classes[:, column] > 0).tolist()
+
+    # Most repeated character; ties go to the character seen first, as with Counter
+    max_counts = counts.max(axis=1)
+    count_at_position = np.take_along_axis(counts, inverse, axis=1)
+    first_max = np.argmax((count_at_position == max_counts[:, None]) & valid, axis=1)
+    most_common = codes[np.arange(n), first_max]
+    features['most_common_char'] = [chr(code) if code else '' for code in most_common.tolist()]
+    features['max_char_count'] = max_counts.tolist()
+
+    # Longest run of one character, one column at a time across the whole chunk
+    run = valid[:, 0].astype(np.int32)
+    max_run = run.copy()
+    for k in range(1, width):
+        same = (codes[:, k] == codes[:, k - 1]) & valid[:, k]
+        run = np.where(same, run + 1, valid[:, k].astype(np.int32))
+        np.maximum(max_run, run, out=max_run)
+    features['max_run'] = max_run.tolist()
+
+    # Shannon entropy from the non-empty histogram bins, summed per password
+    bin_rows, bin_symbols = np.nonzero(counts)
+    probabilities = counts[bin_rows, bin_symbols] / lengths[bin_rows]
+    terms = probabilities * np.log2(probabilities)
+    entropy = -np.bincount(bin_rows, weights=terms, minlength=n) * 100 / 8
+    features['entropy'] = [round(value, 2) if length else 0
+                           for value, length in zip(entropy.tolist(), features['length'])]
+    return features
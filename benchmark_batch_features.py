@@ -0,0 +1,62 @@
+import argparse
+import random
+import string
+import time
+
+from password_checker import PasswordChecker
+
+
+def generate_passwords(count, seed=0):
+    """Generate a mix of random, word-like and repetitive passwords."""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + '!@#$%^&*()-_.?'
+    words = ['password', 'dragon', 'summer', 'monkey', 'letmein', 'qwerty', 'admin', 'sunshine']
+    passwords = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.5:
+            passwords.append(''.join(rng.choice(alphabet) for _ in range(rng.randint(6, 20))))
+        elif kind < 0.9:
+            passwords.append(rng.choice(words).capitalize() + str(rng.randint(0, 9999)) + rng.choice('!@#$'))
+        else:
+            passwords.append(rng.choice(alphabet) * rng.randint(1, 12) + rng.choice(['', 'é', 'ß', '€']))
+    return passwords
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare scalar and vectorized password feature extraction.")
+    parser.add_argument("--count", type=int, default=1_000_000, help="Number of passwords")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Passwords per vectorized chunk")
+    args = parser.parse_args()
+
+    from batch_features import extract_features
+
+    checker = PasswordChecker(wordlist_paths=[])
+    passwords = generate_passwords(args.count)
+    print(f"Generated {len(passwords):,} passwords")
+
+    start_time = time.perf_counter()
+    scalar = [checker.password_features(password) for password in passwords]
+    scalar_time = time.perf_counter() - start_time
+    print(f"Scalar:     {scalar_time:.2f}s ({len(passwords) / scalar_time:,.0f} passwords/s)")
+
+    start_time = time.perf_counter()
+    chunks = []
+    for start in range(0, len(passwords), args.chunk_size):
+        chunks.append(extract_features(passwords[start:start + args.chunk_size], checker.char_classes))
+    vector_time = time.perf_counter() - start_time
+    print(f"Vectorized: {vector_time:.2f}s ({len(passwords) / vector_time:,.0f} passwords/s)")
+    print(f"Speedup:    {scalar_time / vector_time:.1f}x")
+
+    mismatches = 0
+    index = 0
+    for chunk in chunks:
+        for row in range(len(chunk['length'])):
+            if any(chunk[key][row] != scalar[index][key] for key in scalar[index]):
+                mismatches += 1
+            index += 1
+    print(f"Mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+from hydra_integration import HydraIntegration
+
+# First argument that makes this script act as the Hydra stand-in instead of the benchmark
+STAND_IN_ARG = "--stand-in"
+
+# Simulated service, passed to the stand-in through the environment
+CAPACITY_VARIABLE = "AK_STAND_IN_CAPACITY"
+LATENCY_VARIABLE = "AK_STAND_IN_LATENCY"
+PASSWORD_VARIABLE = "AK_STAND_IN_PASSWORD"
+
+# Simulated seconds between the stand-in's [STATUS] lines
+STATUS_INTERVAL = 0.5
+
+
+def stand_in(args):
+    """
+    Local stand-in for Hydra against a service that handles `capacity` connections at
+    once, each try taking `latency` seconds. Tasks beyond the capacity get connection
+    errors ([RE-ATTEMPT] lines) and slow the service down. Prints Hydra's [DATA],
+    [STATUS] and login lines; no network traffic is sent.
+    """
+    if '-h' in args:
+        print("Hydra stand-in (benchmark_hydra_tuning.py)")
+        return 0
+    capacity = int(os.environ.get(CAPACITY_VARIABLE, 16))
+    latency = float(os.environ.get(LATENCY_VARIABLE, 0.01))
+    secret = os.environ.get(PASSWORD_VARIABLE)
+    tasks = int(args[args.index('-t') + 1]) if '-t' in args else 16
+    username = args[args.index('-l') + 1] if '-l' in args else 'admin'
+    with open(args[args.index('-P') + 1], 'r', encoding='latin-1') as f:
+        passwords = f.read().splitlines()
+
+    served = min(tasks, capacity)
+    overload = tasks - served
+    round_time = latency * (1 + overload / capacity)
+    print(f"[DATA] max {tasks} tasks per 1 server, overall {tasks} tasks, {len(passwords)} login tries "
+          f"(l:1/p:{len(passwords)}), ~{len(passwords) // max(tasks, 1) + 1} tries per task", flush=True)
+
+    start_time = time.time()
+    last_status = 0.0
+    done = 0
+    while done < len(passwords):
+        time.sleep(round_time)
+        batch = passwords[done:done + served]
+        done += len(batch)
+        for _ in range(overload):
+            print(f"[RE-ATTEMPT] target 127.0.0.1 - login \"{username}\" - could not connect", flush=True)
+        if secret in batch:
+            print(f"[22][ssh] host: 127.0.0.1   login: {username}   password: {secret}", flush=True)
+            break
+        elapsed = time.time() - start_time
+        if elapsed - last_status >= STATUS_INTERVAL or done >= len(passwords):
+            last_status = elapsed
+            rate = done * 60 / elapsed
+            left = (len(passwords) - done) / rate if rate else 0
+            print(f"[STATUS] {rate:.2f} tries/min, {done} tries in {int(elapsed // 3600):02d}:"
+                  f"{int(elapsed % 3600 // 60):02d}h, {len(passwords) - done} to do in {int(left // 60):02d}:"
+                  f"{int(left % 60):02d}h, {tasks} active", flush=True)
+    print("1 of 1 target completed")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drive run_adaptive_attack against a local Hydra stand-in and report the thread counts it picks.")
+    parser.add_argument("--capacity", type=int, default=16, help="Connections the simulated service handles at once")
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds per try")
+    parser.add_argument("--passwords", type=int, default=20000, help="Pass list size")
+    parser.add_argument("--segment-size", type=int, default=2000, help="Passwords per tuning segment")
+    parser.add_argument("--start-threads", type=int, default=4)
+    parser.add_argument("--max-threads", type=int, default=64)
+    parser.add_argument("--max-error-rate", type=float, default=0.02)
+    parser.add_argument("--find", action="store_true", help="Put the password near the end of the list")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    os.environ[CAPACITY_VARIABLE] = str(args.capacity)
+    os.environ[LATENCY_VARIABLE] = str(args.latency)
+    os.environ[PASSWORD_VARIABLE] = "Benchmark!Secret1"
+    hydra = HydraIntegration()
+    hydra.hydra_command = [sys.executable, os.path.abspath(__file__), STAND_IN_ARG]
+
+    with tempfile.TemporaryDirectory(prefix="ak_tuning_") as work_dir:
+        passlist = os.path.join(work_dir, "passwords.txt")
+        with open(passlist, 'w') as f:
+            for i in range(args.passwords):
+                if args.find and i == args.passwords * 9 // 10:
+                    f.write(os.environ[PASSWORD_VARIABLE] + "\n")
+                f.write(''.join(rng.choice(string.ascii_letters + string.digits) for _ in range(10)) + "\n")
+
+        start_time = time.time()
+        result = hydra.run_adaptive_attack("127.0.0.1", "ssh", username="bench", passlist=passlist,
+                                           start_threads=args.start_threads, max_threads=args.max_threads,
+                                           segment_size=args.segment_size, max_error_rate=args.max_error_rate)
+        elapsed = time.time() - start_time
+
+    if not result['success']:
+        print(f"❌ {result['error']}")
+        return
+    print(f"\n{'Segment':>8} {'Threads':>8} {'Tries/min':>10} {'Errors':>8}")
+    for segment in result['segments']:
+        print(f"{segment['segment']:>8} {segment['threads']:>8} {segment['tries_per_min']:>10,.0f} "
+              f"{segment['error_rate']:>8.1%}")
+    ideal = args.capacity * 60 / args.latency
+    print(f"\n✅ {len(result['segments'])} segment(s) in {elapsed:.1f}s; tuner settled on {result['best_threads']} "
+          f"threads (stand-in capacity {args.capacity}, at most {ideal:,.0f} tries/min)")
+    if hydra.parse_hydra_output(result['stdout']):
+        print("• The stand-in's password was found")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == STAND_IN_ARG:
+        sys.exit(stand_in(sys.argv[2:]))
+    main()
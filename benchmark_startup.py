@@ -0,0 +1,72 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules that must not be imported until a feature that needs them is used
+DEFERRED_MODULES = ["requests", "urllib3", "ssl", "sqlite3", "password_checker",
+                    "hydra_integration", "results_store"]
+
+
+def measure_import(module="main", runs=5):
+    """
+    Import a module in fresh interpreters with -X importtime.
+    Returns (best cumulative import time in microseconds, set of imported module names).
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    imported = set()
+
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=here,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{process.stderr}")
+
+        # Lines look like: "import time:   self [us] | cumulative | imported package"
+        total = 0
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            name = name.strip()
+            imported.add(name)
+            if name == module:
+                total = int(cumulative)
+        best = total if best is None else min(best, total)
+
+    return best, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guard the CLI startup time against regressions.")
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--budget-ms", type=float, default=50.0,
+                        help="Maximum allowed cumulative import time in milliseconds")
+    args = parser.parse_args()
+
+    best, imported = measure_import(args.module, args.runs)
+    print(f"import {args.module}: {best / 1000:.1f} ms (best of {args.runs})")
+
+    failures = []
+    eager = sorted(name for name in DEFERRED_MODULES if name in imported)
+    if eager:
+        failures.append(f"modules imported at startup: {', '.join(eager)}")
+    if best / 1000 > args.budget_ms:
+        failures.append(f"startup exceeds budget of {args.budget_ms:.1f} ms")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
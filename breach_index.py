@@ -0,0 +1,342 @@
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+from profiling import add_profile_arguments, run_entry_point
+from wordlist_io import WordlistStream
+
+MAGIC = b"AKBRCH\x00\x01"
+HEADER = struct.Struct("<8sQII")  # magic, record count, breach count, metadata bytes
+
+DEFAULT_INDEX_PATH = os.path.join(str(Path.home()), ".ak_vault", "breach.idx")
+
+BREACH_FIELDS = ('Title', 'Domain', 'BreachDate')
+
+# Memory an ingest may use for sorting; corpora beyond it are sorted in runs and merged
+DEFAULT_MEMORY_MB = 256
+
+# Bytes one buffered address costs while a run is sorted (key, sort copy, unique copy)
+RECORD_SORT_BYTES = 32
+
+# Separators of "email:password"-style combo lines; only the email is kept
+COMBO_SEPARATORS = (':', ';', ',', '\t', ' ')
+
+
+def normalize_email(email):
+    """
+    Canonical form of an address: trimmed and lowercased. For Gmail, where dots and
+    +tags in the local part are ignored, those are removed as well.
+    """
+    email = email.strip().lower()
+    local, _, domain = email.rpartition('@')
+    if domain == 'googlemail.com':
+        domain = 'gmail.com'
+    if domain == 'gmail.com':
+        local = local.split('+', 1)[0].replace('.', '')
+    return f"{local}@{domain}" if local else email
+
+
+def email_key(email):
+    """64-bit key of a normalized email; the index stores these, not the addresses."""
+    return int.from_bytes(hashlib.blake2b(normalize_email(email).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def read_emails(path):
+    """Yield the email of every line of a corpus (plain email lists or combo lists, compressed or not)."""
+    with WordlistStream(path) as f:
+        for line in f:
+            line = line.strip()
+            for separator in COMBO_SEPARATORS:
+                line = line.split(separator, 1)[0]
+            if '@' in line:
+                yield line
+
+
+def _record_dtype():
+    import numpy as np
+    return np.dtype([('key', '<u8'), ('breach', '<u2')])
+
+
+def build_breach_index(records, breaches, index_path=DEFAULT_INDEX_PATH):
+    """
+    Write an index from (key, breach id) records and the list of breach metadata dicts.
+    Records are sorted and deduplicated. Returns the number of records written.
+    """
+    import numpy as np  # Deferred: only needed to sort the records at build time
+
+    records = np.unique(records)  # sorted by key, then breach id
+    return write_breach_index(np.ascontiguousarray(records['key']), np.ascontiguousarray(records['breach']),
+                              breaches, index_path)
+
+
+def write_breach_index(keys, breach_ids, breaches, index_path=DEFAULT_INDEX_PATH, block=1 << 20):
+    """
+    Write an index from sorted, deduplicated record columns (arrays or memmaps), a block
+    at a time. Returns the number of records written.
+    """
+    import numpy as np
+
+    # Bucket b starts at the first key whose top 16 bits are >= b
+    bounds = np.arange(65536, dtype=np.uint64) << np.uint64(48)
+    buckets = np.append(np.searchsorted(keys, bounds), len(keys)).astype('<u4')
+    metadata = json.dumps(breaches).encode('utf-8')
+
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    temp_path = index_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(keys), len(breaches), len(metadata)))
+        f.write(buckets.tobytes())
+        for column, dtype in ((keys, '<u8'), (breach_ids, '<u2')):
+            for start in range(0, len(column), block):
+                f.write(np.asarray(column[start:start + block], dtype=dtype).tobytes())
+        f.write(metadata)
+    os.replace(temp_path, index_path)
+    return len(keys)
+
+
+class BreachIndex:
+    """
+    Memory-mapped offline index of breach corpora: normalized email hash -> breaches.
+
+    Layout: header, 65537 uint32 buckets (by the top 16 bits of the key), record keys
+    (uint64, sorted), record breach ids (uint16), breach metadata (JSON list of
+    Title/Domain/BreachDate). An address in several breaches has one 10-byte record
+    per breach; the addresses themselves are not stored.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, breach_count, metadata_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a breach index")
+
+        view = memoryview(self._mm)
+        keys_start = HEADER.size + 65537 * 4
+        ids_start = keys_start + self.count * 8
+        metadata_start = ids_start + self.count * 2
+        self._buckets = view[HEADER.size:keys_start].cast('I')
+        self._keys = view[keys_start:ids_start].cast('Q')
+        self._breach_ids = view[ids_start:metadata_start].cast('H')
+        self.breaches = json.loads(bytes(self._mm[metadata_start:metadata_start + metadata_size]))
+
+    def close(self):
+        self._buckets.release()
+        self._keys.release()
+        self._breach_ids.release()
+        self._mm.close()
+
+    def lookup(self, email):
+        """Breaches (dicts with Title, Domain and BreachDate) that include email."""
+        key = email_key(email)
+        lo, hi = self._buckets[key >> 48], self._buckets[(key >> 48) + 1]
+        position = bisect.bisect_left(self._keys, key, lo, hi)
+        found = []
+        while position < hi and self._keys[position] == key:
+            found.append(dict(self.breaches[self._breach_ids[position]]))
+            position += 1
+        return found
+
+    def lookup_many(self, emails):
+        """Map each email to its breaches (an empty list if none)."""
+        return {email: self.lookup(email) for email in emails}
+
+    def columns(self):
+        """The sorted record keys and breach ids, as NumPy arrays over the mapping (no copy)."""
+        import numpy as np
+        return (np.frombuffer(self._keys, dtype=np.uint64), np.frombuffer(self._breach_ids, dtype=np.uint16))
+
+    def records(self):
+        """All (key, breach id) records, as a NumPy structured array."""
+        import numpy as np
+        records = np.empty(self.count, dtype=_record_dtype())
+        records['key'] = self._keys
+        records['breach'] = self._breach_ids
+        return records
+
+
+def _spill_run(keys, breach_ids, run_dir, number):
+    """Write sorted record columns to a run; returns them memory-mapped."""
+    import numpy as np
+    columns = []
+    for column, name in ((keys, 'keys'), (breach_ids, 'ids')):
+        path = os.path.join(run_dir, f"run-{number:06d}.{name}")
+        column.tofile(path)
+        columns.append(np.memmap(path, dtype=column.dtype, mode='r') if len(column) else column)
+    return tuple(columns)
+
+
+def merge_runs(runs, keys_out, ids_out, block):
+    """
+    Merge runs of sorted (keys, breach ids) columns into two open files, dropping
+    duplicate records. Each round takes up to block records of every run, up to the
+    smallest last record among them, so memory stays at about block records per run.
+    Returns the number of records written.
+    """
+    import numpy as np
+    positions = [0] * len(runs)
+    written = 0
+    while True:
+        active = [i for i, (keys, _) in enumerate(runs) if positions[i] < len(keys)]
+        if not active:
+            return written
+        ends = {i: min(positions[i] + block, len(runs[i][0])) for i in active}
+        # Records up to the threshold are complete in this round: no run has smaller ones left
+        threshold = min(((int(runs[i][0][ends[i] - 1]), int(runs[i][1][ends[i] - 1]))
+                         for i in active if ends[i] < len(runs[i][0])), default=None)
+        key_parts, id_parts = [], []
+        for i in active:
+            keys, breach_ids = runs[i]
+            start, end = positions[i], ends[i]
+            if threshold is not None:
+                window = keys[start:end]
+                lo = start + int(np.searchsorted(window, threshold[0], 'left'))
+                hi = start + int(np.searchsorted(window, threshold[0], 'right'))
+                end = lo + int(np.searchsorted(breach_ids[lo:hi], threshold[1], 'right'))
+            key_parts.append(keys[start:end])
+            id_parts.append(breach_ids[start:end])
+            positions[i] = end
+        keys, breach_ids = np.concatenate(key_parts), np.concatenate(id_parts)
+        order = np.lexsort((breach_ids, keys))
+        keys, breach_ids = keys[order], breach_ids[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = (keys[1:] != keys[:-1]) | (breach_ids[1:] != breach_ids[:-1])
+        keys[keep].tofile(keys_out)
+        breach_ids[keep].tofile(ids_out)
+        written += int(keep.sum())
+
+
+def ingest_corpus(corpus_paths, breach, index_path=DEFAULT_INDEX_PATH, memory_mb=DEFAULT_MEMORY_MB,
+                  temp_dir=None):
+    """
+    Add the addresses of breach corpora to the index under one breach (a dict with
+    Title, Domain and BreachDate); the existing index is merged in. Like
+    wordlist_merge.ExternalMerger, addresses are sorted in runs that fit in memory_mb,
+    spilled to temp_dir and merged, so corpora of any size can be ingested.
+    Returns stats.
+    """
+    import numpy as np
+
+    start_time = time.time()
+    chunk_records = max(1024, memory_mb * 1024 * 1024 // RECORD_SORT_BYTES)
+    existing, breaches = None, []
+    if os.path.exists(index_path):
+        existing = BreachIndex(index_path)
+        breaches = list(existing.breaches)
+    breach = {field: breach.get(field) for field in BREACH_FIELDS}
+    if breach in breaches:
+        breach_id = breaches.index(breach)
+    else:
+        if len(breaches) >= 65535:
+            raise ValueError("A breach index holds at most 65535 breaches")
+        breaches.append(breach)
+        breach_id = len(breaches) - 1
+
+    emails = 0
+    runs = []
+    run_dir = tempfile.mkdtemp(prefix="ak_breach_", dir=temp_dir)
+    try:
+        if existing is not None:
+            runs.append(existing.columns())  # already sorted and deduplicated
+        for corpus_path in corpus_paths:
+            keys_read = (email_key(email) for email in read_emails(corpus_path))
+            while True:
+                keys = np.fromiter(islice(keys_read, chunk_records), dtype=np.uint64)
+                if not len(keys):
+                    break
+                emails += len(keys)
+                keys = np.unique(keys)
+                runs.append(_spill_run(keys, np.full(len(keys), breach_id, dtype=np.uint16), run_dir, len(runs)))
+
+        merged_keys = os.path.join(run_dir, "merged.keys")
+        merged_ids = os.path.join(run_dir, "merged.ids")
+        with open(merged_keys, 'wb') as keys_out, open(merged_ids, 'wb') as ids_out:
+            count = merge_runs(runs, keys_out, ids_out, max(1024, chunk_records // (2 * max(len(runs), 1))))
+        keys = np.memmap(merged_keys, dtype=np.uint64, mode='r') if count else np.empty(0, dtype=np.uint64)
+        breach_ids = np.memmap(merged_ids, dtype=np.uint16, mode='r') if count else np.empty(0, dtype=np.uint16)
+        written = write_breach_index(keys, breach_ids, breaches, index_path)
+        del keys, breach_ids
+    finally:
+        runs.clear()  # the existing index's arrays must go before its mapping is closed
+        if existing is not None:
+            existing.close()
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return {'emails': emails, 'records': written, 'breaches': len(breaches),
+            'bytes': os.path.getsize(index_path), 'seconds': time.time() - start_time}
+
+
+def print_breaches(email, breaches):
+    """Print lookup results the way the online check does."""
+    if breaches:
+        print(f"Breaches found for {email}:")
+        for breach in breaches:
+            print(f"Title: {breach['Title']}, Domain: {breach['Domain']}, Breach Date: {breach['BreachDate']}")
+    else:
+        print(f"No breaches found for {email}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query an offline email breach index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest = subparsers.add_parser("ingest", help="Add a breach corpus (emails or email:... combo lines)")
+    ingest.add_argument("corpora", nargs="+", help="Corpus files (.txt, .csv, .gz, .bz2, .xz)")
+    ingest.add_argument("--title", required=True, help="Breach title")
+    ingest.add_argument("--domain", default="", help="Breached domain")
+    ingest.add_argument("--date", default="", help="Breach date (YYYY-MM-DD)")
+    ingest.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB,
+                        help="Memory for sorting; larger corpora are sorted in runs and merged")
+    ingest.add_argument("--temp-dir", help="Where sorted runs are spilled (default: system temp)")
+    query = subparsers.add_parser("query", help="Look up addresses")
+    query.add_argument("emails", nargs="*", help="Addresses to look up")
+    query.add_argument("--file", help="File with one address per line")
+    subparsers.add_parser("stats", help="Show what the index holds")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Index file")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        stats = ingest_corpus(args.corpora, {'Title': args.title, 'Domain': args.domain,
+                                             'BreachDate': args.date}, args.index,
+                              args.memory_mb, args.temp_dir)
+        print(f"✅ Ingested {stats['emails']:,} addresses in {stats['seconds']:.1f}s")
+        print(f"• {stats['records']:,} records, {stats['breaches']} breach(es), "
+              f"{stats['bytes'] / (1024 * 1024):.1f} MB -> {args.index}")
+        return
+
+    if not os.path.exists(args.index):
+        print(f"❌ No breach index at {args.index}, ingest a corpus first")
+        return
+    index = BreachIndex(args.index)
+
+    if args.command == "stats":
+        print(f"Records: {index.count:,} ({os.path.getsize(args.index) / (1024 * 1024):.1f} MB)")
+        for breach in index.breaches:
+            print(f"  • {breach['Title']} ({breach['Domain'] or 'n/a'}, {breach['BreachDate'] or 'n/a'})")
+        return
+
+    emails = list(args.emails)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8', errors='ignore') as f:
+            emails.extend(line.strip() for line in f if line.strip())
+    start_time = time.perf_counter()
+    results = index.lookup_many(emails)
+    elapsed = time.perf_counter() - start_time
+    for email, breaches in results.items():
+        print_breaches(email, breaches)
+    if len(emails) > 1:
+        print(f"• {len(emails):,} lookups in {elapsed:.2f}s, {sum(1 for b in results.values() if b):,} breached")
+
+
+if __name__ == "__main__":
+    run_entry_point(main)
@@ -1,22 +1,56 @@
-import requests
+def _lookup_online(email, verbose):
+    import requests  # Deferred: requests/urllib3/ssl are slow to import
 
-def check_email_breach(email):
-    """Check if the email is in a known breach using HackCheck API."""
     url = f"https://hackcheck.woventeams.com/api/v4/breachedaccount/{email}"
-    response = requests.get(url)
+    response = requests.get(url, timeout=10)
 
     if response.status_code == 200:
         breaches = response.json()
-        if breaches:
-            print(f"Breaches found for {email}:")
-            for breach in breaches:
-                print(f"Title: {breach['Title']}, Domain: {breach['Domain']}, Breach Date: {breach['BreachDate']}")
-        else:
-            print(f"No breaches found for {email}.")
+        if verbose:
+            if breaches:
+                print(f"Breaches found for {email}:")
+                for breach in breaches:
+                    print(f"Title: {breach['Title']}, Domain: {breach['Domain']}, Breach Date: {breach['BreachDate']}")
+            else:
+                print(f"No breaches found for {email}.")
+        status = 'breached' if breaches else 'clean'
     elif response.status_code == 404:
-        print(f"The email {email} has not been involved in any breaches.")
+        if verbose:
+            print(f"The email {email} has not been involved in any breaches.")
+        breaches, status = [], 'clean'
     else:
-        print(f"Error: {response.status_code}")
+        if verbose:
+            print(f"Error: {response.status_code}")
+        breaches, status = [], f"error {response.status_code}"
+    return status, breaches
+
+
+def check_email_breach(email, results_store=None, verbose=True, breach_index=None):
+    """
+    Check if the email is in a known breach using HackCheck API, or offline in a
+    BreachIndex (ingested breach corpora) if one is given.
+    Returns {'status': 'breached' | 'clean' | 'error N', 'breaches': [...],
+    'source': 'offline' | 'online'}. An offline answer only covers the ingested corpora.
+    """
+    if breach_index is not None:
+        breaches = breach_index.lookup(email)
+        if verbose:
+            from breach_index import print_breaches
+            print(f"(Offline: answered from the local breach index {breach_index.path}, "
+                  f"which only holds the corpora ingested into it)")
+            print_breaches(email, breaches)
+        status = 'breached' if breaches else 'clean'
+        source = 'offline'
+    else:
+        status, breaches = _lookup_online(email, verbose)
+        source = 'online'
+
+    breaches = [{key: breach.get(key) for key in ('Title', 'Domain', 'BreachDate')} for breach in breaches]
+    if results_store:
+        results_store.record_breach_lookup(email, status, breaches)
+        results_store.flush()
+    return {'status': status, 'breaches': breaches, 'source': source}
+
 
 if __name__ == "__main__":
     email = input("Enter email to check: ")
@@ -0,0 +1,322 @@
+import argparse
+import bisect
+import json
+import mmap
+import os
+import random
+import struct
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+from profiling import add_profile_arguments, run_entry_point
+from rank_dictionary import MAX_WORD_LENGTH
+from wordlist_io import WordlistStream, available_wordlists
+
+MAGIC = b"AKFUZZ\x00\x02"
+HEADER = struct.Struct("<8sIIIII")  # magic, max distance, word count, entry count, longest word, sources bytes
+
+# Version 1 files have no source list; they are still read, with unknown sources
+MAGIC_V1 = b"AKFUZZ\x00\x01"
+HEADER_V1 = struct.Struct("<8sIIII")
+
+DEFAULT_INDEX_PATH = os.path.join(str(Path.home()), ".ak_vault", "fuzzy.idx")
+DEFAULT_MAX_WORDS = 500000
+DEFAULT_DISTANCE = 2
+
+# Shorter words are within two edits of far too much to be a useful near match;
+# longer ones would blow up the number of deletes stored per word
+MIN_LENGTH = 5
+MAX_LENGTH = 24
+
+
+def deletes(word, distance):
+    """Every string obtained by deleting up to distance characters from word (word included)."""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions)
+    between a and b, or limit + 1 as soon as it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # A shared prefix and suffix do not change the distance; near matches have little left
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return len(a) + len(b)
+
+    # Only cells within limit of the diagonal can stay within limit; the rest count as too far
+    too_far = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [i if i <= limit else too_far] + [too_far] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return too_far
+        previous2, previous = previous, current
+    return min(previous[-1], too_far)
+
+
+def wordlist_sources(wordlist_paths):
+    """Absolute path, size and mtime of each available wordlist, as stored in an index."""
+    sources = []
+    for wordlist_path in available_wordlists(wordlist_paths):
+        stat = os.stat(wordlist_path)
+        sources.append({'path': os.path.abspath(wordlist_path), 'size': stat.st_size, 'mtime': stat.st_mtime})
+    return sources
+
+
+def top_words(wordlist_paths, max_words=DEFAULT_MAX_WORDS):
+    """
+    The max_words most common distinct words of the wordlists, lowercased, with their
+    best rank (ranked like rank tables). Only the head of each list is read.
+    Returns (words as latin-1 bytes in rank order, ranks).
+    """
+    best = {}
+    for wordlist_path in available_wordlists(wordlist_paths):
+        seen = 0
+        rank = 0
+        with WordlistStream(wordlist_path) as f:
+            for line in f:
+                word = line.strip().lower()
+                if not word or len(word) > MAX_WORD_LENGTH:
+                    continue
+                rank += 1
+                if not MIN_LENGTH <= len(word) <= MAX_LENGTH:
+                    continue
+                known = best.get(word)
+                if known is None:
+                    best[word] = rank
+                    seen += 1
+                    if seen >= max_words:
+                        break
+                elif rank < known:
+                    best[word] = rank
+    ranked = sorted(best.items(), key=lambda item: item[1])[:max_words]
+    return [word.encode('latin-1') for word, _ in ranked], [rank for _, rank in ranked]
+
+
+def build_fuzzy_index(wordlist_paths, index_path=DEFAULT_INDEX_PATH, distance=DEFAULT_DISTANCE,
+                      max_words=DEFAULT_MAX_WORDS):
+    """
+    Build a symmetric-delete (SymSpell-style) index over the most common words of the
+    wordlists. Every word is stored under the CRC32 of each of its deletes up to
+    distance; a query looks up its own deletes and verifies the candidates. The
+    wordlists' paths, sizes and mtimes are stored too (FuzzyIndex.covers).
+    Returns build stats.
+    """
+    import numpy as np  # Deferred: only needed to sort the entries at build time
+
+    start_time = time.time()
+    sources = json.dumps(wordlist_sources(wordlist_paths)).encode('utf-8')
+    words, ranks = top_words(wordlist_paths, max_words)
+    keys = array('Q')
+    for index, word in enumerate(words):
+        keys.extend((zlib.crc32(variant) << 32) | index for variant in deletes(word, distance))
+    entries = np.frombuffer(keys, dtype=np.uint64)
+    entries.sort()
+    hashes = (entries >> np.uint64(32)).astype(np.uint32)
+    word_ids = (entries & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    del entries, keys
+
+    # Where the hashes with each top 16 bits begin, as in the rank table prefix buckets
+    buckets = np.searchsorted(hashes >> np.uint32(16), np.arange(65537, dtype=np.uint32)).astype(np.uint32)
+    offsets = np.zeros(len(words) + 1, dtype=np.uint32)
+    np.cumsum([len(word) for word in words], out=offsets[1:])
+
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    temp_path = index_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, distance, len(words), len(hashes), max((len(w) for w in words), default=0),
+                            len(sources)))
+        f.write(buckets.tobytes())
+        f.write(hashes.tobytes())
+        f.write(word_ids.tobytes())
+        f.write(offsets.tobytes())
+        f.write(struct.pack(f"<{len(ranks)}I", *ranks))
+        f.write(b''.join(words))
+        f.write(sources)
+    os.replace(temp_path, index_path)
+    return {'words': len(words), 'entries': len(hashes), 'distance': distance,
+            'bytes': os.path.getsize(index_path), 'seconds': time.time() - start_time}
+
+
+class FuzzyIndex:
+    """
+    Memory-mapped symmetric-delete index for near matches against wordlists.
+
+    Layout: header, 65537 uint32 hash buckets, entry hashes and word ids (count uint32
+    each, sorted by hash), (words + 1) uint32 word offsets, words uint32 ranks, word bytes,
+    then the JSON list of source wordlists. Words are stored in rank order, lowercased
+    and latin-1 encoded.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic = self._mm[:len(MAGIC)]
+        if magic == MAGIC:
+            _, self.distance, self.count, self.entries, self.max_length, sources_size = HEADER.unpack_from(self._mm, 0)
+            position = HEADER.size
+        elif magic == MAGIC_V1:
+            _, self.distance, self.count, self.entries, self.max_length = HEADER_V1.unpack_from(self._mm, 0)
+            sources_size = None
+            position = HEADER_V1.size
+        else:
+            self._mm.close()
+            raise ValueError(f"{path} is not a fuzzy index")
+
+        view = memoryview(self._mm)
+        sections = []
+        for length in (65537, self.entries, self.entries, self.count + 1, self.count):
+            sections.append(view[position:position + length * 4].cast('I'))
+            position += length * 4
+        self._buckets, self._hashes, self._word_ids, self._offsets, self._ranks = sections
+        self._blob_start = position
+        # The wordlists the index was built from (None: unknown, built by an older version)
+        self.sources = None
+        if sources_size is not None:
+            sources_start = position + self._offsets[self.count]
+            self.sources = json.loads(bytes(self._mm[sources_start:sources_start + sources_size]))
+
+    def covers(self, wordlist_paths):
+        """Whether the index was built from exactly these wordlists, unchanged since."""
+        if self.sources is None:
+            return False
+        key = lambda source: (source['path'], source['size'], source['mtime'])
+        return sorted(map(key, self.sources)) == sorted(map(key, wordlist_sources(wordlist_paths)))
+
+    def close(self):
+        for section in (self._buckets, self._hashes, self._word_ids, self._offsets, self._ranks):
+            section.release()
+        self._mm.close()
+
+    def _word(self, index):
+        return self._mm[self._blob_start + self._offsets[index]:self._blob_start + self._offsets[index + 1]]
+
+    def _candidates(self, key):
+        """Ids of the words that have a delete hashing like key."""
+        hashes, word_ids = self._hashes, self._word_ids
+        code = zlib.crc32(key)
+        lo, hi = self._buckets[code >> 16], self._buckets[(code >> 16) + 1]
+        position = bisect.bisect_left(hashes, code, lo, hi)
+        while position < hi and hashes[position] == code:
+            yield word_ids[position]
+            position += 1
+
+    def lookup(self, word, max_distance=None, limit=5):
+        """
+        Known words within max_distance edits (default and at most: the index's distance)
+        of word, compared lowercased. Returns up to limit dicts with 'word',
+        'distance' and 'rank', closest first, then most common.
+        """
+        try:
+            key = word.lower().encode('latin-1')
+        except UnicodeEncodeError:
+            return []
+        distance = self.distance if max_distance is None else min(max_distance, self.distance)
+        if len(key) < MIN_LENGTH or not self.count:
+            return []
+
+        offsets = self._offsets
+        checked = set()
+        matches = []
+        for variant in deletes(key, distance):
+            for index in self._candidates(variant):
+                if index in checked:
+                    continue
+                checked.add(index)
+                if abs(offsets[index + 1] - offsets[index] - len(key)) > distance:
+                    continue
+                candidate = self._word(index)
+                found = edit_distance(key, candidate, distance)
+                if found <= distance:
+                    matches.append((found, self._ranks[index], candidate.decode('latin-1')))
+        matches.sort()
+        return [{'word': w, 'distance': d, 'rank': r} for d, r, w in matches[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query a fuzzy (edit distance) wordlist index.")
+    parser.add_argument("command", choices=["build", "query", "bench"])
+    parser.add_argument("args", nargs="*",
+                        help="build: wordlists (default: the password checker's); query: passwords")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Index file")
+    parser.add_argument("--distance", type=int, default=DEFAULT_DISTANCE, help="Edits covered by the index")
+    parser.add_argument("--max-words", type=int, default=DEFAULT_MAX_WORDS,
+                        help="Most common words indexed across the wordlists")
+    parser.add_argument("--lookups", type=int, default=10000, help="Lookups for bench")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        wordlists = args.args
+        if not wordlists:
+            from password_checker import PasswordChecker
+            wordlists = PasswordChecker().wordlist_paths
+        if not available_wordlists(wordlists):
+            print("❌ No wordlists found!")
+            return
+        stats = build_fuzzy_index(wordlists, args.index, args.distance, args.max_words)
+        print(f"✅ Indexed {stats['words']:,} words within {stats['distance']} edit(s) in {stats['seconds']:.1f}s")
+        print(f"• {stats['entries']:,} deletes ({stats['entries'] / max(stats['words'], 1):.1f} per word), "
+              f"{stats['bytes'] / (1024 * 1024):.1f} MB -> {args.index}")
+        return
+
+    if not os.path.exists(args.index):
+        print(f"❌ No fuzzy index at {args.index}, run build first")
+        return
+    index = FuzzyIndex(args.index)
+
+    if args.command == "query":
+        for password in args.args:
+            start_time = time.perf_counter()
+            matches = index.lookup(password)
+            elapsed = (time.perf_counter() - start_time) * 1000
+            if matches:
+                found = ", ".join(f"{m['word']} ({m['distance']} edit(s), rank {m['rank']:,})" for m in matches)
+                print(f"⚠️  {password}: {found} [{elapsed:.2f} ms]")
+            else:
+                print(f"✅ {password}: no known password within {index.distance} edit(s) [{elapsed:.2f} ms]")
+
+    elif args.command == "bench":
+        rng = random.Random(0)
+        alphabet = "abcdefghijklmnopqrstuvwxyz0123456789!"
+        queries = []
+        for _ in range(args.lookups):
+            word = bytearray(index._word(rng.randrange(index.count))) if index.count else bytearray(b"password")
+            for _ in range(rng.randint(0, index.distance)):
+                word[rng.randrange(len(word))] = ord(rng.choice(alphabet))
+            queries.append(word.decode('latin-1'))
+        start_time = time.perf_counter()
+        hits = sum(1 for query in queries if index.lookup(query))
+        elapsed = time.perf_counter() - start_time
+        print(f"✅ {len(queries):,} lookups in {elapsed:.2f}s "
+              f"({elapsed / len(queries) * 1000:.3f} ms each), {hits:,} with a near match")
+
+
+if __name__ == "__main__":
+    run_entry_point(main)
@@ -0,0 +1,424 @@
+import math
+import re
+from datetime import date
+from keyboard_patterns import find_patterns
+
+# Guess-count estimation in the style of zxcvbn: find every pattern that matches part of
+# the password, then pick the decomposition that needs the fewest total guesses.
+
+REFERENCE_YEAR = date.today().year
+MIN_YEAR_SPACE = 20
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+
+# Only the first MAX_ESTIMATE_LENGTH characters are matched; the rest count as brute force
+MAX_ESTIMATE_LENGTH = 100
+# Matches ending at one position that the search considers (the most guessable are dropped)
+MAX_MATCHES_PER_POSITION = 20
+# Longer passwords first get a quick upper bound on guesses, which prunes the exact search
+QUICK_BOUND_LENGTH = 20
+# Guesses are capped here, so they always fit a float
+MAX_GUESSES_LOG10 = 300
+MAX_GUESSES = 10 ** MAX_GUESSES_LOG10
+
+# Offline attack against a slow hash (bcrypt, scrypt, PBKDF2)
+GUESSES_PER_SECOND = 1e4
+
+L33T_TABLE = str.maketrans({
+    '4': 'a', '@': 'a', '8': 'b', '(': 'c', '{': 'c', '3': 'e', '6': 'g', '9': 'g',
+    '1': 'i', '!': 'i', '|': 'i', '0': 'o', '$': 's', '5': 's', '+': 't', '7': 't',
+    '%': 'x', '2': 'z'
+})
+# '1', '|' and '7' also commonly stand for 'l'
+L33T_TABLE_ALT = dict(L33T_TABLE)
+L33T_TABLE_ALT.update({ord('1'): 'l', ord('|'): 'l', ord('7'): 'l'})
+
+DATE_WITH_SEPARATOR = re.compile(r'^(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})$')
+YEAR_PATTERN = re.compile(r'19\d\d|20\d\d')
+GREEDY_REPEAT = re.compile(r'(.+)\1+')
+LAZY_REPEAT = re.compile(r'(.+?)\1+')
+LAZY_ANCHORED_REPEAT = re.compile(r'^(.+?)\1+$')
+
+
+def n_choose_k(n, k):
+    if k > n:
+        return 0
+    return math.comb(n, k)
+
+
+def uppercase_variations(token):
+    """Number of capitalisation variants an attacker would try for a token."""
+    if token.lower() == token:
+        return 1
+    if ((token[0].isupper() and token[1:].lower() == token[1:]) or
+            (token[-1].isupper() and token[:-1].lower() == token[:-1]) or
+            token.upper() == token):
+        return 2
+    upper = sum(1 for c in token if c.isupper())
+    lower = sum(1 for c in token if c.islower())
+    return sum(n_choose_k(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+def l33t_variations(token, plain):
+    """Number of l33t substitution variants for a token whose unsubstituted form is plain."""
+    variations = 1
+    subs = {}
+    for sub_char, letter in zip(token.lower(), plain):
+        if sub_char != letter:
+            subs.setdefault((sub_char, letter), 0)
+    for sub_char, letter in subs:
+        substituted = token.lower().count(sub_char)
+        unsubstituted = token.lower().count(letter)
+        if not substituted or not unsubstituted:
+            variations *= 2
+        else:
+            variations *= sum(n_choose_k(substituted + unsubstituted, i)
+                              for i in range(1, min(substituted, unsubstituted) + 1))
+    return variations
+
+
+def _to_latin1(text):
+    """Encode text the way wordlists are read; characters outside latin-1 never match."""
+    if text.isascii():
+        return text.encode('ascii')
+    return ''.join(c if ord(c) < 256 else '\0' for c in text).encode('latin-1')
+
+
+class GuessEstimator:
+    """Estimate how many guesses an attacker needs for a password."""
+
+    def __init__(self, rank_tables=None):
+        self.rank_tables = rank_tables or []
+
+    # Matchers: each returns a list of match dicts with 'pattern', 'i', 'j' (inclusive) and 'token'
+
+    def dictionary_matches(self, password):
+        matches = []
+        lower = password.lower()
+        n = len(password)
+
+        candidates = [(lower, False, None)]
+        for table in (L33T_TABLE, L33T_TABLE_ALT):
+            translated = lower.translate(table)
+            if translated != lower and all(c[0] != translated for c in candidates):
+                candidates.append((translated, False, table))
+        candidates.append((lower[::-1], True, None))
+
+        # Candidates share most of their prefixes, so lookups are cached per table
+        caches = [{} for _ in self.rank_tables]
+        for text, reversed_, l33t in candidates:
+            encoded = _to_latin1(text)
+            # A l33t match has to cover a substituted character, so later starts are skipped
+            last_start = n
+            if l33t:
+                last_start = max(i for i in range(n) if text[i] != lower[i]) + 1
+            for table, cache in zip(self.rank_tables, caches):
+                for i in range(last_start):
+                    for end, rank in table.prefix_matches(encoded, i, cache):
+                        j = end - 1
+                        if reversed_:
+                            i_, j_ = n - 1 - j, n - 1 - i
+                        else:
+                            i_, j_ = i, j
+                        token = password[i_:j_ + 1]
+                        # L33t candidates only count where a substitution was actually used
+                        if l33t and token.lower() == text[i:end]:
+                            continue
+                        matches.append({
+                            'pattern': 'dictionary',
+                            'i': i_, 'j': j_,
+                            'token': token,
+                            'matched_word': text[i:end],
+                            'rank': rank,
+                            'dictionary_name': table.name,
+                            'reversed': reversed_,
+                            'l33t': l33t is not None
+                        })
+        return matches
+
+    def keyboard_matches(self, password):
+        """Keyboard walks on all layouts and character sequences, found in one pass."""
+        return find_patterns(password)
+
+    def repeat_matches(self, password):
+        matches = []
+        last_index = 0
+        while last_index < len(password):
+            greedy = GREEDY_REPEAT.search(password, last_index)
+            if not greedy:
+                break
+            lazy = LAZY_REPEAT.search(password, last_index)
+            if len(greedy.group(0)) > len(lazy.group(0)):
+                match = greedy
+                base_token = LAZY_ANCHORED_REPEAT.match(match.group(0)).group(1)
+            else:
+                match = lazy
+                base_token = match.group(1)
+
+            base = self.estimate(base_token)
+            matches.append({
+                'pattern': 'repeat',
+                'i': match.start(), 'j': match.end() - 1,
+                'token': match.group(0),
+                'base_token': base_token,
+                'base_guesses': base['guesses'],
+                'repeat_count': len(match.group(0)) // len(base_token)
+            })
+            last_index = match.end()
+        return matches
+
+    def date_matches(self, password):
+        matches = []
+        n = len(password)
+        for i in range(n):
+            for j in range(i + 3, min(i + 10, n)):
+                token = password[i:j + 1]
+                if token.isdigit():
+                    if len(token) not in (4, 5, 6, 7, 8):
+                        continue
+                    day_month_year = self._split_digit_date(token)
+                    separator = ''
+                else:
+                    found = DATE_WITH_SEPARATOR.match(token)
+                    if not found:
+                        continue
+                    day_month_year = self._to_date((int(found.group(1)), int(found.group(3)),
+                                                    int(found.group(4))))
+                    separator = found.group(2)
+                if day_month_year:
+                    matches.append({
+                        'pattern': 'date',
+                        'i': i, 'j': j,
+                        'token': token,
+                        'separator': separator,
+                        'year': day_month_year[2]
+                    })
+
+        for found in YEAR_PATTERN.finditer(password):
+            matches.append({
+                'pattern': 'year',
+                'i': found.start(), 'j': found.end() - 1,
+                'token': found.group(0),
+                'year': int(found.group(0))
+            })
+        return matches
+
+    def _split_digit_date(self, token):
+        """Try the usual ways of writing a date without separators."""
+        splits = {
+            4: [(1, 2), (2, 3)],
+            5: [(1, 3), (2, 3)],
+            6: [(1, 2), (2, 4), (4, 5)],
+            7: [(1, 3), (2, 3), (4, 5), (4, 6)],
+            8: [(2, 4), (4, 6)],
+        }
+        for k, l in splits[len(token)]:
+            candidate = self._to_date((int(token[:k]), int(token[k:l]), int(token[l:])))
+            if candidate:
+                return candidate
+        return None
+
+    def _to_date(self, parts):
+        """Interpret three integers as (day, month, year) in any common order."""
+        first, middle, last = parts
+        if middle > 31:
+            return None
+        for year, rest in ((last, (first, middle)), (first, (middle, last))):
+            if year < 100:
+                year += 1900 if year > 50 else 2000
+            if not 1000 <= year <= 2050:
+                continue
+            for day, month in (rest, rest[::-1]):
+                if 1 <= day <= 31 and 1 <= month <= 12:
+                    return day, month, year
+        return None
+
+    def omnimatch(self, password):
+        return (self.dictionary_matches(password) + self.keyboard_matches(password) +
+                self.repeat_matches(password) + self.date_matches(password))
+
+    def match_guesses(self, match, password_length):
+        """Estimate guesses for a single match."""
+        if 'guesses' in match:
+            return match['guesses']
+
+        length = match['j'] - match['i'] + 1
+        if length < password_length:
+            min_guesses = MIN_SUBMATCH_GUESSES_SINGLE_CHAR if length == 1 else MIN_SUBMATCH_GUESSES_MULTI_CHAR
+        else:
+            min_guesses = 1
+
+        pattern = match['pattern']
+        if pattern == 'bruteforce':
+            guesses = BRUTEFORCE_CARDINALITY ** length
+            min_guesses += 1
+        elif pattern == 'dictionary':
+            guesses = match['rank'] * uppercase_variations(match['token'])
+            if match['l33t']:
+                guesses *= l33t_variations(match['token'], match['matched_word'])
+            if match['reversed']:
+                guesses *= 2
+        elif pattern in ('spatial', 'sequence'):
+            guesses = match['pattern_guesses']
+        elif pattern == 'repeat':
+            guesses = match['base_guesses'] * match['repeat_count']
+        elif pattern == 'date':
+            guesses = 365 * max(abs(match['year'] - REFERENCE_YEAR), MIN_YEAR_SPACE)
+            if match['separator']:
+                guesses *= 4
+        elif pattern == 'year':
+            guesses = max(abs(match['year'] - REFERENCE_YEAR), MIN_YEAR_SPACE)
+        else:
+            raise ValueError(f"Unknown pattern: {pattern}")
+
+        match['guesses'] = max(guesses, min_guesses)
+        return match['guesses']
+
+    def most_guessable_sequence(self, password, matches):
+        """
+        Find the sequence of non-overlapping matches (gaps filled by brute force)
+        that minimises l! * product(guesses) + D^(l-1), as in zxcvbn. Only the least
+        guessable match of each span, and MAX_MATCHES_PER_POSITION matches per end, are
+        tried.
+        """
+        n = len(password)
+        if n == 0:
+            return 1, []
+
+        best_by_span = {}
+        for match in matches:
+            span = (match['i'], match['j'])
+            best = best_by_span.get(span)
+            if best is None or self.match_guesses(match, n) < self.match_guesses(best, n):
+                best_by_span[span] = match
+        matches_by_end = [[] for _ in range(n)]
+        for match in best_by_span.values():
+            matches_by_end[match['j']].append(match)
+        for ending in matches_by_end:
+            if len(ending) > MAX_MATCHES_PER_POSITION:
+                ending.sort(key=lambda match: self.match_guesses(match, n))
+                del ending[MAX_MATCHES_PER_POSITION:]
+
+        # Guesses of a brute-force match by length (a full-length one has a lower minimum)
+        span_guesses = [0] + [self.match_guesses({'pattern': 'bruteforce', 'i': 0, 'j': length - 1}, n)
+                              for length in range(1, n + 1)]
+        bound = span_guesses[n] + 1
+        quick = None
+        if n > QUICK_BOUND_LENGTH:
+            # Keeping only the best sequence per position quickly finds a good complete one
+            quick = self._search_sequences(password, matches_by_end, span_guesses, bound, single=True)
+            bound = quick[2]
+        best_match, best_total, total = self._search_sequences(password, matches_by_end, span_guesses, bound)
+        if quick is not None and quick[2] < total:
+            best_match, best_total, _ = quick
+
+        # Unwind the optimal sequence from the end of the password
+        k = n - 1
+        length, guesses = min(best_total[k].items(), key=lambda item: item[1])
+        sequence = []
+        while k >= 0:
+            match = best_match[k][length]
+            sequence.insert(0, match)
+            k = match['i'] - 1
+            length -= 1
+        return guesses, sequence
+
+    def _search_sequences(self, password, matches_by_end, span_guesses, bound, single=False):
+        """
+        Dynamic programme of most_guessable_sequence. Sequences costing more than bound
+        are dropped (extending a sequence only adds guesses); with single, only the best
+        sequence ending at each position is kept. Returns, per end position and sequence
+        length, the last match and the total, and the best complete total.
+        """
+        n = len(password)
+        best_match = [{} for _ in range(n)]
+        best_product = [{} for _ in range(n)]
+        best_total = [{} for _ in range(n)]
+        # Brute force over more characters than log10(bound) already costs more (one spare for rounding)
+        longest_span = int(math.log10(bound)) + 1
+
+        def update(i, k, guesses, length, match=None):
+            product = guesses
+            if length > 1:
+                product *= best_product[i - 1][length - 1]
+            total = math.factorial(length) * product + MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (length - 1)
+            if total > bound:
+                return
+            for other_length, other_total in best_total[k].items():
+                if (single or other_length <= length) and other_total <= total:
+                    return
+            if single:
+                for table in (best_total, best_match, best_product):
+                    table[k].clear()
+            if match is None:
+                match = {'pattern': 'bruteforce', 'i': i, 'j': k, 'token': password[i:k + 1], 'guesses': guesses}
+            best_total[k][length] = total
+            best_match[k][length] = match
+            best_product[k][length] = product
+
+        for k in range(n):
+            for match in matches_by_end[k]:
+                i = match['i']
+                guesses = self.match_guesses(match, n)
+                if i > 0:
+                    for length in list(best_match[i - 1]):
+                        update(i, k, guesses, length + 1, match)
+                else:
+                    update(i, k, guesses, 1, match)
+
+            update(0, k, span_guesses[k + 1], 1)
+            for i in range(max(1, k + 1 - longest_span), k + 1):
+                for length, last in list(best_match[i - 1].items()):
+                    # Consecutive brute-force matches are never better than one longer one
+                    if last['pattern'] != 'bruteforce':
+                        update(i, k, span_guesses[k - i + 1], length + 1)
+        return best_match, best_total, min(best_total[n - 1].values(), default=math.inf)
+
+    def estimate(self, password):
+        """
+        Return the estimated guesses, score (0-4), crack time and matched pattern sequence.
+        Characters past MAX_ESTIMATE_LENGTH are not matched, and count as one brute-force
+        match at the end of the sequence.
+        """
+        head, tail = password[:MAX_ESTIMATE_LENGTH], password[MAX_ESTIMATE_LENGTH:]
+        guesses, sequence = self.most_guessable_sequence(head, self.omnimatch(head))
+        if tail:
+            tail_guesses = BRUTEFORCE_CARDINALITY ** min(len(tail), MAX_GUESSES_LOG10)
+            sequence = sequence + [{'pattern': 'bruteforce', 'i': len(head), 'j': len(password) - 1,
+                                    'token': tail, 'guesses': tail_guesses}]
+            guesses = min(guesses * tail_guesses, MAX_GUESSES)
+        seconds = guesses / GUESSES_PER_SECOND
+        return {
+            'guesses': guesses,
+            'guesses_log10': math.log10(guesses) if guesses > 0 else 0.0,
+            'score': guesses_to_score(guesses),
+            'crack_time_seconds': seconds,
+            'crack_time_display': display_time(seconds),
+            'sequence': sequence
+        }
+
+
+def guesses_to_score(guesses):
+    """Map guesses onto zxcvbn's 0 (too guessable) to 4 (very unguessable) scale."""
+    delta = 5
+    for score, threshold in enumerate((1e3, 1e6, 1e8, 1e10)):
+        if guesses < threshold + delta:
+            return score
+    return 4
+
+
+def display_time(seconds):
+    """Format a crack time for display."""
+    minute, hour, day = 60, 3600, 86400
+    month, year = day * 31, day * 365
+    century = year * 100
+    if seconds < 1:
+        return "less than a second"
+    for limit, unit, size in ((minute, "second", 1), (hour, "minute", minute), (day, "hour", hour),
+                              (month, "day", day), (year, "month", month), (century, "year", year)):
+        if seconds < limit:
+            value = round(seconds / size)
+            return f"{value} {unit}{'s' if value != 1 else ''}"
+    return "centuries"
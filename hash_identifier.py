@@ -1,8 +1,15 @@
 import subprocess
 
 class SecurityChecker:
-    def identify_hash(self, hash_input):
-        """Identify the type of hash using hash-identifier."""
+    def __init__(self, results_store=None):
+        # Optional ResultsStore that records hash classifications
+        self.results_store = results_store
+
+    def identify_hash(self, hash_input, verbose=True):
+        """
+        Identify the type of hash using hash-identifier.
+        Returns the possible hash types, or None if hash-identifier could not run.
+        """
         try:
             process = subprocess.run(
                 ["hash-identifier"],
@@ -11,11 +18,21 @@ class SecurityChecker:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE
             )
-            print("\nHash-Identifier Output:")
-            print(process.stdout)
+            if verbose:
+                print("\nHash-Identifier Output:")
+                print(process.stdout)
+
+            hash_types = [line.strip()[3:].strip() for line in process.stdout.splitlines()
+                          if line.strip().startswith('[+]')]
+            if self.results_store:
+                self.results_store.record_hash_classification(hash_input.strip(), hash_types)
+                self.results_store.flush()
+            return hash_types
         except FileNotFoundError:
-            print("\nError: hash-identifier is not installed on this system.")
-            print("Install it using: sudo apt install hash-identifier or clone it from GitHub.")
+            if verbose:
+                print("\nError: hash-identifier is not installed on this system.")
+                print("Install it using: sudo apt install hash-identifier or clone it from GitHub.")
         except Exception as e:
-            print(f"\nAn error occurred while identifying the hash: {e}")
+            if verbose:
+                print(f"\nAn error occurred while identifying the hash: {e}")
 
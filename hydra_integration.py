@@ -1,11 +1,163 @@
 import subprocess
+import hashlib
+import json
 import os
+import re
+import shutil
 import sys
+import tempfile
+import threading
 from pathlib import Path
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from results_store import redact_login_line
+from utils import ProgressIndicator, show_status, format_time
+from wordlist_io import WordlistStream, available_wordlists, decompress_wordlist, is_compressed
+
+# Example: [STATUS] 64.00 tries/min, 64 tries in 00:01h, 14344335 to do in 3735:31h, 16 active
+STATUS_PATTERN = re.compile(
+    r'\[STATUS\]\s+([\d.]+)\s+tries/min,\s+(\d+)\s+tries in\s+(\d+):(\d+)h,'
+    r'\s+(\d+)\s+to do in\s+(\d+):(\d+)h,\s+(\d+)\s+active'
+)
+# Example: [DATA] max 16 tasks per 1 server, overall 16 tasks, 14344399 login tries (l:1/p:14344399), ...
+TOTAL_PATTERN = re.compile(r'\[DATA\].*?(\d+)\s+login tries')
+# Example: [ATTEMPT] target 10.0.0.5 - login "admin" - pass "123456" - 5 of 100 [child 0] (0/0)
+ATTEMPT_PATTERN = re.compile(r'\[ATTEMPT\].*-\s+(\d+)\s+of\s+(\d+)\s+\[child')
+
+# A shard's time budget doubles after each timeout; after this many it is given up on
+MAX_SHARD_TIMEOUTS = 3
+
+# Connection problems reported by Hydra, a sign that the target is being overloaded
+CONNECTION_ERROR_PATTERN = re.compile(
+    r'could not connect|can not connect|connection refused|timed? ?out|\[RE-ATTEMPT\]', re.IGNORECASE
+)
+
+
+class HydraProgress:
+    """Track and render the progress of a running Hydra attack from its output lines."""
+
+    def __init__(self, service=None, threads=None, render_interval=1.0, render=True):
+        self.service = service
+        self.threads = threads
+        self.render_interval = render_interval
+        self.render_enabled = render
+        self.start_time = time.time()
+        self.tries_per_min = 0.0
+        self.tries_done = 0
+        self.tries_total = None
+        self.active_tasks = 0
+        self.connection_errors = 0
+        self.samples = []
+        self._indicator = ProgressIndicator()
+        self._last_render = 0.0
+
+    def update(self, line):
+        """Update the progress model from a line of Hydra output. Returns True if the line was parsed."""
+        match = STATUS_PATTERN.search(line)
+        if match:
+            self.tries_per_min = float(match.group(1))
+            self.tries_done = int(match.group(2))
+            self.tries_total = self.tries_done + int(match.group(5))
+            self.active_tasks = int(match.group(8))
+            self.samples.append((round(self.elapsed, 1), self.tries_per_min))
+            self.render()
+            return True
+
+        match = ATTEMPT_PATTERN.search(line)
+        if match:
+            self.tries_done = max(self.tries_done, int(match.group(1)))
+            self.tries_total = int(match.group(2))
+            self.render()
+            return True
+
+        match = TOTAL_PATTERN.search(line)
+        if match:
+            self.tries_total = int(match.group(1))
+            return True
+
+        if CONNECTION_ERROR_PATTERN.search(line):
+            self.connection_errors += 1
+            return True
+
+        return False
+
+    def count_errors(self, output):
+        """Count connection errors in output that was not streamed (e.g. stderr)."""
+        for line in output.splitlines():
+            if CONNECTION_ERROR_PATTERN.search(line):
+                self.connection_errors += 1
+
+    @property
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    @property
+    def percent_complete(self):
+        if not self.tries_total:
+            return 0.0
+        return min(100.0, self.tries_done * 100 / self.tries_total)
+
+    @property
+    def eta_seconds(self):
+        """Seconds remaining at the current rate, or None if unknown."""
+        if not self.tries_total:
+            return None
+        rate = self.tries_per_min / 60 if self.tries_per_min else 0
+        if not rate and self.tries_done:
+            rate = self.tries_done / self.elapsed
+        if not rate:
+            return None
+        return max(0, self.tries_total - self.tries_done) / rate
+
+    def render(self, force=False):
+        """Redraw the progress bar, at most once per render_interval unless forced."""
+        if not self.render_enabled or not self.tries_total:
+            return
+        now = time.time()
+        if not force and now - self._last_render < self.render_interval:
+            return
+        self._last_render = now
+
+        # Same rate as eta_seconds and metrics(), so the bar and the reported ETA agree
+        eta_seconds = self.eta_seconds
+        eta = "Calculating..." if eta_seconds is None else f"{format_time(eta_seconds)} remaining"
+        prefix = f"Hydra {self.tries_per_min:.0f} tries/min, {eta}"
+        self._indicator.simple_progress_bar(min(self.tries_done, self.tries_total), self.tries_total,
+                                            bar_length=30, prefix=prefix)
+
+    def finish(self):
+        """Render the final state and end the progress line."""
+        if not self.render_enabled or not self.tries_total:
+            return
+        self.render(force=True)
+        if self.tries_done < self.tries_total:
+            print()
+
+    def metrics(self):
+        """Return a summary of the run suitable for tuning thread counts per service."""
+        elapsed = self.elapsed
+        average_rate = self.tries_done * 60 / elapsed if elapsed > 0 else 0.0
+        # Hydra counts a try once it completes; a failed connection is retried, so it adds an attempt
+        attempts = self.tries_done + self.connection_errors
+        return {
+            'service': self.service,
+            'threads': self.threads,
+            'tries_done': self.tries_done,
+            'tries_total': self.tries_total,
+            'percent_complete': round(self.percent_complete, 2),
+            'tries_per_min': self.tries_per_min,
+            'average_tries_per_min': round(average_rate, 2),
+            'tries_per_min_per_thread': round(average_rate / self.threads, 2) if self.threads else None,
+            'connection_errors': self.connection_errors,
+            'error_rate': round(self.connection_errors / attempts, 4) if attempts else 0.0,
+            'eta_seconds': self.eta_seconds,
+            'elapsed': round(elapsed, 2),
+            'samples': self.samples
+        }
+
 
 class HydraIntegration:
-    def __init__(self):
+    def __init__(self, results_store=None):
         self.common_wordlists = [
             "/usr/share/wordlists/rockyou.txt",
             "/usr/share/wordlists/fasttrack.txt",
@@ -33,11 +185,20 @@ class HydraIntegration:
             "vnc": 5900
         }
 
+        # Throughput metrics of previous runs, used to tune threads per service
+        self.attack_metrics = []
+
+        # Optional ResultsStore that records found credentials
+        self.results_store = results_store
+
+        # Command that runs Hydra (benchmark_hydra_tuning.py swaps in a local stand-in)
+        self.hydra_command = ["hydra"]
+
     def check_hydra_installed(self):
         """Check if Hydra is installed on the system."""
         try:
             result = subprocess.run(
-                ["hydra", "-h"], 
+                self.hydra_command + ["-h"], 
                 stdout=subprocess.PIPE, 
                 stderr=subprocess.PIPE,
                 text=True
@@ -47,12 +208,25 @@ class HydraIntegration:
             return False
 
     def get_available_wordlists(self):
-        """Get list of available wordlists on the system."""
-        available = []
-        for wordlist in self.common_wordlists:
-            if Path(wordlist).exists():
-                available.append(wordlist)
-        return available
+        """Get list of available wordlists on the system (compressed variants included)."""
+        return available_wordlists(self.common_wordlists)
+
+    def plain_passlist(self, passlist):
+        """
+        Return a pass list Hydra can read: the list itself, or for a compressed list a
+        decompressed temporary copy (the caller removes it after the run). Hydra reads
+        -P files itself, twice (to count and then to load them), so a pipe will not do.
+        """
+        if not is_compressed(passlist):
+            return passlist
+        fd, temp_path = tempfile.mkstemp(prefix="hydra_passlist_", suffix=".txt")
+        os.close(fd)
+        show_status(f"Decompressing {Path(passlist).name} for Hydra (removed after the run)", "info")
+        try:
+            return decompress_wordlist(passlist, temp_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
 
     def create_custom_wordlist(self, passwords):
         """Create a temporary wordlist file from provided passwords."""
@@ -79,9 +253,58 @@ class HydraIntegration:
             print(f"Error creating username list: {e}")
             return None
 
+    def _stream_process(self, cmd, timeout, on_line):
+        """
+        Run a command, passing each stdout line to on_line as it arrives.
+        Raises subprocess.TimeoutExpired, with the output collected so far, if the
+        command runs longer than timeout.
+        """
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+
+        stderr_lines = []
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_lines.extend(process.stderr), daemon=True
+        )
+        stderr_thread.start()
+
+        timed_out = threading.Event()
+
+        def kill_on_timeout():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.start()
+
+        stdout_lines = []
+        try:
+            for line in process.stdout:
+                stdout_lines.append(line)
+                on_line(line)
+            process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            stderr_thread.join(timeout=5)
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout, output=''.join(stdout_lines),
+                                            stderr=''.join(stderr_lines))
+
+        return ''.join(stdout_lines), ''.join(stderr_lines), process.returncode
+
     def run_hydra_attack(self, target, service, username=None, userlist=None, 
                         password=None, passlist=None, port=None, threads=16, 
-                        verbose=False, stop_on_success=True):
+                        verbose=False, stop_on_success=True, show_progress=True,
+                        timeout=3600):
         """
         Run Hydra attack with specified parameters.
         
@@ -96,6 +319,8 @@ class HydraIntegration:
             threads: Number of parallel threads
             verbose: Enable verbose output
             stop_on_success: Stop after first successful login
+            show_progress: Render live progress and ETA from Hydra's status lines
+            timeout: Time budget for the run in seconds
         """
         
         if not self.check_hydra_installed():
@@ -105,7 +330,7 @@ class HydraIntegration:
             }
 
         # Build Hydra command
-        cmd = ["hydra"]
+        cmd = list(self.hydra_command)
         
         # Add username options
         if username:
@@ -119,20 +344,23 @@ class HydraIntegration:
                 cmd.extend(["-L", default_userlist])
         
         # Add password options
+        temp_passlist = None
         if password:
             cmd.extend(["-p", password])
-        elif passlist:
-            cmd.extend(["-P", passlist])
         else:
-            # Use first available wordlist
-            available_wordlists = self.get_available_wordlists()
-            if available_wordlists:
-                cmd.extend(["-P", available_wordlists[0]])
-            else:
-                return {
-                    'success': False,
-                    'error': 'No wordlists available. Please specify a password list.'
-                }
+            if not passlist:
+                # Use first available wordlist
+                available_wordlists = self.get_available_wordlists()
+                if not available_wordlists:
+                    return {
+                        'success': False,
+                        'error': 'No wordlists available. Please specify a password list.'
+                    }
+                passlist = available_wordlists[0]
+            plain = self.plain_passlist(passlist)
+            if plain != passlist:
+                temp_passlist = plain
+            cmd.extend(["-P", plain])
         
         # Add other options
         cmd.extend(["-t", str(threads)])
@@ -155,39 +383,372 @@ class HydraIntegration:
         print(f"Running Hydra command: {' '.join(cmd)}")
         print("This may take a while depending on the wordlist size...")
         
+        progress = HydraProgress(service=service, threads=threads, render=show_progress)
+
         try:
-            # Run Hydra attack
+            # Run Hydra attack, streaming its output into the progress model
             start_time = time.time()
-            process = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=3600  # 1 hour timeout
-            )
+            stdout, stderr, return_code = self._stream_process(cmd, timeout, progress.update)
             
             end_time = time.time()
             duration = end_time - start_time
+
+            progress.count_errors(stderr)
+            progress.finish()
+            metrics = progress.metrics()
+            self.attack_metrics.append(metrics)
             
             return {
                 'success': True,
-                'stdout': process.stdout,
-                'stderr': process.stderr,
-                'return_code': process.returncode,
+                'stdout': stdout,
+                'stderr': stderr,
+                'return_code': return_code,
                 'duration': duration,
-                'command': ' '.join(cmd)
+                'command': ' '.join(cmd),
+                'target': target,
+                'service': service,
+                'metrics': metrics
             }
             
-        except subprocess.TimeoutExpired:
+        except subprocess.TimeoutExpired as e:
+            progress.count_errors(e.stderr or '')
+            progress.finish()
+            metrics = progress.metrics()
+            self.attack_metrics.append(metrics)
             return {
                 'success': False,
-                'error': 'Hydra attack timed out after 1 hour'
+                'error': f'Hydra attack timed out after {format_time(timeout)}',
+                'timed_out': True,
+                'stdout': e.output or '',
+                'stderr': e.stderr or '',
+                'metrics': metrics
             }
         except Exception as e:
             return {
                 'success': False,
                 'error': f'Error running Hydra: {str(e)}'
             }
+        finally:
+            if temp_passlist:
+                os.remove(temp_passlist)
+
+    def split_passlist(self, passlist, lines_per_segment, directory):
+        """Split a password list into segment files of at most lines_per_segment lines."""
+        segments = []
+        segment_file = None
+        with WordlistStream(passlist, binary=True) as f:
+            for i, line in enumerate(f):
+                if i % lines_per_segment == 0:
+                    if segment_file:
+                        segment_file.close()
+                    segment_path = os.path.join(directory, f"segment_{len(segments):05d}.txt")
+                    segment_file = open(segment_path, 'wb')
+                    segments.append(segment_path)
+                segment_file.write(line + b'\n')
+        if segment_file:
+            segment_file.close()
+        return segments
+
+    def run_adaptive_attack(self, target, service, username=None, userlist=None,
+                            passlist=None, port=None, start_threads=4, min_threads=1,
+                            max_threads=64, segment_size=5000, max_error_rate=0.02,
+                            verbose=False):
+        """
+        Run a Hydra attack in segments, tuning the thread count between segments.
+
+        Starts at start_threads and doubles the count while throughput keeps improving.
+        When the share of connection attempts that fail (errors / (tries + errors))
+        exceeds max_error_rate, the count is halved
+        and never raised above that level again. Intended for authorized tests of your
+        own services; the per-segment history in the result can be used to benchmark a
+        service against a local stand-in.
+        """
+        if not passlist:
+            available_wordlists = self.get_available_wordlists()
+            if not available_wordlists:
+                return {
+                    'success': False,
+                    'error': 'No wordlists available. Please specify a password list.'
+                }
+            passlist = available_wordlists[0]
+
+        work_dir = tempfile.mkdtemp(prefix="hydra_adaptive_")
+        try:
+            segments = self.split_passlist(passlist, segment_size, work_dir)
+            threads = max(min_threads, min(start_threads, max_threads))
+            ceiling = max_threads
+            best_rate, best_threads = 0.0, threads
+            history = []
+            stdout_parts, stderr_parts = [], []
+            start_time = time.time()
+            result = None
+
+            for i, segment in enumerate(segments, 1):
+                print(f"\n Segment {i}/{len(segments)} with {threads} threads")
+                result = self.run_hydra_attack(
+                    target=target,
+                    service=service,
+                    username=username,
+                    userlist=userlist,
+                    passlist=segment,
+                    port=port,
+                    threads=threads,
+                    verbose=verbose
+                )
+                if not result['success']:
+                    result['segments'] = history
+                    return result
+
+                stdout_parts.append(result['stdout'])
+                stderr_parts.append(result['stderr'])
+
+                metrics = result['metrics']
+                rate = metrics['average_tries_per_min']
+                error_rate = metrics['error_rate']
+                history.append({
+                    'segment': i,
+                    'threads': threads,
+                    'tries_per_min': rate,
+                    'error_rate': error_rate,
+                    'duration': round(result['duration'], 2)
+                })
+
+                if self.parse_hydra_output(result['stdout']):
+                    break
+
+                # Pick the thread count for the next segment
+                if error_rate > max_error_rate:
+                    ceiling = max(min_threads, threads // 2)
+                    threads = ceiling
+                    best_threads = min(best_threads, ceiling)
+                    show_status(f"Connection errors at {error_rate:.1%}, reducing to {threads} threads", "warning")
+                elif rate > best_rate * 1.1:
+                    best_rate, best_threads = rate, threads
+                    threads = min(ceiling, threads * 2)
+                elif rate < best_rate * 0.9:
+                    threads = best_threads
+                    ceiling = best_threads
+
+            return {
+                'success': True,
+                'stdout': ''.join(stdout_parts),
+                'stderr': ''.join(stderr_parts),
+                'return_code': result['return_code'] if result else 0,
+                'duration': time.time() - start_time,
+                'command': result['command'] if result else '',
+                'target': target,
+                'service': service,
+                'metrics': result['metrics'] if result else None,
+                'segments': history,
+                'best_threads': best_threads
+            }
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _session_state_path(self, session_dir):
+        return os.path.join(session_dir, "state.json")
+
+    def _save_session_state(self, session_dir, state):
+        """Write the session state atomically so an interrupted run never leaves it half-written."""
+        state_path = self._session_state_path(session_dir)
+        temp_path = state_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_path, state_path)
+
+    def _load_session(self, session_dir, passlist, shard_size):
+        """Load an existing session for this pass list, or shard the list into a new one."""
+        stat = os.stat(passlist)
+        state_path = self._session_state_path(session_dir)
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                state = json.load(f)
+            if (state.get('passlist_size') == stat.st_size and
+                    state.get('passlist_mtime') == stat.st_mtime and
+                    state.get('shard_size') == shard_size and
+                    all(os.path.exists(shard['path']) for shard in state['shards'])):
+                if any('password' in login for login in state['found']):
+                    # Written by an older version that kept passwords
+                    state['found'] = [self._redact_login(login) for login in state['found']]
+                    self._save_session_state(session_dir, state)
+                return state
+            show_status("Pass list changed since the last run, starting a new session", "warning")
+            shutil.rmtree(session_dir, ignore_errors=True)
+
+        os.makedirs(session_dir, exist_ok=True)
+        shard_paths = self.split_passlist(passlist, shard_size, session_dir)
+        state = {
+            'passlist': os.path.abspath(passlist),
+            'passlist_size': stat.st_size,
+            'passlist_mtime': stat.st_mtime,
+            'shard_size': shard_size,
+            'found': [],
+            'shards': [{'path': path, 'status': 'pending', 'duration': None} for path in shard_paths]
+        }
+        self._save_session_state(session_dir, state)
+        return state
+
+    def run_resumable_attack(self, target, service, username=None, userlist=None,
+                             passlist=None, port=None, threads=16, shard_size=10000,
+                             shard_timeout=600, parallel=1, session_dir=None,
+                             verbose=False, stop_on_success=True):
+        """
+        Run a Hydra attack over shards of the pass list, recording each finished shard.
+
+        Progress is stored in a state file under session_dir, so running the same attack
+        again after an interruption or timeout continues from the first unfinished shard.
+        shard_timeout is the time budget of a single shard; a shard that exceeds it is
+        retried on the next run with twice the budget, and given up on after
+        MAX_SHARD_TIMEOUTS timeouts. With parallel > 1, shards run in concurrent Hydra
+        processes. Logins found by earlier runs come back in 'previous_logins' with their
+        passwords redacted (the state file never holds them); they were recorded when found.
+        """
+        if not passlist:
+            available_wordlists = self.get_available_wordlists()
+            if not available_wordlists:
+                return {
+                    'success': False,
+                    'error': 'No wordlists available. Please specify a password list.'
+                }
+            passlist = available_wordlists[0]
+
+        if not username and not userlist:
+            userlist = self.create_username_list()
+
+        # One session per target, service, credentials and pass list
+        session_key = '|'.join(str(part) for part in (target, service, port, username, userlist,
+                                                       os.path.abspath(passlist)))
+        session_id = hashlib.sha1(session_key.encode('utf-8')).hexdigest()[:12]
+        session_dir = session_dir or os.path.join(str(Path.home()), ".ak_vault", "hydra_sessions", session_id)
+
+        state = self._load_session(session_dir, passlist, shard_size)
+        pending = [i for i, shard in enumerate(state['shards']) if shard['status'] not in ('done', 'gave_up')]
+        total = len(state['shards'])
+        given_up = sum(1 for shard in state['shards'] if shard['status'] == 'gave_up')
+
+        if len(pending) < total:
+            show_status(f"Resuming session: {total - len(pending) - given_up}/{total} shards already done", "info")
+        if given_up:
+            show_status(f"{given_up} shard(s) timed out {MAX_SHARD_TIMEOUTS} times and are skipped", "warning")
+
+        previous_logins = list(state['found'])
+
+        stdout_parts, stderr_parts = [], []
+        start_time = time.time()
+        stop = threading.Event()
+        state_lock = threading.Lock()
+
+        def run_shard(index):
+            if stop.is_set():
+                return index, None
+            shard = state['shards'][index]
+            print(f"\n Shard {index + 1}/{total}")
+            result = self.run_hydra_attack(
+                target=target,
+                service=service,
+                username=username,
+                userlist=userlist,
+                passlist=shard['path'],
+                port=port,
+                threads=threads,
+                verbose=verbose,
+                stop_on_success=stop_on_success,
+                show_progress=parallel == 1,
+                timeout=shard_timeout * 2 ** shard.get('timeouts', 0)
+            )
+            return index, result
+
+        def record(index, result):
+            if result is None:
+                return
+            shard = state['shards'][index]
+            with state_lock:
+                failure = self._hydra_failure(result) if result['success'] else None
+                if failure:
+                    # Hydra ran but could not attack (refused connection, bad arguments): retry on resume
+                    shard['status'] = 'failed'
+                    stderr_parts.append(result['stderr'])
+                    show_status(f"Shard {index + 1} failed: {failure}", "error")
+                elif result['success']:
+                    shard['status'] = 'done'
+                    shard['duration'] = round(result['duration'], 2)
+                    stdout_parts.append(result['stdout'])
+                    stderr_parts.append(result['stderr'])
+                    logins = self.parse_hydra_output(result['stdout'])
+                    state['found'].extend(self._redact_login(login) for login in logins)
+                    if logins and stop_on_success:
+                        stop.set()
+                elif result.get('timed_out'):
+                    budget = shard_timeout * 2 ** shard.get('timeouts', 0)
+                    shard['timeouts'] = shard.get('timeouts', 0) + 1
+                    if shard['timeouts'] >= MAX_SHARD_TIMEOUTS:
+                        shard['status'] = 'gave_up'
+                        show_status(f"Shard {index + 1} exceeded its {format_time(budget)} budget "
+                                    f"{MAX_SHARD_TIMEOUTS} times, giving up on it", "error")
+                    else:
+                        shard['status'] = 'timeout'
+                        show_status(f"Shard {index + 1} exceeded its {format_time(budget)} budget, "
+                                    "it will be retried on resume with twice the budget", "warning")
+                else:
+                    shard['status'] = 'failed'
+                    show_status(f"Shard {index + 1} failed: {result['error']}", "error")
+                self._save_session_state(session_dir, state)
+
+        try:
+            if parallel > 1:
+                with ThreadPoolExecutor(max_workers=parallel) as executor:
+                    futures = [executor.submit(run_shard, index) for index in pending]
+                    try:
+                        for future in as_completed(futures):
+                            record(*future.result())
+                    except KeyboardInterrupt:
+                        # Before leaving the with block, which waits for every queued shard
+                        stop.set()
+                        for future in futures:
+                            future.cancel()
+                        raise
+            else:
+                for index in pending:
+                    record(*run_shard(index))
+                    if stop.is_set():
+                        break
+        except KeyboardInterrupt:
+            stop.set()
+            show_status(f"Interrupted, progress saved to {session_dir}", "warning")
+
+        done = sum(1 for shard in state['shards'] if shard['status'] == 'done')
+        return {
+            'success': True,
+            'stdout': ''.join(stdout_parts),
+            'previous_logins': previous_logins,
+            'stderr': ''.join(stderr_parts),
+            'return_code': 0,
+            'duration': time.time() - start_time,
+            'command': f"sharded hydra session {session_id}",
+            'target': target,
+            'service': service,
+            'session': session_dir,
+            'shards_done': done,
+            'shards_total': total
+        }
+
+    def _hydra_failure(self, result):
+        """
+        Why a finished Hydra run failed, or None: a non-zero exit code, or an [ERROR]
+        line before any try was made.
+        """
+        errors = [line.strip() for line in (result['stdout'] + result['stderr']).splitlines()
+                  if line.lstrip().startswith('[ERROR]')]
+        if result['return_code'] != 0:
+            return errors[0] if errors else f"Hydra exited with code {result['return_code']}"
+        if errors and not result['metrics']['tries_done'] and not self.parse_hydra_output(result['stdout']):
+            return errors[0]
+        return None
+
+    def _redact_login(self, login):
+        """A found login without its password, as kept in session state files."""
+        return {'username': login['username'],
+                'full_line': redact_login_line(login['full_line'])}
 
     def parse_hydra_output(self, output):
         """Parse Hydra output to extract successful logins."""
@@ -270,7 +831,30 @@ class HydraIntegration:
             return result
         
         print(f"\n  Attack completed in {result['duration']:.2f} seconds")
+
+        metrics = result.get('metrics')
+        if metrics and metrics['tries_done']:
+            print(f"  Throughput: {metrics['average_tries_per_min']:.0f} tries/min "
+                  f"with {metrics['threads']} threads "
+                  f"({metrics['tries_done']:,} tries, {metrics['percent_complete']:.1f}% of list)")
         
+        if result.get('session'):
+            print(f"  Session: {result['shards_done']}/{result['shards_total']} shards done "
+                  f"(state in {result['session']})")
+
+        if result.get('segments'):
+            print(f"  Adaptive run: {len(result['segments'])} segment(s), "
+                  f"best rate with {result['best_threads']} threads")
+            for segment in result['segments']:
+                print(f"    Segment {segment['segment']}: {segment['threads']} threads, "
+                      f"{segment['tries_per_min']:.0f} tries/min, {segment['error_rate']:.1%} errors")
+
+        if result.get('previous_logins'):
+            print(f"\n• {len(result['previous_logins'])} login(s) found by earlier runs of this session "
+                  "(recorded then, passwords not kept):")
+            for login in result['previous_logins']:
+                print(f"    {login['full_line']}")
+
         # Parse successful logins
         successful_logins = self.parse_hydra_output(result['stdout'])
         
@@ -281,6 +865,10 @@ class HydraIntegration:
                 print(f"    Password: {login['password']}")
                 print(f"    Full: {login['full_line']}")
                 print()
+                if self.results_store and result.get('target'):
+                    self.results_store.record_hydra_finding(result['target'], result.get('service'), login)
+            if self.results_store:
+                self.results_store.flush()
         else:
             print("\n❌ No successful logins found")
         
@@ -376,16 +964,46 @@ class HydraIntegration:
                 passlist = self.create_custom_wordlist(passwords)
         
         # Get additional options
-        threads = input("Number of threads (default 16): ").strip()
+        threads = input("Number of threads (default 16, 'auto' for adaptive tuning): ").strip().lower()
+        adaptive = threads == 'auto'
         threads = int(threads) if threads.isdigit() else 16
         
         port = input(f"Custom port (default {self.service_ports.get(service, 'auto')}): ").strip()
         port = int(port) if port.isdigit() else None
         
         verbose = input("Verbose output? (y/N): ").strip().lower() == 'y'
+
+        resumable = False
+        if not adaptive and not password:
+            resumable = input("Resumable session split into shards? (y/N): ").strip().lower() == 'y'
         
         # Run the attack
         print(f"\n Starting {service.upper()} attack on {target}...")
+
+        if adaptive and not password:
+            result = self.run_adaptive_attack(
+                target=target,
+                service=service,
+                username=username,
+                userlist=userlist,
+                passlist=passlist,
+                port=port,
+                verbose=verbose
+            )
+            return self.process_attack_result(result)
+
+        if resumable:
+            result = self.run_resumable_attack(
+                target=target,
+                service=service,
+                username=username,
+                userlist=userlist,
+                passlist=passlist,
+                port=port,
+                threads=threads,
+                verbose=verbose
+            )
+            return self.process_attack_result(result)
         
         result = self.run_hydra_attack(
             target=target,
@@ -0,0 +1,208 @@
+import math
+
+# Keyboard layouts: each token lists a key's unshifted and shifted character.
+# Slanted layouts are offset row by row like a real keyboard; keypads are aligned grids.
+
+QWERTY_LAYOUT = r'''
+`~ 1! 2@ 3# 4$ 5% 6^ 7& 8* 9( 0) -_ =+
+    qQ wW eE rR tT yY uU iI oO pP [{ ]} \|
+     aA sS dD fF gG hH jJ kK lL ;: '"
+      zZ xX cC vV bB nN mM ,< .> /?
+'''
+
+AZERTY_LAYOUT = r'''
+²³ &1 é2 "3 '4 (5 -6 è7 _8 ç9 à0 )° =+
+    aA zZ eE rR tT yY uU iI oO pP ^¨ $£
+     qQ sS dD fF gG hH jJ kK lL mM ù% *µ
+   <> wW xX cC vV bB nN ,? ;. :/ !§
+'''
+
+QWERTZ_LAYOUT = r'''
+^° 1! 2" 3§ 4$ 5% 6& 7/ 8( 9) 0= ß? ´`
+    qQ wW eE rR tT zZ uU iI oO pP üÜ +*
+     aA sS dD fF gG hH jJ kK lL öÖ äÄ #'
+   <> yY xX cC vV bB nN mM ,; .: -_
+'''
+
+KEYPAD_LAYOUT = r'''
+  / * -
+7 8 9 +
+4 5 6
+1 2 3
+  0 .
+'''
+
+MAC_KEYPAD_LAYOUT = r'''
+  = / *
+7 8 9 -
+4 5 6 +
+1 2 3
+  0 .
+'''
+
+# name: (layout, slanted)
+LAYOUTS = {
+    'qwerty': (QWERTY_LAYOUT, True),
+    'azerty': (AZERTY_LAYOUT, True),
+    'qwertz': (QWERTZ_LAYOUT, True),
+    'keypad': (KEYPAD_LAYOUT, False),
+    'mac_keypad': (MAC_KEYPAD_LAYOUT, False),
+}
+
+MIN_WALK_LENGTH = 3
+MAX_SEQUENCE_DELTA = 5
+
+
+def build_adjacency_graph(layout, slanted):
+    """Map each key character to its neighbouring key tokens (None where there is no key)."""
+    token_size = len(layout.split()[0])
+    x_unit = token_size + 1
+    positions = {}
+    for y, line in enumerate(layout.split('\n')):
+        slant = y - 1 if slanted else 0
+        for token in line.split():
+            x = (line.index(token) - slant) // x_unit
+            positions[(x, y)] = token
+
+    if slanted:
+        offsets = [(-1, 0), (0, -1), (1, -1), (1, 0), (0, 1), (-1, 1)]
+    else:
+        offsets = [(-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1)]
+
+    graph = {}
+    for (x, y), token in positions.items():
+        neighbours = [positions.get((x + dx, y + dy)) for dx, dy in offsets]
+        for char in token:
+            graph[char] = neighbours
+    return graph
+
+
+def build_pair_index(graph):
+    """Map each pair of adjacent characters to (direction, next character is shifted)."""
+    pairs = {}
+    for char, neighbours in graph.items():
+        for direction, token in enumerate(neighbours):
+            if token:
+                for shift, next_char in enumerate(token):
+                    pairs[(char, next_char)] = (direction, shift == 1)
+    return pairs
+
+
+def _graph_stats(graph):
+    """Number of keys and their average number of neighbours."""
+    keys = len(graph)
+    degree = sum(len([n for n in neighbours if n]) for neighbours in graph.values()) / keys
+    return keys, degree
+
+
+# Built once at import: a few thousand dict entries, a couple of milliseconds
+ADJACENCY_GRAPHS = {name: build_adjacency_graph(layout, slanted)
+                    for name, (layout, slanted) in LAYOUTS.items()}
+PAIR_INDEXES = {name: build_pair_index(graph) for name, graph in ADJACENCY_GRAPHS.items()}
+GRAPH_STATS = {name: _graph_stats(graph) for name, graph in ADJACENCY_GRAPHS.items()}
+SHIFTED_CHARS = {name: frozenset(token[1] for token in layout.split() if len(token) > 1)
+                 for name, (layout, _) in LAYOUTS.items()}
+
+
+def spatial_guesses(graph_name, length, turns, shifted_count):
+    """Guesses needed for a keyboard walk, as estimated by zxcvbn."""
+    keys, degree = GRAPH_STATS[graph_name]
+    guesses = 0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += math.comb(i - 1, j - 1) * keys * degree ** j
+    if shifted_count:
+        unshifted = length - shifted_count
+        if not unshifted:
+            guesses *= 2
+        else:
+            guesses *= sum(math.comb(shifted_count + unshifted, i)
+                           for i in range(1, min(shifted_count, unshifted) + 1))
+    return guesses
+
+
+def sequence_guesses(token, ascending):
+    """Guesses needed for a character sequence such as 'abcd' or '9753'."""
+    if token[0] in 'aAzZ019':
+        base = 4
+    elif token[0].isdigit():
+        base = 10
+    else:
+        base = 26
+    if not ascending:
+        base *= 2
+    return base * len(token)
+
+
+def find_patterns(password):
+    """
+    Find keyboard walks (on every layout, including shifted keys) and ascending or
+    descending character sequences in a single pass over the password.
+
+    Returns match dicts with 'pattern' ('spatial' or 'sequence'), the inclusive span
+    'i'..'j', 'token' and 'pattern_guesses'.
+    """
+    n = len(password)
+    matches = []
+    if n < 2:
+        return matches
+
+    # Per layout: [walk start, last direction, turns, shifted count]
+    walks = {name: [0, None, 0, 1 if password[0] in SHIFTED_CHARS[name] else 0]
+             for name in PAIR_INDEXES}
+    sequence_start = 0
+    last_delta = None
+
+    def close_walk(name, state, end):
+        start, _, turns, shifted_count = state
+        if end - start + 1 >= MIN_WALK_LENGTH:
+            matches.append({
+                'pattern': 'spatial',
+                'i': start, 'j': end,
+                'token': password[start:end + 1],
+                'graph': name,
+                'turns': turns,
+                'shifted_count': shifted_count,
+                'pattern_guesses': spatial_guesses(name, end - start + 1, turns, shifted_count)
+            })
+
+    def close_sequence(start, end, delta):
+        if (end - start > 1 or abs(delta) == 1) and 0 < abs(delta) <= MAX_SEQUENCE_DELTA:
+            token = password[start:end + 1]
+            matches.append({
+                'pattern': 'sequence',
+                'i': start, 'j': end,
+                'token': token,
+                'ascending': delta > 0,
+                'pattern_guesses': sequence_guesses(token, delta > 0)
+            })
+
+    for k in range(1, n):
+        previous, current = password[k - 1], password[k]
+
+        for name, pairs in PAIR_INDEXES.items():
+            state = walks[name]
+            adjacent = pairs.get((previous, current))
+            if adjacent:
+                direction, shifted = adjacent
+                if shifted:
+                    state[3] += 1
+                if direction != state[1]:
+                    state[2] += 1
+                    state[1] = direction
+            else:
+                close_walk(name, state, k - 1)
+                walks[name] = [k, None, 0, 1 if current in SHIFTED_CHARS[name] else 0]
+
+        delta = ord(current) - ord(previous)
+        if last_delta is None:
+            last_delta = delta
+        elif delta != last_delta:
+            close_sequence(sequence_start, k - 1, last_delta)
+            sequence_start = k - 1
+            last_delta = delta
+
+    for name, state in walks.items():
+        close_walk(name, state, n - 1)
+    close_sequence(sequence_start, n - 1, last_delta)
+    return matches
@@ -1,25 +1,109 @@
+import argparse
+import os
+
+from profiling import add_profile_arguments, run_entry_point
 from utils import print_banner, get_user_input
-from password_checker import PasswordChecker
-from email_checker import check_email_breach
-from hash_identifier import SecurityChecker 
-from hydra_integration import HydraIntegration
+
+
+class Subsystems:
+    """
+    Import and construct the tool's subsystems on first use.
+    Startup then only pays for the modules (and heavy dependencies) a session actually needs.
+    """
+
+    def __init__(self, policy_path=None, offline_breaches=False, store_passwords=False):
+        self.policy_path = policy_path
+        self.offline_breaches = offline_breaches
+        self.store_passwords = store_passwords
+        self._results_store = None
+        self._checker = None
+        self._security_checker = None
+        self._hydra = None
+        self._breach_index = None
+        self._breach_index_loaded = False
+
+    @property
+    def results_store(self):
+        if self._results_store is None:
+            from results_store import ResultsStore
+            self._results_store = ResultsStore(store_passwords=self.store_passwords)
+        return self._results_store
+
+    @property
+    def checker(self):
+        if self._checker is None:
+            from password_checker import PasswordChecker
+            self._checker = PasswordChecker(results_store=self.results_store,
+                                            policy_path=self.policy_path)
+        return self._checker
+
+    @property
+    def security_checker(self):
+        if self._security_checker is None:
+            from hash_identifier import SecurityChecker
+            self._security_checker = SecurityChecker(results_store=self.results_store)
+        return self._security_checker
+
+    @property
+    def breach_index(self):
+        """
+        The offline breach index when offline_breaches was requested (email checks then stay
+        local), else None. Raises FileNotFoundError if no index has been ingested.
+        """
+        if self.offline_breaches and not self._breach_index_loaded:
+            from breach_index import DEFAULT_INDEX_PATH, BreachIndex
+            if not os.path.exists(DEFAULT_INDEX_PATH):
+                raise FileNotFoundError(f"No breach index at {DEFAULT_INDEX_PATH}, "
+                                        f"ingest a corpus with breach_index.py first")
+            self._breach_index = BreachIndex(DEFAULT_INDEX_PATH)
+            self._breach_index_loaded = True
+        return self._breach_index
+
+    @property
+    def hydra(self):
+        if self._hydra is None:
+            from hydra_integration import HydraIntegration
+            self._hydra = HydraIntegration(results_store=self.results_store)
+        return self._hydra
+
+    def close(self):
+        if self._checker is not None:
+            self._checker.close()
+        if self._results_store is not None:
+            self._results_store.close()
+        if self._breach_index is not None:
+            self._breach_index.close()
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Interactive password and security checker.")
+    parser.add_argument("--offline-breaches", action="store_true",
+                        help="Answer email breach checks from the local breach index instead of HackCheck")
+    parser.add_argument("--store-passwords", action="store_true",
+                        help="Keep the passwords Hydra finds in the results database (redacted by default)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    subsystems = Subsystems(offline_breaches=args.offline_breaches, store_passwords=args.store_passwords)
+    try:
+        subsystems.breach_index
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return
+
     print_banner()  
-    checker = PasswordChecker()  
-    security_checker = SecurityChecker() 
-    hydra = HydraIntegration()
     
     while True:  
         choice = get_user_input()
         if choice.lower() == 'q':
             print("\nThank you for using the password checker. Goodbye!")
             print("\nExiting the Security Checker Tool. Stay safe!")
+            subsystems.close()
             break  # Exit the loop if user chooses 'q'
         
         elif choice == '1':
             password = input("Enter password to check: ")
-            result = checker.check_strength(password)
+            result = subsystems.checker.check_strength(password)
             
             # Print results
             if result['is_strong']:
@@ -33,31 +117,55 @@ def main():
                 for suggestion in result['suggestions']:
                     print(f"- {suggestion}")
                 
-                print(f"\nEntropy Score: {result['entropy_score']}/100")
+                print(f"\nStrength Score: {result['entropy_score']}/100")
+                print(f"Estimated Crack Time: {result['guess_estimate']['crack_time_display']}")
                 
             if result['wordlist_check']['found']:
                 print(f"\nWARNING: Password found in wordlist: {result['wordlist_check']['wordlist']}")
         
         elif choice == '2':
             email = input("Enter email to check: ")
-            check_email_breach(email)
+            from email_checker import check_email_breach
+            check_email_breach(email, subsystems.results_store, breach_index=subsystems.breach_index)
         
         elif choice == '3':
             password = input("Enter password to suggest improvements: ")
             print("\nGenerating stronger password...")
-            stronger_password = checker.suggest_stronger(password)
+            stronger_password = subsystems.checker.suggest_stronger(password)
             print(f"\nSuggested stronger password: {stronger_password}")
 
         elif choice == '4':
             hash_input = input("Enter the hash to identify: ")
-            security_checker.identify_hash(hash_input)
+            subsystems.security_checker.identify_hash(hash_input)
 
         elif choice == '5':
             # Hydra attack menu
-            hydra_menu(hydra)
+            hydra_menu(subsystems.hydra)
+
+        elif choice == '6':
+            results_menu(subsystems.results_store)
 
         else:
-            print("Invalid choice. Please choose 1, 2, 3, 4, 5, or Q.")
+            print("Invalid choice. Please choose 1, 2, 3, 4, 5, 6, or Q.")
+
+def results_menu(results_store):
+    """Query stored attack and audit results."""
+    tables = ['hydra_findings', 'password_audits', 'hash_classifications', 'breach_lookups']
+    print("\nStored results:")
+    for i, table in enumerate(tables, 1):
+        print(f"{i}. {table.replace('_', ' ').title()}")
+
+    table_choice = input(f"\nSelect results (1-{len(tables)}): ").strip()
+    if not table_choice.isdigit() or not 1 <= int(table_choice) <= len(tables):
+        print("Invalid choice.")
+        return
+    table = tables[int(table_choice) - 1]
+
+    target = input("Filter by target (press Enter to skip): ").strip() or None
+    user = input("Filter by user/email (press Enter to skip): ").strip() or None
+
+    from results_store import print_query_results
+    print_query_results(results_store.query(table, target=target, user=user))
 
 def hydra_menu(hydra):
     """Display Hydra attack menu and handle user choices."""
@@ -167,5 +275,4 @@ def hydra_menu(hydra):
             hydra_menu(hydra)
 
 if __name__ == "__main__":
-    import os
-    main()
\ No newline at end of file
+    run_entry_point(main)
\ No newline at end of file
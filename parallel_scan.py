@@ -0,0 +1,242 @@
+import argparse
+import mmap
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from profiling import add_profile_arguments, run_entry_point
+from wordlist_io import WordlistStream, is_compressed
+
+# Byte range handed to one task, and the block decoded at a time inside it
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+BLOCK_SIZE = 1024 * 1024
+
+# Scans that can run at once on one scanner; further scans wait for a free slot
+MAX_CONCURRENT_SCANS = 64
+
+# Set in each worker process by _init_worker: per slot, the id of the scan running in it (0 if none)
+_active_scans = None
+
+
+def _init_worker(active_scans):
+    global _active_scans
+    _active_scans = active_scans
+
+
+def _cancelled(slot, scan_id):
+    """True once the scan in slot has finished (a match was found elsewhere, or it was abandoned)."""
+    return _active_scans is not None and _active_scans[slot] != scan_id
+
+
+def split_ranges(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split a file into (start, end) byte ranges that begin and end on line boundaries."""
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    ranges = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                newline = mm.find(b'\n', end)
+                end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def count_lines(mm, start, end):
+    """Number of newlines in mm[start:end], counted a block at a time."""
+    count = 0
+    for position in range(start, end, BLOCK_SIZE):
+        count += mm[position:min(position + BLOCK_SIZE, end)].count(b'\n')
+    return count
+
+
+def scan_range(path, start, end, targets, slot, scan_id):
+    """
+    Look for a line equal (stripped, lowercased) to one of targets in path[start:end].
+    Returns the line number of the first match in the file (1-based), or None. Gives up
+    early once the scan is cancelled.
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines_before = 0
+        position = start
+        while position < end:
+            if _cancelled(slot, scan_id):
+                return None
+            block_end = min(position + BLOCK_SIZE, end)
+            if block_end < end:
+                newline = mm.rfind(b'\n', position, block_end)
+                if newline == -1:
+                    newline = mm.find(b'\n', block_end, end)
+                block_end = end if newline == -1 else newline + 1
+
+            lines = mm[position:block_end].decode('latin-1').lower().split('\n')
+            if not lines[-1]:
+                lines.pop()
+            # The membership test runs in C; lines are only walked once a block has a match
+            if not targets.isdisjoint(map(str.strip, lines)):
+                index = next(i for i, line in enumerate(lines) if line.strip() in targets)
+                return count_lines(mm, 0, start) + lines_before + index + 1
+            lines_before += len(lines)
+            position = block_end
+    return None
+
+
+def scan_stream(path, targets, slot, scan_id):
+    """
+    scan_range for a compressed wordlist, which has no byte ranges to split: the whole
+    file is decompressed block by block in one task. Returns the 1-based line number.
+    """
+    lines_before = 0
+    with WordlistStream(path) as f:
+        for lines in f.blocks():
+            if _cancelled(slot, scan_id):
+                return None
+            lines = '\n'.join(lines).lower().split('\n')
+            if not targets.isdisjoint(map(str.strip, lines)):
+                return lines_before + next(i for i, line in enumerate(lines) if line.strip() in targets) + 1
+            lines_before += len(lines)
+    return None
+
+
+class ParallelScanner:
+    """
+    Scan wordlists for a set of words with a process pool.
+
+    Every file is split into newline-aligned byte ranges over mmap, and all ranges of
+    all files are queued together so the workers stay busy across files. A compressed
+    file cannot be split and is decompressed by a single worker; those tasks are queued
+    first, as they are the longest. Each scan owns a slot of a shared array holding its
+    id while it runs; as soon as one range reports a match, the slot is cleared. Workers
+    check their scan's slot between blocks, and queued ranges are dropped, so concurrent
+    scans never cancel each other. The pool is started on first use and reused across
+    scans.
+    """
+
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._active_scans = None
+        self._scan_id = 0
+        self._lock = threading.Lock()
+        self._free_slots = list(range(MAX_CONCURRENT_SCANS))
+        self._slot_freed = threading.Condition(self._lock)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # forkserver/spawn: the checker may already run threads, which fork does not mix with
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                if self._active_scans is None:
+                    self._active_scans = context.RawArray('q', MAX_CONCURRENT_SCANS)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                                 initializer=_init_worker, initargs=(self._active_scans,))
+            return self._pool
+
+    def _start_scan(self):
+        """Take a free slot and a new scan id, and mark the scan running in the slot."""
+        with self._slot_freed:
+            while not self._free_slots:
+                self._slot_freed.wait()
+            slot = self._free_slots.pop()
+            self._scan_id += 1
+            self._active_scans[slot] = self._scan_id
+            return slot, self._scan_id
+
+    def _finish_scan(self, slot):
+        with self._slot_freed:
+            self._active_scans[slot] = 0
+            self._free_slots.append(slot)
+            self._slot_freed.notify()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def scan(self, wordlist_paths, words, progress=None):
+        """
+        Search the wordlists for any of words (compared stripped and lowercased).
+        Returns (path, line number, errors): the match, or None and None, and an
+        "Error reading <name>: <reason>" message for each wordlist that could not be
+        scanned (the others still are). If several lines match, whichever range finds
+        one first wins. progress (a BackgroundProgress) is advanced by the bytes of
+        each finished range.
+        """
+        targets = frozenset(word.lower() for word in words if word)
+        pool = self._get_pool()
+        slot, scan_id = self._start_scan()
+
+        futures = {}
+        errors = {}
+        for path in sorted(wordlist_paths, key=lambda path: not is_compressed(path)):
+            try:
+                if is_compressed(path):
+                    tasks = [((path, os.path.getsize(path)), (scan_stream, path, targets, slot, scan_id))]
+                else:
+                    tasks = [((path, end - start), (scan_range, path, start, end, targets, slot, scan_id))
+                             for start, end in split_ranges(path, self.chunk_size)]
+            except OSError as e:
+                errors[path] = f"Error reading {os.path.basename(path)}: {e}"
+                continue
+            for task, call in tasks:
+                futures[pool.submit(*call)] = task
+
+        try:
+            for future in as_completed(futures):
+                path, size = futures[future]
+                if progress is not None:
+                    progress.add(size)
+                try:
+                    line = future.result()
+                except Exception as e:
+                    errors.setdefault(path, f"Error reading {os.path.basename(path)}: {e}")
+                    continue
+                if line is not None:
+                    return path, line, list(errors.values())
+            return None, None, list(errors.values())
+        finally:
+            self._finish_scan(slot)
+            for future in futures:
+                future.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan wordlists for a password with a process pool.")
+    parser.add_argument("wordlists", nargs="+", help="Wordlists to scan")
+    parser.add_argument("--password", required=True, help="Word to look for")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024),
+                        help="Byte range per task")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    total_bytes = sum(os.path.getsize(path) for path in args.wordlists)
+    scanner = ParallelScanner(args.workers, args.chunk_mb * 1024 * 1024)
+    scanner._get_pool()
+    try:
+        start_time = time.perf_counter()
+        path, line, errors = scanner.scan(args.wordlists, [args.password])
+        elapsed = time.perf_counter() - start_time
+    finally:
+        scanner.close()
+
+    for error in errors:
+        print(f"❌ {error}")
+    if path:
+        print(f"⚠️  Found in {path} (line {line:,})")
+    else:
+        print("✅ Not found")
+    print(f"• {elapsed:.2f}s with {args.workers} worker(s) "
+          f"({total_bytes / (1024 * 1024) / elapsed if elapsed else 0:,.0f} MB/s)")
+
+
+if __name__ == "__main__":
+    run_entry_point(main)
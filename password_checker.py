@@ -1,23 +1,49 @@
+import os
 import re
 import hashlib
+import json
 import secrets
 import string
+import sys
+import threading
 import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-import requests
 import math
-from utils import ProgressIndicator, show_status, format_time, print_results_summary
+from utils import ProgressIndicator, BackgroundProgress, show_status, format_time, print_results_summary
+from guess_estimator import GUESSES_PER_SECOND, GuessEstimator, display_time, guesses_to_score
+from rank_dictionary import build_rank_tables, load_rank_tables, lookup_rank
+from keyboard_patterns import find_patterns
+from password_policy import DEFAULT_POLICIES, PolicySet, load_policies, print_verdicts
+from wordlist_io import WordlistStream, available_wordlists
+from password_history import PasswordHistory
+from strength_record import Check, Issue, StrengthRecord, check_context
+
+# log10(guesses) that maps to a strength score of 100
+MAX_GUESSES_LOG10 = 14
+
+# Keyboard walks and sequences of at least 4 characters guessable within this many tries
+COMMON_PATTERN_MAX_GUESSES = 10000
+
+
+def _silent(*args, **kwargs):
+    """Stand-in for show_status when running without console output."""
+
 
 class PasswordChecker:
-    def __init__(self, wordlist_paths=None, password_history=None):
-        self.min_length = 10
-        self.required_chars = {
-            'uppercase': r'[A-Z]',
-            'lowercase': r'[a-z]',
-            'numbers': r'[0-9]',
-            'special': r'[!@#$%^&*(),.?":{}|<>]'
-        }
+    def __init__(self, wordlist_paths=None, password_history=None, results_store=None, policy_path=None,
+                 wordlist_index=None, scan_workers=None, fuzzy_index=None, result_cache=None):
+        # Policies every password is checked against; the primary one decides is_strong
+        self.policies = load_policies(policy_path) if policy_path else PolicySet(DEFAULT_POLICIES)
+        self.char_classes = self.policies.char_classes
+        primary = self.policies.policies[self.policies.primary]
+        self.min_length = primary.get('min_length', 0)
+        self.required_chars = {name: self.char_classes[name] for name in primary.get('required_chars', [])}
+        # Bits of the character classes and of the primary policy in StrengthRecord masks
+        self._class_bits = {name: 1 << i for i, name in enumerate(self.char_classes)}
+        self._primary_bit = 1 << self.policies.names.index(self.policies.primary)
 
         # Default wordlist paths to check
         self.wordlist_paths = wordlist_paths or [
@@ -26,15 +52,58 @@ class PasswordChecker:
             "/usr/share/wordlists/dirb/common.txt"
         ]
 
-        # Store password history to prevent reuse
-        self.password_history = password_history or set()
+        # Password history per user, to prevent reuse and near reuse (a set of passwords is accepted too)
+        if not isinstance(password_history, PasswordHistory):
+            password_history = PasswordHistory(password_history or ())
+        self.password_history = password_history
+
+        # Optional ResultsStore that records audit results (never the password itself)
+        self.results_store = results_store
+
+        # Optional WordlistIndex: incrementally ingested segments used instead of per-list rank tables
+        self.wordlist_index = wordlist_index
+
+        # Optional FuzzyIndex for near matches; the default index file is used if it was built
+        # from the same wordlists
+        self.fuzzy_index = fuzzy_index
+        self._fuzzy_index_loaded = fuzzy_index is not None
+
+        # Rank tables of the wordlists and the guess estimator built on them, loaded on first use
+        self._rank_tables = None
+        self._guess_estimator = None
+
+        # HTTP session per thread, reused across breach lookups (keeps the HTTPS connection alive)
+        self._http = threading.local()
+
+        # Guards the lazily loaded members above and below when one checker serves many threads
+        self._init_lock = threading.RLock()
+
+        # Threads for the concurrent stages of check_strength, started on first use
+        self._stages = None
+
+        # Worker processes for full wordlist scans (None: scan in this thread)
+        self.scan_workers = scan_workers
+        self._scanner = None
+
+        # Optional ResultCache of check_strength results, for audits with many duplicate passwords
+        self.result_cache = result_cache
+        self._policy_digest = hashlib.sha256(json.dumps(
+            [self.policies.policies, self.char_classes, self.policies.primary], sort_keys=True, default=str
+        ).encode('utf-8')).hexdigest()
+
+    def check_password_compromise(self, password, verbose=True):
+        """
+        Check if password has been compromised using HaveIBeenPwned API with progress indicator.
+        verbose=False skips the spinner and status output (service mode).
+        """
+        import requests  # Deferred: requests/urllib3/ssl are slow to import
 
-    def check_password_compromise(self, password):
-        """Check if password has been compromised using HaveIBeenPwned API with progress indicator."""
         progress = ProgressIndicator()
+        status = show_status if verbose else _silent
         
-        show_status("Checking password against breach database", "security")
-        progress.spinner("Querying HaveIBeenPwned database")
+        status("Checking password against breach database", "security")
+        if verbose:
+            progress.spinner("Querying HaveIBeenPwned database")
         
         try:
             sha1_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
@@ -43,199 +112,528 @@ class PasswordChecker:
             url = f"https://api.pwnedpasswords.com/range/{prefix}"
             
             start_time = time.time()
-            response = requests.get(url, headers={"Add-Padding": "true"}, timeout=10)
+            session = getattr(self._http, 'session', None)
+            if session is None:
+                session = self._http.session = requests.Session()
+            response = session.get(url, headers={"Add-Padding": "true"}, timeout=10)
             end_time = time.time()
             
             progress.stop_spinner()
             
             query_time = end_time - start_time
-            show_status(f"Breach check completed in {format_time(query_time)}", "info")
+            status(f"Breach check completed in {format_time(query_time)}", "info")
             
             response.raise_for_status()
 
             for line in response.text.splitlines():
                 hash_suffix, count = line.split(":")
                 if hash_suffix == suffix:
-                    show_status(f"⚠️ Password found in {int(count):,} breaches!", "warning")
+                    status(f"⚠️ Password found in {int(count):,} breaches!", "warning")
                     return True, int(count)
             
-            show_status("✅ Password not found in known breaches", "success")
+            status("✅ Password not found in known breaches", "success")
             return False, 0
 
         except requests.RequestException as e:
             progress.stop_spinner()
-            show_status(f"Breach check failed: {str(e)}", "error")
+            status(f"Breach check failed: {str(e)}", "error")
             return None, f"API error: {str(e)}"
         except Exception as e:
             progress.stop_spinner()
-            show_status(f"Unexpected error during breach check: {str(e)}", "error")
+            status(f"Unexpected error during breach check: {str(e)}", "error")
             return None, f"Error: {str(e)}"
 
-    def check_strength(self, password):
+    def check_strength(self, password, username=None, verbose=True, check_breaches=True, short_circuit=False):
         """
         Check password strength including wordlist verification with progress indicators.
         Returns a dict with strength details and wordlist matches.
+        If a results store is configured, the result is recorded under username.
+        verbose=False runs without UI delays or console output; check_breaches=False skips
+        the HaveIBeenPwned lookup.
+
+        The HaveIBeenPwned lookup and the wordlist check run on stage threads while the
+        pattern checks and guess estimation run here, so a check takes about as long as
+        its slowest stage. With short_circuit=True, a password that already fails every
+        policy on the cheap checks skips the breach lookup and any full wordlist scan;
+        those checks are then marked 'skipped'.
+
+        With a result cache, a password checked before with the same options (and the
+        same wordlists, policies and history) is answered from the cache.
         """
-        show_status("Starting comprehensive password analysis", "security")
+        cache_key = context = None
+        if self.result_cache is not None:
+            cache_key = self.result_cache.key(password, username, check_breaches, short_circuit)
+            context = self._cache_context()
+            cached = self.result_cache.get(cache_key, context)
+            if cached is not None:
+                record, details = cached
+                result = self.result_dict(record, details)
+                if verbose:
+                    self._display_strength_results(result)
+                if self.results_store:
+                    self.results_store.record_password_audit(record, username)
+                return result
+
+        details = {}
+        record = self._analyze(password, username, verbose, check_breaches, short_circuit, details)
+        result = self.result_dict(record, details)
+
+        # A failed breach lookup is retried next time rather than cached
+        if cache_key is not None and not record.checks & Check.BREACH_FAILED:
+            self.result_cache.put(cache_key, context, (record, details))
+
+        # Display formatted results
+        if verbose:
+            self._display_strength_results(result)
+
+        if self.results_store:
+            self.results_store.record_password_audit(record, username)
         
-        issues = []
-        suggestions = []
+        return result
+
+    def check_strength_record(self, password, username=None, check_breaches=True, short_circuit=False,
+                              features=None):
+        """
+        Run check_strength's checks silently and return a compact StrengthRecord instead
+        of the dict: issue codes and numbers only, for audits of millions of passwords.
+        result_dict converts a record for display. features are the password's
+        password_features if already computed (batch_password_features).
+        """
+        cache_key = context = None
+        if self.result_cache is not None:
+            cache_key = self.result_cache.key(password, username, check_breaches, short_circuit, 'record')
+            context = self._cache_context()
+            record = self.result_cache.get(cache_key, context)
+            if record is not None:
+                if self.results_store:
+                    self.results_store.record_password_audit(record, username)
+                return record
+
+        record = self._analyze(password, username, False, check_breaches, short_circuit, features=features)
+        if cache_key is not None and not record.checks & Check.BREACH_FAILED:
+            self.result_cache.put(cache_key, context, record)
+        if self.results_store:
+            self.results_store.record_password_audit(record, username)
+        return record
+
+    def _analyze(self, password, username, verbose, check_breaches, short_circuit, details=None, features=None):
+        """
+        The checks of check_strength, as a StrengthRecord. What only the dict shows
+        (matched tokens, the repeated character, full stage results and policy
+        verdicts) is put into details, if given.
+        """
+        status = show_status if verbose else _silent
+        status("Starting comprehensive password analysis", "security")
+
+        issues = checks = 0
         analysis_steps = []
 
+        # Cheap checks first: they decide whether the expensive stages are needed
+        if features is None:
+            features = self.password_features(password)
+        common_patterns = self._has_common_patterns(password)
+        reused = self.password_history.used(password, username)
+        similar = [] if reused else self.password_history.find_similar(password, username)
+        decided = short_circuit and not any(
+            verdict['passed'] for verdict in
+            self.policies.evaluate(self._policy_facts(features, None, common_patterns, reused)).values())
+
+        # Expensive stages start now and run concurrently with the rest of the analysis
+        wordlists = available_wordlists(self.wordlist_paths)
+        indexed = bool(wordlists) and self._has_rank_tables(wordlists)
+        stages = self._stage_pool()
+        breach_future = wordlist_future = None
+        if check_breaches and not decided:
+            breach_future = stages.submit(self.check_password_compromise, password, False)
+        scan_progress = None
+        if indexed or not decided:
+            # The stage thread prints nothing: its progress is drawn here, once this thread waits for it
+            if verbose and wordlists and not indexed:
+                scan_progress = self._scan_progress(wordlists)
+            wordlist_future = stages.submit(self.check_in_wordlists, password, scan_progress)
+
+        record = StrengthRecord(length=features['length'], max_run=features['max_run'],
+                                max_char_count=features['max_char_count'],
+                                classes=sum(bit for name, bit in self._class_bits.items() if features[name]))
+
         # Step 1: Basic checks
-        show_status("Performing basic strength checks", "info")
-        time.sleep(0.2)  # Small delay for UI feedback
+        status("Performing basic strength checks", "info")
+        if verbose:
+            time.sleep(0.2)  # Small delay for UI feedback
         
         # Check length
-        if len(password) < self.min_length:
-            issues.append(f"Password must be at least {self.min_length} characters")
-            suggestions.append(f"Add {self.min_length - len(password)} more characters")
+        if features['length'] < self.min_length:
+            issues |= Issue.TOO_SHORT
         analysis_steps.append("✅ Length check completed")
 
         # Check required character types
-        missing_chars = []
-        for char_type, pattern in self.required_chars.items():
-            if not re.search(pattern, password):
-                missing_chars.append(char_type)
-                issues.append(f"Missing {char_type} character")
-                suggestions.append(f"Add at least one {char_type} character")
+        if not all(features[char_type] for char_type in self.required_chars):
+            issues |= Issue.MISSING_CHARS
         analysis_steps.append("✅ Character type validation completed")
 
         # Step 2: Pattern analysis
-        show_status("Analyzing password patterns", "info")
-        time.sleep(0.3)
+        status("Analyzing password patterns", "info")
+        if verbose:
+            time.sleep(0.3)
         
         # Check for common patterns
-        if self._has_common_patterns(password):
-            issues.append("Contains common patterns")
-            suggestions.append("Avoid keyboard patterns and common sequences")
+        if common_patterns:
+            issues |= Issue.COMMON_PATTERNS
+            if details is not None:
+                details['keyboard_patterns'] = self._find_keyboard_patterns(password)
         analysis_steps.append("✅ Pattern analysis completed")
 
         # Check character repetition
-        char_counts = Counter(password)
-        most_common = char_counts.most_common(1)[0]
-        if most_common[1] >= 3:
-            issues.append(f"Character '{most_common[0]}' is repeated {most_common[1]} times")
-            suggestions.append("Avoid repeating characters")
+        if features['max_char_count'] >= 3:
+            issues |= Issue.REPEATED_CHARS
+            if details is not None:
+                details['most_common_char'] = features['most_common_char']
         analysis_steps.append("✅ Repetition analysis completed")
 
-        # Step 3: Wordlist check
-        show_status("Checking against common wordlists", "info")
-        wordlist_result = self.check_in_wordlists_with_progress(password)
+        # Step 3: Crack time estimation, on this thread while the stages run
+        status("Estimating guesses needed to crack the password", "info")
+        guess_estimate = self.estimate_guesses(password)
+        record.guesses = guess_estimate['guesses']
+        record.score = self._guesses_to_score(guess_estimate['guesses'])
+        if guess_estimate['score'] < 3:
+            issues |= Issue.QUICK_CRACK
+        analysis_steps.append("✅ Crack time estimation completed")
+
+        # Step 4: Wordlist check (joined)
+        status("Checking against common wordlists", "info")
+        if wordlist_future is not None:
+            if scan_progress is not None and not wordlist_future.done():
+                scan_progress.start()
+            try:
+                wordlist_result = wordlist_future.result()
+            finally:
+                if scan_progress is not None:
+                    scan_progress.stop()
+            if verbose and wordlists:
+                self._report_wordlist_result(wordlist_result, indexed)
+            elif verbose:
+                show_status("No wordlists found for checking", "warning")
+            analysis_steps.append("✅ Wordlist check completed")
+        else:
+            wordlist_result = {'found': False, 'wordlist': None, 'rank': None, 'error': None, 'skipped': True}
+            checks |= Check.WORDLIST_SKIPPED
+            analysis_steps.append("⏭️ Wordlist scan skipped (already weak)")
+        if wordlist_result['error']:
+            checks |= Check.WORDLIST_ERROR
         if wordlist_result['found']:
-            issues.append(f"Password found in wordlist: {wordlist_result['wordlist']}")
-            suggestions.append("Choose a less common password")
-        analysis_steps.append("✅ Wordlist check completed")
-
-        # Step 4: Entropy calculation
-        show_status("Calculating password entropy", "info")
-        time.sleep(0.2)
-        entropy_score = self._calculate_shannon_entropy(password)
-        analysis_steps.append("✅ Entropy calculation completed")
-
-        # Step 5: Breach check
-        is_compromised, count = self.check_password_compromise(password)
+            issues |= Issue.IN_WORDLIST
+            record.wordlist = sys.intern(wordlist_result['wordlist'])
+            record.rank = wordlist_result['rank'] or 0
+
+        # Near matches: a known password with a character or two changed
+        near_match = None
+        if not wordlist_result['found']:
+            near_match = self.check_near_matches(password)
+            if near_match.get('skipped'):
+                checks |= Check.NEAR_MATCH_SKIPPED
+            if near_match['found']:
+                issues |= Issue.NEAR_MATCH
+                record.near_distance = near_match['matches'][0]['distance']
+                record.near_rank = near_match['matches'][0]['rank']
+
+        # Step 5: Breach check (joined)
+        if check_breaches and breach_future is None:
+            checks |= Check.BREACH_SKIPPED
+        if breach_future is not None:
+            is_compromised, count = breach_future.result()
+            if is_compromised:
+                status(f"⚠️ Password found in {count:,} breaches!", "warning")
+            elif is_compromised is None:
+                status(f"Breach check failed: {count}", "error")
+                checks |= Check.BREACH_FAILED
+            else:
+                status("✅ Password not found in known breaches", "success")
+            if is_compromised is not None:
+                checks |= Check.BREACH_CHECKED
+                record.breaches = count
+        else:
+            is_compromised = None
         if is_compromised:
-            issues.append(f"Password found in {count:,} data breaches")
-            suggestions.append("Choose a password that hasn't been compromised")
+            issues |= Issue.BREACHED
 
         # Step 6: History check
-        if password in self.password_history:
-            issues.append("Password has been used previously")
-            suggestions.append("Choose a unique password")
+        if reused:
+            issues |= Issue.REUSED
+        elif similar:
+            issues |= Issue.NEAR_REUSE
+            closest = similar[0]
+            record.history_distance = -1 if closest['distance'] is None else closest['distance']
+            record.history_similarity = closest['similarity']
         analysis_steps.append("✅ History check completed")
 
+        # Step 7: Policy verdicts, all policies in one evaluation
+        facts = self._policy_facts(features, record.score, common_patterns, reused,
+                                   in_wordlist=wordlist_result['found'], breached=is_compromised)
+        for mask in self.policies.failures(facts).values():
+            record.failed_policies |= mask
+        analysis_steps.append("✅ Policy evaluation completed")
+
         # Final analysis
-        show_status("Finalizing analysis", "info")
-        is_strong = (len(issues) == 0 and 
-                     entropy_score >= 70 and 
-                     not wordlist_result['found'] and not is_compromised)
+        status("Finalizing analysis", "info")
+        if not issues and not record.failed_policies & self._primary_bit:
+            checks |= Check.STRONG
+        record.issues = int(issues)
+        record.checks = int(checks)
 
         # Display analysis summary
-        print("\n Analysis Steps Completed:")
-        for step in analysis_steps:
-            print(f"   {step}")
-
+        if verbose:
+            print("\n Analysis Steps Completed:")
+            for step in analysis_steps:
+                print(f"   {step}")
+
+        if details is not None:
+            details.update(guess_estimate=guess_estimate, wordlist_check=wordlist_result, near_match=near_match,
+                           history_matches=similar, policies=self.policies.evaluate(facts))
+        return record
+
+    def _messages(self, record, details):
+        """The issue and suggestion messages of a record, in check order."""
+        issues, suggestions = [], []
+        if record.issues & Issue.TOO_SHORT:
+            issues.append(f"Password must be at least {self.min_length} characters")
+            suggestions.append(f"Add {self.min_length - record.length} more characters")
+        if record.issues & Issue.MISSING_CHARS:
+            for char_type in self.required_chars:
+                if not record.classes & self._class_bits[char_type]:
+                    issues.append(f"Missing {char_type} character")
+                    suggestions.append(f"Add at least one {char_type} character")
+        if record.issues & Issue.COMMON_PATTERNS:
+            issues.append("Contains common patterns")
+            suggestions.append("Avoid keyboard patterns and common sequences")
+            for match in details.get('keyboard_patterns', ()):
+                kind = 'Keyboard walk' if match['pattern'] == 'spatial' else 'Sequence'
+                issues.append(f"{kind} '{match['token']}' is guessable in about {round(match['pattern_guesses']):,} tries")
+        if record.issues & Issue.REPEATED_CHARS:
+            if 'most_common_char' in details:
+                issues.append(f"Character '{details['most_common_char']}' is repeated {record.max_char_count} times")
+            else:
+                issues.append(f"A character is repeated {record.max_char_count} times")
+            suggestions.append("Avoid repeating characters")
+        if record.issues & Issue.IN_WORDLIST:
+            issues.append(f"Password found in wordlist: {record.wordlist}")
+            suggestions.append("Choose a less common password")
+            if record.rank:
+                issues.append(f"Password would be guessed within the first "
+                              f"{record.rank:,} guesses of {record.wordlist}")
+        if record.issues & Issue.NEAR_MATCH:
+            if record.near_distance:
+                issues.append(f"Password is {record.near_distance} edit(s) away from a known password "
+                              f"(rank {record.near_rank:,})")
+            else:
+                issues.append(f"Password matches a known password (rank {record.near_rank:,})")
+            suggestions.append("Don't build on a leaked password by changing a character or two")
+        if record.issues & Issue.QUICK_CRACK:
+            issues.append(f"Password could be cracked in {display_time(record.guesses / GUESSES_PER_SECOND)}")
+            suggestions.append("Use a longer password without words, dates or keyboard patterns")
+        if record.issues & Issue.BREACHED:
+            issues.append(f"Password found in {record.breaches:,} data breaches")
+            suggestions.append("Choose a password that hasn't been compromised")
+        if record.issues & Issue.REUSED:
+            issues.append("Password has been used previously")
+            suggestions.append("Choose a unique password")
+        elif record.issues & Issue.NEAR_REUSE:
+            detail = (f"{record.history_distance} edit(s)" if record.history_distance >= 0
+                      else f"{record.history_similarity:.0%} similar")
+            issues.append(f"Password is too close to a previous password ({detail})")
+            suggestions.append("Don't rotate passwords by changing a digit or symbol")
+        return issues, suggestions
+
+    def result_dict(self, record, details=None):
+        """
+        The check_strength dict of a StrengthRecord, with its issue and suggestion messages.
+        Without the details of the check, the parts a record does not keep (matched
+        tokens and words, the repeated character, older history matches) are left out.
+        """
+        details = details or {}
+        issues, suggestions = self._messages(record, details)
+
+        guess_estimate = details.get('guess_estimate')
+        if guess_estimate is None:
+            seconds = record.guesses / GUESSES_PER_SECOND
+            guess_estimate = {'guesses': record.guesses,
+                              'guesses_log10': math.log10(record.guesses) if record.guesses > 0 else 0.0,
+                              'score': guesses_to_score(record.guesses), 'crack_time_seconds': seconds,
+                              'crack_time_display': display_time(seconds), 'patterns': []}
+
+        wordlist_check = details.get('wordlist_check')
+        if wordlist_check is None:
+            found = bool(record.issues & Issue.IN_WORDLIST)
+            wordlist_check = {'found': found, 'wordlist': record.wordlist, 'rank': record.rank or None,
+                              'error': "Error reading a wordlist" if record.checks & Check.WORDLIST_ERROR else None}
+            if record.checks & Check.WORDLIST_SKIPPED:
+                wordlist_check['skipped'] = True
+
+        if 'near_match' in details:
+            near_match = details['near_match']
+        elif record.issues & Issue.IN_WORDLIST:
+            near_match = None
+        elif record.checks & Check.NEAR_MATCH_SKIPPED:
+            near_match = {'found': False, 'matches': [], 'skipped': True}
+        else:
+            found = bool(record.issues & Issue.NEAR_MATCH)
+            near_match = {'found': found, 'matches': [{'distance': record.near_distance,
+                                                        'rank': record.near_rank}] if found else []}
+
+        history_matches = details.get('history_matches')
+        if history_matches is None:
+            history_matches = [{'distance': record.history_distance if record.history_distance >= 0 else None,
+                                'similarity': record.history_similarity}] if record.issues & Issue.NEAR_REUSE else []
+
+        breached = record.breaches > 0 if record.checks & Check.BREACH_CHECKED else None
         result = {
-            'is_strong': is_strong,
+            'is_strong': record.is_strong,
             'issues': issues,
             'suggestions': suggestions,
-            'entropy_score': entropy_score,
-            'wordlist_check': wordlist_result,
-            'breach_check': {'found': is_compromised, 'count': count if isinstance(count, int) else 0}
+            'entropy_score': record.score,
+            'guess_estimate': guess_estimate,
+            'wordlist_check': wordlist_check,
+            'near_match': near_match,
+            'history_matches': history_matches,
+            'breach_check': {'found': breached, 'count': record.breaches},
+            'policies': details.get('policies') or self.policies.evaluate(self._record_facts(record))
         }
-
-        # Display formatted results
-        self._display_strength_results(result)
-        
+        if record.checks & Check.BREACH_SKIPPED:
+            result['breach_check']['skipped'] = True
         return result
 
-    def check_in_wordlists_with_progress(self, password):
+    def _record_facts(self, record):
+        """The policy facts of a StrengthRecord (see _policy_facts)."""
+        facts = {name: bool(record.classes & bit) for name, bit in self._class_bits.items()}
+        facts.update(length=record.length, max_run=record.max_run, max_char_count=record.max_char_count,
+                     score=record.score, common_patterns=bool(record.issues & Issue.COMMON_PATTERNS),
+                     in_wordlist=bool(record.issues & Issue.IN_WORDLIST),
+                     breached=record.breaches > 0 if record.checks & Check.BREACH_CHECKED else None,
+                     reused=bool(record.issues & Issue.REUSED))
+        return facts
+
+    def record_context(self):
         """
-        Check if password exists in any of the specified wordlists with progress indicator.
-        Returns dict with 'found' status and wordlist name if found.
+        What the bitmasks of this checker's StrengthRecords refer to, for ResultWriter.
+        Raises ValueError if the checker has more character classes or policies than they hold.
         """
-        progress = ProgressIndicator()
-        result = {
-            'found': False,
-            'wordlist': None,
-            'error': None
-        }
-
-        # Generate variations to check
-        variations = self._generate_common_variations(password)
-        
-        # Check which wordlists exist
-        available_wordlists = [p for p in self.wordlist_paths if Path(p).exists()]
-        
-        if not available_wordlists:
-            show_status("No wordlists found for checking", "warning")
-            return result
-
-        show_status(f"Checking against {len(available_wordlists)} wordlist(s)", "info")
-
-        for i, wordlist_path in enumerate(available_wordlists):
+        context = {'char_classes': list(self.char_classes), 'required_chars': list(self.required_chars),
+                   'min_length': self.min_length, 'policies': self.policies.names, 'primary': self.policies.primary}
+        check_context(context)
+        return context
+
+    def _cache_context(self):
+        """What cached check_strength results depend on besides the password and options."""
+        wordlists = tuple((path, os.path.getsize(path), os.path.getmtime(path))
+                          for path in available_wordlists(self.wordlist_paths))
+        index = tuple(segment.path for segment in self.wordlist_index.segments()) if self.wordlist_index else None
+        fuzzy = self._get_fuzzy_index()
+        fuzzy = (fuzzy.path, os.path.getmtime(fuzzy.path)) if fuzzy is not None else None
+        return (wordlists, index, fuzzy, self._policy_digest, self.password_history.fingerprint())
+
+    def _parallel_scan(self, wordlists, variations, progress=None):
+        """Scan the wordlists on worker processes, stopping all of them at the first match."""
+        if self._scanner is None:
+            from parallel_scan import ParallelScanner
+            with self._init_lock:
+                if self._scanner is None:
+                    self._scanner = ParallelScanner(self.scan_workers)
+        path, line, errors = self._scanner.scan(wordlists, variations, progress)
+        error = '; '.join(errors) or None
+        if path is None:
+            return {'found': False, 'wordlist': None, 'rank': None, 'error': error}
+        return {'found': True, 'wordlist': Path(path).name, 'rank': line, 'error': error}
+
+    def _serial_scan(self, wordlists, variations, progress=None):
+        """
+        Scan the wordlists in this process, with the matching rule of the parallel scan:
+        a line matches if, stripped and lowercased, it equals a lowercased variation.
+        """
+        lowered = {v.lower() for v in variations}
+        errors = []
+        scanned_bytes = 0
+        for wordlist_path in wordlists:
             path = Path(wordlist_path)
-            progress.simple_progress_bar(i, len(available_wordlists), 
-                                       prefix=f"Scanning {path.name}")
-            
+            if progress is not None:
+                progress.label = path.name
             try:
-                with open(path, 'r', encoding='latin-1', errors='ignore') as f:
+                with WordlistStream(path) as f:
                     line_count = 0
                     for line in f:
                         line_count += 1
-                        word = line.strip().lower()
-                        if word in [v.lower() for v in variations]:
-                            result['found'] = True
-                            result['wordlist'] = path.name
-                            progress.simple_progress_bar(len(available_wordlists), 
-                                                       len(available_wordlists), 
-                                                       prefix="Wordlist check")
-                            show_status(f"⚠️ Password found in {path.name} (line {line_count})", "warning")
-                            return result
-                        
-                        # Show progress for large files
-                        if line_count % 100000 == 0:
-                            show_status(f"Processed {line_count:,} entries in {path.name}...", "info")
-
+                        if line.strip().lower() in lowered:
+                            if progress is not None:
+                                progress.current = progress.total
+                            return {'found': True, 'wordlist': path.name, 'rank': line_count,
+                                    'error': '; '.join(errors) or None}
+                        if progress is not None and not line_count & 0xFFF:
+                            progress.current = scanned_bytes + f.position
             except Exception as e:
-                result['error'] = f"Error reading {path.name}: {str(e)}"
-                show_status(f"Error reading {path.name}: {str(e)}", "error")
-                continue
+                errors.append(f"Error reading {path.name}: {str(e)}")
+            scanned_bytes += os.path.getsize(path)
+            if progress is not None:
+                progress.current = scanned_bytes
+        return {'found': False, 'wordlist': None, 'rank': None, 'error': '; '.join(errors) or None}
+
+    def _stage_pool(self):
+        """Thread pool running the network and disk stages of check_strength."""
+        if self._stages is None:
+            with self._init_lock:
+                if self._stages is None:
+                    self._stages = ThreadPoolExecutor(max_workers=8, thread_name_prefix="check-stage")
+        return self._stages
+
+    def check_in_wordlists_with_progress(self, password):
+        """
+        Check if password exists in any of the specified wordlists with progress indicator.
+        Returns dict with 'found' status and wordlist name if found.
+        """
+        wordlists = available_wordlists(self.wordlist_paths)
+        if not wordlists:
+            show_status("No wordlists found for checking", "warning")
+            return {'found': False, 'wordlist': None, 'rank': None, 'error': None}
 
-        progress.simple_progress_bar(len(available_wordlists), len(available_wordlists), 
-                                   prefix="Wordlist check")
-        show_status("Password not found in any wordlist", "success")
+        indexed = self._has_rank_tables(wordlists)
+        progress = None if indexed else self._scan_progress(wordlists)
+        if progress is not None:
+            show_status(f"Checking against {len(wordlists)} wordlist(s)", "info")
+            progress.start()
+        try:
+            result = self.check_in_wordlists(password, progress)
+        finally:
+            if progress is not None:
+                progress.stop()
+        self._report_wordlist_result(result, indexed)
         return result
 
+    def _scan_progress(self, wordlists):
+        """Progress of a full scan of the wordlists; the scan bumps its counter, whoever starts it draws it."""
+        total_bytes = sum(os.path.getsize(p) for p in wordlists)
+        return BackgroundProgress(total_bytes, prefix="Scanning wordlists", unit="MB", unit_size=1024 * 1024)
+
+    def _report_wordlist_result(self, result, indexed):
+        """Print the outcome of a wordlist check (rank tables report ranks, scans line numbers)."""
+        if result['error']:
+            show_status(result['error'], "error")
+        if result['found']:
+            where = f"rank {result['rank']:,}" if indexed else f"line {result['rank']:,}"
+            show_status(f"⚠️ Password found in {result['wordlist']} ({where})", "warning")
+        else:
+            show_status("Password not found in any wordlist", "success")
+
     def _display_strength_results(self, result):
         """Display formatted password strength results."""
         print_results_summary({
             'Overall Strength': 'STRONG' if result['is_strong'] else 'WEAK',
-            'Entropy Score': f"{result['entropy_score']}/100",
+            'Strength Score': f"{result['entropy_score']}/100",
+            'Estimated Crack Time': result['guess_estimate']['crack_time_display'],
             'Issues Found': len(result['issues']),
-            'In Wordlist': 'Yes' if result['wordlist_check']['found'] else 'No',
-            'In Breaches': 'Yes' if result['breach_check']['found'] else 'No'
+            'In Wordlist': 'Skipped' if result['wordlist_check'].get('skipped') else
+                           'Yes' if result['wordlist_check']['found'] else 'No',
+            'Wordlist Rank': f"{result['wordlist_check']['rank']:,}" if result['wordlist_check']['rank'] else 'n/a',
+            'Near Match': 'n/a' if not result.get('near_match') or result['near_match'].get('skipped') else
+                          'Yes' if result['near_match']['found'] else 'No',
+            'In Breaches': 'Skipped' if result['breach_check'].get('skipped') else
+                           'Yes' if result['breach_check']['found'] else 'No'
         }, "Password Strength Analysis")
 
         if result['issues']:
@@ -248,6 +646,10 @@ class PasswordChecker:
             for i, suggestion in enumerate(result['suggestions'], 1):
                 print(f"   {i}. {suggestion}")
 
+        if len(result['policies']) > 1:
+            print("\n Policy Verdicts:")
+            print_verdicts(self.policies, result['policies'])
+
     def _generate_common_variations(self, password):
         """Generate common password variations to check against wordlist."""
         variations = {password.lower(), password}
@@ -268,11 +670,24 @@ class PasswordChecker:
 
         return variations
 
+    def _find_keyboard_patterns(self, password):
+        """Return the easily guessed keyboard walks and sequences, skipping spans inside longer ones."""
+        best = {}
+        for match in find_patterns(password):
+            if len(match['token']) < 4 or match['pattern_guesses'] >= COMMON_PATTERN_MAX_GUESSES:
+                continue
+            span = (match['i'], match['j'])
+            if span not in best or match['pattern_guesses'] < best[span]['pattern_guesses']:
+                best[span] = match
+        return sorted((match for (i, j), match in best.items()
+                       if not any(a <= i and j <= b and (a, b) != (i, j) for a, b in best)),
+                      key=lambda match: match['i'])
+
     def _has_common_patterns(self, password):
         """Check for common weak patterns in password."""
+        if self._find_keyboard_patterns(password):
+            return True
         common_patterns = [
-            r'12345',
-            r'qwerty',
             r'password',
             r'admin',
             r'([a-zA-Z0-9])\1{2,}', 
@@ -281,6 +696,186 @@ class PasswordChecker:
         ]
         return any(re.search(pattern, password) for pattern in common_patterns)
 
+    def _get_rank_tables(self):
+        """Load (building small ones on demand) the rank tables of the configured wordlists."""
+        if self.wordlist_index is not None:
+            return self.wordlist_index.segments()
+        if self._rank_tables is None:
+            with self._init_lock:
+                if self._rank_tables is None:
+                    self._rank_tables = load_rank_tables(self.wordlist_paths)
+        return self._rank_tables
+
+    @contextmanager
+    def _reading_rank_tables(self):
+        """The rank tables to query, held open meanwhile (index segments may be compacted)."""
+        if self.wordlist_index is not None:
+            with self.wordlist_index.reading() as segments:
+                yield segments
+        else:
+            yield self._get_rank_tables()
+
+    def _has_rank_tables(self, wordlists):
+        """Check that every given wordlist has a loaded rank table (or is fully indexed)."""
+        if self.wordlist_index is not None:
+            return all(self.wordlist_index.covers(wordlist) for wordlist in wordlists)
+        indexed = {table.source for table in self._get_rank_tables()}
+        return all(wordlist in indexed for wordlist in wordlists)
+
+    def _get_fuzzy_index(self):
+        """
+        The fuzzy index given to the constructor, else the default one if it has been
+        built from this checker's wordlists (and they have not changed since).
+        """
+        if not self._fuzzy_index_loaded:
+            from fuzzy_index import DEFAULT_INDEX_PATH, FuzzyIndex
+            with self._init_lock:
+                if not self._fuzzy_index_loaded:
+                    if os.path.exists(DEFAULT_INDEX_PATH):
+                        index = FuzzyIndex(DEFAULT_INDEX_PATH)
+                        if index.covers(self.wordlist_paths):
+                            self.fuzzy_index = index
+                        else:
+                            index.close()
+                            show_status(f"Fuzzy index {DEFAULT_INDEX_PATH} was built from other or older "
+                                        f"wordlists; near matches are skipped until it is rebuilt "
+                                        f"(python fuzzy_index.py build)", "warning")
+                    self._fuzzy_index_loaded = True
+        return self.fuzzy_index
+
+    def check_near_matches(self, password, max_distance=None):
+        """
+        Find known passwords within a few edits of password (case-insensitive) using
+        the fuzzy index. Returns dict with 'found' and 'matches' (word, distance, rank),
+        skipped when no index has been built.
+        """
+        index = self._get_fuzzy_index()
+        if index is None:
+            return {'found': False, 'matches': [], 'skipped': True}
+        matches = index.lookup(password, max_distance)
+        return {'found': bool(matches), 'matches': matches}
+
+    def _check_in_rank_tables(self, variations):
+        """
+        Look up password variations in the rank tables (case-insensitive, O(1) per lookup).
+        Returns the best rank of any variation across all tables and the wordlist it is from.
+        """
+        with self._reading_rank_tables() as rank_tables:
+            found = [match for match in (lookup_rank(rank_tables, v) for v in variations) if match[0] is not None]
+        if not found:
+            return {'found': False, 'wordlist': None, 'rank': None}
+        rank, wordlist = min(found)
+        return {'found': True, 'wordlist': wordlist, 'rank': rank}
+
+    def estimate_guesses(self, password):
+        """
+        Estimate the guesses an attacker needs, zxcvbn style.
+        Returns guesses, their log10, a 0-4 score, crack time and the matched patterns.
+        """
+        with self._reading_rank_tables() as rank_tables:
+            estimator = self._guess_estimator
+            if estimator is None or estimator.rank_tables is not rank_tables:
+                with self._init_lock:
+                    estimator = self._guess_estimator
+                    if estimator is None or estimator.rank_tables is not rank_tables:
+                        estimator = self._guess_estimator = GuessEstimator(rank_tables)
+            estimate = estimator.estimate(password)
+
+        estimate['patterns'] = [(match['pattern'], match['token']) for match in estimate.pop('sequence')]
+        return estimate
+
+    def _guesses_to_score(self, guesses):
+        """Map estimated guesses onto the 0-100 strength score (10^14 guesses or more is 100)."""
+        if guesses <= 1:
+            return 0
+        return round(min(100, math.log10(guesses) * 100 / MAX_GUESSES_LOG10), 2)
+
+    def _policy_facts(self, features, score, common_patterns, reused, in_wordlist=None, breached=None):
+        """Facts the policy rules are evaluated on; None means the check did not run."""
+        return {
+            **features,
+            'score': score,
+            'common_patterns': common_patterns,
+            'in_wordlist': in_wordlist,
+            'breached': breached,
+            'reused': reused
+        }
+
+    def check_policies(self, password, username=None):
+        """
+        Evaluate every policy on local checks only (no wordlist scan or breach lookup).
+        Returns {policy: {'passed': bool, 'failed': [rule, ...]}}.
+        """
+        score = self._guesses_to_score(self.estimate_guesses(password)['guesses'])
+        facts = self._policy_facts(self.password_features(password), score, self._has_common_patterns(password),
+                                   self.password_history.used(password, username))
+        return self.policies.evaluate(facts)
+
+    def warm_up(self, build_indexes=False):
+        """
+        Load the rank tables, fuzzy index and guess estimator now instead of on the first check.
+        build_indexes also indexes the wordlists too large to index on demand (their rank
+        tables, or the wordlist index if one is used), so no check falls back to a full scan.
+        Returns the names of the wordlists indexed.
+        """
+        built = []
+        wordlists = available_wordlists(self.wordlist_paths)
+        if build_indexes and wordlists and not self._has_rank_tables(wordlists):
+            if self.wordlist_index is not None:
+                self.wordlist_index.sync(wordlists)
+                built = [Path(w).name for w in wordlists]
+            else:
+                built = [Path(stats['wordlist']).name for stats in build_rank_tables(wordlists)
+                         if stats['words'] is not None]
+                with self._init_lock:
+                    self._rank_tables = None
+        self.estimate_guesses("warm-up")
+        self._get_fuzzy_index()
+        return built
+
+    def password_features(self, password):
+        """
+        Compute the per-password features used by check_strength: length, presence of
+        each character class, most repeated character and its count, longest
+        run of one character and Shannon entropy.
+        """
+        features = {'length': len(password)}
+        for char_type, pattern in self.char_classes.items():
+            features[char_type] = bool(re.search(pattern, password))
+
+        most_common = Counter(password).most_common(1)
+        features['most_common_char'] = most_common[0][0] if most_common else ''
+        features['max_char_count'] = most_common[0][1] if most_common else 0
+
+        max_run = run = 0
+        previous = None
+        for char in password:
+            run = run + 1 if char == previous else 1
+            max_run = max(max_run, run)
+            previous = char
+        features['max_run'] = max_run
+
+        features['entropy'] = self._calculate_shannon_entropy(password)
+        return features
+
+    def batch_password_features(self, passwords, chunk_size=50000):
+        """
+        Compute password_features for many passwords, yielding one column dict per chunk.
+        Uses the vectorized NumPy extractor when NumPy is installed; results are identical.
+        """
+        try:
+            from batch_features import extract_features
+        except ImportError:
+            extract_features = None
+
+        for start in range(0, len(passwords), chunk_size):
+            chunk = passwords[start:start + chunk_size]
+            if extract_features is not None:
+                yield extract_features(chunk, self.char_classes)
+            else:
+                rows = [self.password_features(password) for password in chunk]
+                yield {key: [row[key] for row in rows] for key in rows[0]} if rows else {}
+
     def _calculate_shannon_entropy(self, password):
         """Calculate Shannon entropy for the password."""
         if not password:
@@ -295,16 +890,16 @@ class PasswordChecker:
 
         return round(entropy * 100 / 8, 2)  
 
-    def suggest_stronger(self, password):
+    def suggest_stronger(self, password, verbose=True, check_breaches=True):
         """Suggest a stronger version of the given password with progress indicator."""
         progress = ProgressIndicator()
         
-        show_status("Analyzing current password for improvements", "info")
-        progress.spinner("Generating stronger password")
+        if verbose:
+            show_status("Analyzing current password for improvements", "info")
+            progress.spinner("Generating stronger password")
+            time.sleep(1)  # Simulate processing time
         
-        time.sleep(1)  # Simulate processing time
-        
-        result = self.check_strength(password)
+        result = self.check_strength(password, verbose=verbose, check_breaches=check_breaches)
 
         if result['is_strong']:
             progress.stop_spinner("✅ Password is already strong!")
@@ -313,13 +908,13 @@ class PasswordChecker:
         improved = password
         
         # Add missing character types
-        if not re.search(self.required_chars['uppercase'], improved):
+        if not re.search(self.char_classes['uppercase'], improved):
             improved += secrets.choice(string.ascii_uppercase)
-        if not re.search(self.required_chars['lowercase'], improved):
+        if not re.search(self.char_classes['lowercase'], improved):
             improved += secrets.choice(string.ascii_lowercase)
-        if not re.search(self.required_chars['numbers'], improved):
+        if not re.search(self.char_classes['numbers'], improved):
             improved += secrets.choice(string.digits)
-        if not re.search(self.required_chars['special'], improved):
+        if not re.search(self.char_classes['special'], improved):
             improved += secrets.choice('!@#$%^&*')
 
         # Ensure minimum length
@@ -335,36 +930,39 @@ class PasswordChecker:
         
         return improved
 
-    def check_in_wordlists(self, password):
-        """Quick wordlist check without progress indicator for internal use."""
+    def check_in_wordlists(self, password, progress=None):
+        """
+        Quick wordlist check without output for internal use. A full scan bumps the
+        counter of progress (a BackgroundProgress), if given; drawing it is up to the caller.
+        """
         result = {
             'found': False,
             'wordlist': None,
+            'rank': None,
             'error': None
         }
 
         variations = self._generate_common_variations(password)
 
-        for wordlist_path in self.wordlist_paths:
-            path = Path(wordlist_path)
-            if not path.exists():
-                continue
-
-            try:
-                with open(path, 'r', encoding='latin-1', errors='ignore') as f:
-                    for line in f:
-                        word = line.strip()
-                        if word in variations:
-                            result['found'] = True
-                            result['wordlist'] = path.name
-                            return result
-
-            except Exception as e:
-                result['error'] = f"Error reading {path.name}: {str(e)}"
-                continue
-
+        wordlists = available_wordlists(self.wordlist_paths)
+        if wordlists and self._has_rank_tables(wordlists):
+            result.update(self._check_in_rank_tables(variations))
+            return result
+        if self.scan_workers:
+            result.update(self._parallel_scan(wordlists, variations, progress))
+        else:
+            result.update(self._serial_scan(wordlists, variations, progress))
         return result
 
-    def add_to_history(self, password):
-        """Add password to the history."""
-        self.password_history.add(password)
\ No newline at end of file
+    def close(self):
+        """Stop the stage threads and scan worker processes, if any were started."""
+        if self._stages is not None:
+            self._stages.shutdown(wait=True)
+            self._stages = None
+        if self._scanner is not None:
+            self._scanner.close()
+            self._scanner = None
+
+    def add_to_history(self, password, username=None):
+        """Add password to the history (of username, if given)."""
+        self.password_history.add(password, username)
\ No newline at end of file
@@ -0,0 +1,188 @@
+import argparse
+import random
+import secrets
+import string
+import threading
+import time
+from collections import Counter
+
+from fuzzy_index import edit_distance
+
+DEFAULT_MAX_DISTANCE = 2
+DEFAULT_MIN_SIMILARITY = 0.6
+GRAM_SIZE = 3
+
+
+def grams(password, size=GRAM_SIZE):
+    """Distinct character n-grams of a lowercased password, padded so its ends count too."""
+    padded = '\x02' * (size - 1) + password.lower() + '\x03' * (size - 1)
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+class _UserHistory:
+    def __init__(self):
+        self.passwords = []   # lowercased, oldest first
+        self.gram_counts = []
+        self.postings = {}    # gram -> ids of the passwords containing it
+        self.exact = set()
+
+
+class PasswordHistory:
+    """
+    Previous passwords per user, indexed for near-reuse checks ("Summer2024!" -> "Summer2025!").
+
+    Every password is split into padded character trigrams and each user keeps an inverted
+    index from trigram to password. A new password is only compared with previous
+    passwords that share trigrams with it. Trigram Jaccard similarity comes straight from
+    the shared counts. The edit distance is verified only where the count filter allows it
+    (k edits change at most k * (n + 1) distinct n-grams), so checks stay fast with
+    thousands of entries per user. Histories are kept in memory only, never written to disk.
+
+    Exact reuse (used()) is checked against the user's own history and the shared
+    anonymous one; `password in history` checks the anonymous history only.
+    """
+
+    def __init__(self, passwords=(), max_distance=DEFAULT_MAX_DISTANCE, min_similarity=DEFAULT_MIN_SIMILARITY):
+        self.max_distance = max_distance
+        self.min_similarity = min_similarity
+        self._users = {}
+        self._lock = threading.Lock()
+        self._token = secrets.token_hex(8)
+        self.version = 0
+        for password in passwords:
+            self.add(password)
+
+    def add(self, password, username=None):
+        """Record a password for a user (None: the shared anonymous history)."""
+        password_grams = grams(password)
+        with self._lock:
+            history = self._users.setdefault(username, _UserHistory())
+            if password in history.exact:
+                return
+            history.exact.add(password)
+            self.version += 1
+            entry = len(history.passwords)
+            history.passwords.append(password.lower())
+            history.gram_counts.append(len(password_grams))
+            for gram in password_grams:
+                history.postings.setdefault(gram, []).append(entry)
+
+    def load(self, path):
+        """
+        Add the previous passwords of a file: one "username<TAB>password" per line, or a
+        bare password for the anonymous history. Returns the number of lines read.
+        """
+        from wordlist_io import WordlistStream
+        count = 0
+        with WordlistStream(path) as f:
+            for line in f:
+                line = line.rstrip('\r')
+                if not line:
+                    continue
+                username, separator, password = line.partition('\t')
+                if separator:
+                    self.add(password, username)
+                else:
+                    self.add(line)
+                count += 1
+        return count
+
+    def used(self, password, username=None):
+        """Whether the user (or anyone, through the anonymous history) used exactly this password."""
+        for owner in {username, None}:
+            history = self._users.get(owner)
+            if history is not None and password in history.exact:
+                return True
+        return False
+
+    def fingerprint(self):
+        """Changes whenever a password is added; None while the history is empty."""
+        return f"{self._token}:{self.version}" if self.version else None
+
+    def __contains__(self, password):
+        return self.used(password)
+
+    def __len__(self):
+        return sum(len(history.passwords) for history in self._users.values())
+
+    def find_similar(self, password, username=None, max_distance=None, min_similarity=None, limit=5):
+        """
+        Previous passwords of the user within max_distance edits (case-insensitive,
+        transpositions count as one) or with trigram similarity of at least
+        min_similarity. Returns up to limit dicts with 'age' (1 = most recent),
+        'distance' (None if above max_distance) and 'similarity', closest first.
+        Previous passwords themselves are not returned.
+        """
+        with self._lock:
+            return self._find_similar(password, username, max_distance, min_similarity, limit)
+
+    def _find_similar(self, password, username, max_distance, min_similarity, limit):
+        history = self._users.get(username)
+        if history is None:
+            return []
+        max_distance = self.max_distance if max_distance is None else max_distance
+        min_similarity = self.min_similarity if min_similarity is None else min_similarity
+        lowered = password.lower()
+        query_grams = grams(password)
+        slack = max_distance * (GRAM_SIZE + 1)
+
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(history.postings.get(gram, ()))
+        candidates = dict(shared)
+        if len(query_grams) <= slack:
+            # Short enough to be within max_distance of passwords it shares no n-gram with
+            for entry, previous in enumerate(history.passwords):
+                if abs(len(previous) - len(lowered)) <= max_distance:
+                    candidates.setdefault(entry, 0)
+
+        matches = []
+        for entry, count in candidates.items():
+            similarity = count / (len(query_grams) + history.gram_counts[entry] - count)
+            distance = None
+            if count >= max(len(query_grams), history.gram_counts[entry]) - slack:
+                found = edit_distance(lowered, history.passwords[entry], max_distance)
+                distance = found if found <= max_distance else None
+            if distance is not None or similarity >= min_similarity:
+                matches.append({'age': len(history.passwords) - entry, 'distance': distance,
+                                'similarity': round(similarity, 3)})
+        matches.sort(key=lambda m: (m['distance'] is None, m['distance'] or 0, -m['similarity']))
+        return matches[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-reuse checks against large password histories.")
+    parser.add_argument("--users", type=int, default=200, help="Users with a history")
+    parser.add_argument("--per-user", type=int, default=5000, help="Previous passwords per user")
+    parser.add_argument("--checks", type=int, default=2000, help="Similarity checks to time")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    alphabet = string.ascii_letters + string.digits + "!@#$"
+    history = PasswordHistory()
+    start_time = time.time()
+    samples = []
+    for user in range(args.users):
+        for _ in range(args.per_user):
+            password = ''.join(rng.choice(alphabet) for _ in range(rng.randint(8, 16)))
+            history.add(password, f"user{user}")
+        samples.append((f"user{user}", password))
+    print(f"✅ Indexed {len(history):,} passwords for {args.users:,} users in {time.time() - start_time:.1f}s")
+
+    checks = []
+    for _ in range(args.checks):
+        username, password = rng.choice(samples)
+        if rng.random() < 0.5:
+            password = password[:-1] + rng.choice(alphabet)  # rotated: last character changed
+        else:
+            password = ''.join(rng.choice(alphabet) for _ in range(12))
+        checks.append((username, password))
+    start_time = time.perf_counter()
+    flagged = sum(1 for username, password in checks if history.find_similar(password, username))
+    elapsed = time.perf_counter() - start_time
+    print(f"✅ {len(checks):,} checks in {elapsed:.2f}s ({elapsed / len(checks) * 1000:.3f} ms each), "
+          f"{flagged:,} flagged as near reuse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import bisect
+import json
+
+from profiling import add_profile_arguments, run_entry_point
+
+# Character classes a policy can require; a policy file can add or override classes
+DEFAULT_CHAR_CLASSES = {
+    'uppercase': r'[A-Z]',
+    'lowercase': r'[a-z]',
+    'numbers': r'[0-9]',
+    'special': r'[!@#$%^&*(),.?":{}|<>]'
+}
+
+# The checker's built-in policy, used when no policy file is given
+DEFAULT_POLICIES = {
+    'default': {
+        'min_length': 10,
+        'required_chars': ['uppercase', 'lowercase', 'numbers', 'special'],
+        'min_score': 70,
+        'reject_wordlist': True,
+        'reject_breached': True,
+        'reject_reused': True
+    }
+}
+
+# Rule name: (fact, kind). 'min' rules fail when the fact is below the policy's limit,
+# 'max' rules when it is above, 'reject' rules when the fact is true.
+RULES = {
+    'min_length': ('length', 'min'),
+    'max_length': ('length', 'max'),
+    'min_char_classes': ('char_classes', 'min'),
+    'max_run': ('max_run', 'max'),
+    'max_char_count': ('max_char_count', 'max'),
+    'min_score': ('score', 'min'),
+    'reject_patterns': ('common_patterns', 'reject'),
+    'reject_wordlist': ('in_wordlist', 'reject'),
+    'reject_breached': ('breached', 'reject'),
+    'reject_reused': ('reused', 'reject'),
+}
+
+
+class PolicySet:
+    """
+    Password policies compiled into a single evaluator.
+
+    Every threshold rule keeps the limits of all policies sorted, with the policies that
+    fail beyond each limit folded into a bitmask, so checking a password costs one
+    bisect per rule whatever the number of policies. Required character classes are
+    grouped by class mask and the failing policies cached per set of present classes.
+    """
+
+    def __init__(self, policies, char_classes=None, primary=None):
+        if not policies:
+            raise ValueError("No policies defined")
+        self.policies = policies
+        self.names = list(policies)
+        self.primary = primary or self.names[0]
+        if self.primary not in policies:
+            raise ValueError(f"Unknown primary policy: {self.primary}")
+        self.char_classes = {**DEFAULT_CHAR_CLASSES, **(char_classes or {})}
+        self._class_bits = {name: 1 << i for i, name in enumerate(self.char_classes)}
+
+        limits = {rule: [] for rule, (_, kind) in RULES.items() if kind != 'reject'}
+        self._reject = {rule: 0 for rule, (_, kind) in RULES.items() if kind == 'reject'}
+        self._required = {}
+        for index, (name, rules) in enumerate(policies.items()):
+            bit = 1 << index
+            for rule, value in rules.items():
+                if rule == 'required_chars':
+                    unknown = [c for c in value if c not in self._class_bits]
+                    if unknown:
+                        raise ValueError(f"Policy {name}: unknown character class {unknown[0]}")
+                    mask = sum(self._class_bits[c] for c in set(value))
+                    self._required[mask] = self._required.get(mask, 0) | bit
+                elif rule not in RULES:
+                    raise ValueError(f"Policy {name}: unknown rule {rule}")
+                elif rule in self._reject:
+                    if value:
+                        self._reject[rule] |= bit
+                else:
+                    limits[rule].append((value, bit))
+
+        # rule -> (fact, kind, sorted limits, failing policy mask per bisect index)
+        self._thresholds = {}
+        for rule, entries in limits.items():
+            if not entries:
+                continue
+            fact, kind = RULES[rule]
+            entries.sort()
+            masks = [0]
+            if kind == 'min':
+                # Below limits[i] fails every policy from i on: suffix masks
+                for _, bit in reversed(entries):
+                    masks.append(masks[-1] | bit)
+                masks.reverse()
+            else:
+                # Above limits[i] fails every policy before i: prefix masks
+                for _, bit in entries:
+                    masks.append(masks[-1] | bit)
+            self._thresholds[rule] = (fact, kind, [limit for limit, _ in entries], masks)
+        self._reject = {rule: mask for rule, mask in self._reject.items() if mask}
+        self._required_cache = {}
+
+    def _required_failures(self, present):
+        """Mask of the policies whose required classes are not all in the present class mask."""
+        failing = self._required_cache.get(present)
+        if failing is None:
+            failing = 0
+            for required, policies in self._required.items():
+                if required & ~present:
+                    failing |= policies
+            self._required_cache[present] = failing
+        return failing
+
+    def failures(self, facts):
+        """
+        Return {rule: mask of failing policies} for the rules some policy fails.
+        Facts missing from facts (e.g. a breach check that could not run) fail no policy.
+        """
+        present = 0
+        for name, bit in self._class_bits.items():
+            if facts.get(name):
+                present |= bit
+        facts = {**facts, 'char_classes': bin(present).count('1')}
+
+        failed = {}
+        if self._required:
+            mask = self._required_failures(present)
+            if mask:
+                failed['required_chars'] = mask
+        for rule, (fact, kind, limits, masks) in self._thresholds.items():
+            value = facts.get(fact)
+            if value is None:
+                continue
+            if kind == 'min':
+                mask = masks[bisect.bisect_right(limits, value)]
+            else:
+                mask = masks[bisect.bisect_left(limits, value)]
+            if mask:
+                failed[rule] = mask
+        for rule, mask in self._reject.items():
+            if facts.get(RULES[rule][0]):
+                failed[rule] = mask
+        return failed
+
+    def evaluate(self, facts):
+        """Return {policy: {'passed': bool, 'failed': [rule, ...]}} for every policy."""
+        failed = self.failures(facts)
+        failing = 0
+        for mask in failed.values():
+            failing |= mask
+        verdicts = {}
+        for index, name in enumerate(self.names):
+            bit = 1 << index
+            verdicts[name] = {
+                'passed': not failing & bit,
+                'failed': [rule for rule, mask in failed.items() if mask & bit] if failing & bit else []
+            }
+        return verdicts
+
+    def describe(self, policy, rule):
+        """Human readable form of one of a policy's rules, e.g. 'min_length 12'."""
+        value = self.policies[policy][rule]
+        if rule == 'required_chars':
+            return f"required_chars {', '.join(value)}"
+        return rule if value is True else f"{rule} {value}"
+
+
+def load_policies(path):
+    """Load a YAML or JSON policy file and compile it into a PolicySet."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if path.endswith(('.yaml', '.yml')):
+        import yaml  # Optional: only needed for YAML policy files
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a mapping with a 'policies' section")
+    return PolicySet(data.get('policies') or {}, data.get('char_classes'), data.get('primary'))
+
+
+def print_verdicts(policy_set, verdicts):
+    """Print one line per policy with the rules it failed."""
+    for name, verdict in verdicts.items():
+        if verdict['passed']:
+            print(f"✅ {name}: pass")
+        else:
+            rules = '; '.join(policy_set.describe(name, rule) for rule in verdict['failed'])
+            print(f"❌ {name}: fail ({rules})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check passwords against a policy file.")
+    parser.add_argument("policy_file", help="YAML or JSON policy file")
+    parser.add_argument("--password-file", help="Check every password in this file (one per line) "
+                                                "and print pass counts instead of prompting")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    from password_checker import PasswordChecker
+    checker = PasswordChecker(policy_path=args.policy_file)
+    policy_set = checker.policies
+    print(f"Loaded {len(policy_set.names)} policies: {', '.join(policy_set.names)} "
+          f"(primary: {policy_set.primary})")
+
+    if args.password_file:
+        passed = dict.fromkeys(policy_set.names, 0)
+        total = 0
+        with open(args.password_file, 'r', encoding='latin-1', errors='ignore') as f:
+            for line in f:
+                password = line.rstrip('\n')
+                if not password:
+                    continue
+                total += 1
+                for name, verdict in checker.check_policies(password).items():
+                    passed[name] += verdict['passed']
+        for name, count in passed.items():
+            print(f"• {name}: {count:,}/{total:,} passwords pass")
+        return
+
+    import getpass
+    password = getpass.getpass("Password to check: ")
+    print_verdicts(policy_set, checker.check_policies(password))
+
+
+if __name__ == "__main__":
+    run_entry_point(main)
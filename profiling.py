@@ -0,0 +1,188 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+TOP_ENTRIES = 30
+
+
+def add_profile_arguments(parser):
+    """Add --profile and --profile-memory to an entry point's argument parser."""
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", metavar="DIR",
+                       help="Profile the run and write pstats, collapsed-stack and report files to DIR")
+    group.add_argument("--profile-memory", nargs="?", type=int, const=1, metavar="FRAMES",
+                       help="With --profile, also trace allocations with tracemalloc, keeping FRAMES "
+                            "frames per allocation (default 1; tracing is slow, more frames slower still)")
+    return parser
+
+
+class Profiler:
+    """
+    Profile a run: cProfile in every thread, a wall-clock stack sampler, and optionally tracemalloc.
+
+    cProfile only sees the thread that enables it, so each thread started during the run
+    gets its own profiler (via threading.setprofile), and they are merged at the end.
+    The sampler walks every thread's stack at a fixed interval; its counts, written in
+    collapsed-stack format, load directly into flamegraph.pl or speedscope.
+    Processes started by the run (scan workers) are not profiled.
+
+    Reports written to output_dir:
+      profile.pstats      merged cProfile stats (python -m pstats, snakeviz)
+      profile.txt         top functions by cumulative and own time
+      stacks.collapsed    "thread;outer;...;inner count" lines
+      allocations.txt     top allocation sites and the traced memory timeline (memory_frames set)
+    """
+
+    def __init__(self, output_dir, memory_frames=None, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.output_dir = output_dir
+        self.memory = bool(memory_frames)
+        self.memory_frames = memory_frames
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._profiles = []
+        self._stacks = {}
+        self._samples = 0
+        self._memory_timeline = []
+        self._stop = threading.Event()
+        self._sampler = None
+        self._started = None
+        self._snapshot = None
+        self._traced_memory = None
+
+    def _profile_new_thread(self, *args):
+        # Called once in each new thread (threading.setprofile), then hands over to cProfile
+        import cProfile
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def _sample(self):
+        sampler_id = threading.get_ident()
+        last_memory = 0.0
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                key = ';'.join(reversed(stack))
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+            self._samples += 1
+            if self.memory and time.perf_counter() - last_memory >= 0.5:
+                import tracemalloc
+                last_memory = time.perf_counter()
+                self._memory_timeline.append((last_memory - self._started, *tracemalloc.get_traced_memory()))
+
+    def start(self):
+        import cProfile
+        self._started = time.perf_counter()
+        if self.memory:
+            import tracemalloc
+            tracemalloc.start(self.memory_frames)
+        self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._sampler.start()
+        threading.setprofile(self._profile_new_thread)
+        main_profile = cProfile.Profile()
+        self._profiles.append(main_profile)
+        main_profile.enable()
+
+    def stop(self):
+        self._profiles[0].disable()
+        threading.setprofile(None)
+        self._stop.set()
+        self._sampler.join()
+        self.elapsed = time.perf_counter() - self._started
+        if self.memory:
+            import tracemalloc
+            self._snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            ))
+            self._traced_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    def write_reports(self):
+        """Write the reports; returns their paths."""
+        import io
+        import pstats
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        pstats_path = os.path.join(self.output_dir, "profile.pstats")
+        stats.dump_stats(pstats_path)
+        paths.append(pstats_path)
+
+        text = io.StringIO()
+        stats.stream = text
+        text.write(f"Wall time {self.elapsed:.2f}s, {len(profiles)} profiled thread(s)\n\n")
+        stats.sort_stats('cumulative').print_stats(TOP_ENTRIES)
+        stats.sort_stats('tottime').print_stats(TOP_ENTRIES)
+        text_path = os.path.join(self.output_dir, "profile.txt")
+        with open(text_path, 'w') as f:
+            f.write(text.getvalue())
+        paths.append(text_path)
+
+        collapsed_path = os.path.join(self.output_dir, "stacks.collapsed")
+        with open(collapsed_path, 'w') as f:
+            for stack, count in sorted(self._stacks.items()):
+                f.write(f"{stack} {count}\n")
+        paths.append(collapsed_path)
+
+        if self.memory:
+            snapshot = self._snapshot
+            current, peak = self._traced_memory
+            allocations_path = os.path.join(self.output_dir, "allocations.txt")
+            with open(allocations_path, 'w') as f:
+                f.write(f"Traced memory: {current / 1024 / 1024:.1f} MB at exit, {peak / 1024 / 1024:.1f} MB peak\n")
+                f.write("\nTop allocation sites (live at exit):\n")
+                for stat in snapshot.statistics('lineno')[:TOP_ENTRIES]:
+                    f.write(f"  {stat.size / 1024:>10,.1f} KB {stat.count:>9,} blocks  {stat.traceback[0]}\n")
+                if self.memory_frames > 1:
+                    f.write("\nLargest allocation stacks:\n")
+                    for stat in snapshot.statistics('traceback')[:5]:
+                        f.write(f"\n  {stat.size / 1024:,.1f} KB in {stat.count:,} blocks\n")
+                        for line in stat.traceback.format():
+                            f.write(f"    {line}\n")
+                f.write("\nTimeline (seconds, current MB, peak MB):\n")
+                for at, current, peak in self._memory_timeline:
+                    f.write(f"  {at:8.1f} {current / 1024 / 1024:10.1f} {peak / 1024 / 1024:10.1f}\n")
+            paths.append(allocations_path)
+        return paths
+
+
+def run_entry_point(main):
+    """
+    Run an entry point's main(), under a Profiler if --profile DIR was given.
+    Without --profile nothing is imported or hooked, so the run costs exactly what it did.
+    """
+    options = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    add_profile_arguments(options)
+    options = options.parse_known_args()[0]
+    if not options.profile:
+        return main()
+
+    profiler = Profiler(options.profile, options.profile_memory)
+    profiler.start()
+    try:
+        return main()
+    finally:
+        profiler.stop()
+        paths = profiler.write_reports()
+        print(f"\n📊 Profiled {profiler.elapsed:.2f}s ({profiler._samples:,} stack samples): "
+              f"{', '.join(paths)}", file=sys.stderr)
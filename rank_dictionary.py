@@ -0,0 +1,425 @@
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+from profiling import add_profile_arguments, run_entry_point
+from wordlist_io import WordlistStream, available_wordlists, estimated_plain_size
+from wordlist_merge import DEFAULT_MEMORY_MB, MAX_FAN_IN
+
+MAGIC = b"AKRANK\x00\x02"
+HEADER = struct.Struct("<8sIII")  # magic, word count, longest word, hash slots
+MAX_WORD_LENGTH = 64
+
+# Word offsets, ranks and hash slots are uint32: the word bytes of a table must stay below this
+MAX_TABLE_WORD_BYTES = 0xFFFFFFFF
+
+DEFAULT_TABLE_DIR = os.path.join(str(Path.home()), ".ak_vault", "rank_tables")
+
+# Sorted run of a table build: records of word length and rank, each followed by the word
+RUN_RECORD = struct.Struct("<BI")
+
+# Bytes a buffered word costs in memory besides its characters: str, rank and dict entry
+RANK_ENTRY_OVERHEAD = sys.getsizeof('') + sys.getsizeof(2 ** 30) + 48
+
+
+def rank_table_path(wordlist_path, table_dir=DEFAULT_TABLE_DIR):
+    """Return the rank table file used for a wordlist."""
+    wordlist_path = os.path.abspath(wordlist_path)
+    digest = hashlib.sha1(wordlist_path.encode('utf-8')).hexdigest()[:10]
+    return os.path.join(table_dir, f"{Path(wordlist_path).name}-{digest}.rank")
+
+
+def is_rank_table_current(wordlist_path, table_path):
+    """Check that a rank table in the current format exists and is newer than its wordlist."""
+    if not os.path.exists(table_path) or os.path.getmtime(table_path) < os.path.getmtime(wordlist_path):
+        return False
+    with open(table_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_rank_table_items(table_path, items):
+    """
+    Write (word, rank) pairs, in sorted word order, as a rank table file. The words are
+    spooled to a temporary file and the index is built in compact arrays, so the items
+    can be streamed (e.g. from a merge). Returns the number of words written. Raises
+    ValueError if the words add up to MAX_TABLE_WORD_BYTES or more (uint32 offsets).
+    """
+    hashes = array('I')
+    offsets = array('I', [0])
+    rank_column = array('I')
+    # Where the words starting with each one- and two-byte prefix begin
+    first_byte = array('I')
+    first_two_bytes = array('I')
+    longest = 0
+
+    os.makedirs(os.path.dirname(os.path.abspath(table_path)), exist_ok=True)
+    temp_path = table_path + ".tmp"
+    spool_path = table_path + ".words.tmp"
+    try:
+        with open(spool_path, 'w+b') as spool:
+            for index, (word, rank) in enumerate(items):
+                spool.write(word)
+                if offsets[-1] + len(word) > MAX_TABLE_WORD_BYTES:
+                    raise ValueError(f"{table_path}: more than {MAX_TABLE_WORD_BYTES:,} bytes of words; "
+                                     f"split the wordlist")
+                offsets.append(offsets[-1] + len(word))
+                rank_column.append(rank)
+                longest = max(longest, len(word))
+                while len(first_byte) <= word[0]:
+                    first_byte.append(index)
+                # A one-byte word sorts after every two-byte prefix below its own byte
+                prefix = (word[0] << 8 | word[1]) if len(word) > 1 else (word[0] << 8) - 1
+                while len(first_two_bytes) <= prefix:
+                    first_two_bytes.append(index)
+                hashes.append(zlib.crc32(word))
+            count = len(rank_column)
+
+            # Open-addressing hash index (load factor <= 0.5): slot -> word index + 1, 0 = empty
+            slots = 1
+            while slots < 2 * count:
+                slots *= 2
+            if slots > MAX_TABLE_WORD_BYTES:
+                raise ValueError(f"{table_path}: too many words for one rank table; split the wordlist")
+            mask = slots - 1
+            hash_index = array('I', [0]) * slots
+            for index, word_hash in enumerate(hashes):
+                slot = word_hash & mask
+                while hash_index[slot]:
+                    slot = (slot + 1) & mask
+                hash_index[slot] = index + 1
+            del hashes
+            first_byte.extend([count] * (257 - len(first_byte)))
+            first_two_bytes.extend([count] * (65537 - len(first_two_bytes)))
+
+            with open(temp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, count, longest, slots))
+                for column in (first_byte, first_two_bytes, offsets, rank_column, hash_index):
+                    if sys.byteorder == 'big':
+                        column.byteswap()
+                    f.write(column.tobytes())
+                spool.seek(0)
+                shutil.copyfileobj(spool, f)
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+    os.replace(temp_path, table_path)
+    return count
+
+
+def _spill_ranks(ranks, run_dir, number):
+    """Write a {word: rank} buffer as a sorted run file."""
+    run_path = os.path.join(run_dir, f"run-{number:06d}")
+    pack = RUN_RECORD.pack
+    with open(run_path, 'wb') as f:
+        f.writelines(pack(len(word), rank) + word.encode('latin-1') for word, rank in sorted(ranks.items()))
+    return run_path
+
+
+def _read_run(path, buffer_size):
+    with open(path, 'rb', buffering=buffer_size) as f:
+        while True:
+            record = f.read(RUN_RECORD.size)
+            if not record:
+                return
+            length, rank = RUN_RECORD.unpack(record)
+            yield f.read(length), rank
+
+
+def _merge_runs(run_paths, buffer_size):
+    """Heap-merge sorted run files into (word, rank) in word order, keeping each word's lowest rank."""
+    previous = None
+    for word, rank in heapq.merge(*(_read_run(path, buffer_size) for path in run_paths)):
+        if word != previous:
+            yield word, rank
+            previous = word
+
+
+def write_wordlist_rank_table(wordlist_path, table_path, offset=0, rank=0, memory_mb=DEFAULT_MEMORY_MB,
+                              temp_dir=None):
+    """
+    Build a rank table from a wordlist (plain or compressed) read from a byte offset
+    (decompressed bytes), mapping each lowercased word to the rank of its first
+    occurrence (1 = most common); rank is the number of words before offset. Distinct
+    words are buffered up to half of memory_mb, spilled as sorted runs to temp_dir and
+    k-way merged (MAX_FAN_IN runs at a time) straight into the table, so the list is
+    never held in memory. Returns (distinct words, end offset, last rank) so an appended
+    tail can be read later. A last line without a newline is read, but the end offset
+    is its start: an append may continue it.
+    """
+    budget = memory_mb * 1024 * 1024 // 2
+    buffer_size = max(64 * 1024, budget // (2 * (MAX_FAN_IN + 1)))
+    run_dir = None
+    runs = []
+    ranks = {}
+    buffered = 0
+    try:
+        with WordlistStream(wordlist_path) as f:
+            f.seek(offset)
+            counted = False
+            for line in f:
+                word = line.strip().lower()
+                counted = False
+                if not word or len(word) > MAX_WORD_LENGTH:
+                    continue
+                rank += 1
+                counted = True
+                if word not in ranks:
+                    ranks[word] = rank
+                    buffered += len(word) + RANK_ENTRY_OVERHEAD
+                    if buffered >= budget:
+                        if run_dir is None:
+                            run_dir = tempfile.mkdtemp(prefix="ak_rank_", dir=temp_dir)
+                        runs.append(_spill_ranks(ranks, run_dir, len(runs)))
+                        ranks = {}
+                        buffered = 0
+            end = f.tell()
+            if f.partial_length:
+                end -= f.partial_length
+                rank -= counted
+
+        if not runs:
+            items = ((word.encode('latin-1'), word_rank) for word, word_rank in sorted(ranks.items()))
+            return write_rank_table_items(table_path, items), end, rank
+
+        if ranks:
+            runs.append(_spill_ranks(ranks, run_dir, len(runs)))
+        del ranks
+        passes = 0
+        while len(runs) > MAX_FAN_IN:
+            passes += 1
+            merged = []
+            for i in range(0, len(runs), MAX_FAN_IN):
+                batch = runs[i:i + MAX_FAN_IN]
+                merged_path = os.path.join(run_dir, f"pass{passes}-{i // MAX_FAN_IN:06d}")
+                with open(merged_path, 'wb', buffering=buffer_size) as out:
+                    out.writelines(RUN_RECORD.pack(len(word), word_rank) + word
+                                   for word, word_rank in _merge_runs(batch, buffer_size))
+                for path in batch:
+                    os.remove(path)
+                merged.append(merged_path)
+            runs = merged
+        return write_rank_table_items(table_path, _merge_runs(runs, buffer_size)), end, rank
+    finally:
+        if run_dir is not None:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def build_rank_table(wordlist_path, table_path, memory_mb=DEFAULT_MEMORY_MB, temp_dir=None):
+    """
+    Build a rank table from a wordlist, sorting it externally within memory_mb.
+    Each lowercased word maps to the line number of its first occurrence (1 = most common).
+    Returns the number of distinct words stored.
+    """
+    return write_wordlist_rank_table(wordlist_path, table_path, memory_mb=memory_mb, temp_dir=temp_dir)[0]
+
+
+class RankTable:
+    """
+    Memory-mapped rank table: sorted words with their frequency ranks.
+
+    Layout: header, 257 + 65537 uint32 prefix buckets, (count + 1) uint32 word offsets,
+    count uint32 ranks, hash slots (uint32 word index + 1), word bytes.
+    Exact lookups go through the hash index in O(1); the sorted order serves prefix walks.
+    Words are latin-1 encoded and lowercased, matching how the wordlists are read.
+    """
+
+    def __init__(self, path, name=None, source=None):
+        self.path = path
+        self.name = name or Path(path).name
+        self.source = source
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, self.max_length, slots = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a rank table")
+
+        view = memoryview(self._mm)
+        buckets_start = HEADER.size
+        offsets_start = buckets_start + (257 + 65537) * 4
+        self._first_byte = view[buckets_start:buckets_start + 257 * 4].cast('I')
+        self._first_two_bytes = view[buckets_start + 257 * 4:offsets_start].cast('I')
+        ranks_start = offsets_start + (self.count + 1) * 4
+        hash_start = ranks_start + self.count * 4
+        self._blob_start = hash_start + slots * 4
+        self._offsets = view[offsets_start:ranks_start].cast('I')
+        self._ranks = view[ranks_start:hash_start].cast('I')
+        self._hash_index = view[hash_start:self._blob_start].cast('I')
+        self._hash_mask = slots - 1
+
+    def close(self):
+        self._first_byte.release()
+        self._first_two_bytes.release()
+        self._offsets.release()
+        self._ranks.release()
+        self._hash_index.release()
+        self._mm.close()
+
+    def items(self):
+        """Yield (word, rank) in sorted word order."""
+        for index in range(self.count):
+            yield self._word(index), self._ranks[index]
+
+    def _word(self, index):
+        start = self._blob_start + self._offsets[index]
+        return self._mm[start:self._blob_start + self._offsets[index + 1]]
+
+    def _lower_bound(self, key, lo, hi):
+        # Hot path of every lookup: word slicing is inlined
+        mm, offsets, blob = self._mm, self._offsets, self._blob_start
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mm[blob + offsets[mid]:blob + offsets[mid + 1]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_range(self, prefix):
+        """Index range of the words starting with a one- or two-byte prefix."""
+        if len(prefix) == 1:
+            return self._first_byte[prefix[0]], self._first_byte[prefix[0] + 1]
+        key = (prefix[0] << 8) | prefix[1]
+        if prefix[1] < 255:
+            return self._first_two_bytes[key], self._first_two_bytes[key + 1]
+        return self._first_two_bytes[key], self._first_byte[prefix[0] + 1]
+
+    def rank(self, word):
+        """Return the rank of a lowercased latin-1 encoded word, or None if absent."""
+        if not self.count:
+            return None
+        mask, hash_index = self._hash_mask, self._hash_index
+        slot = zlib.crc32(word) & mask
+        while True:
+            entry = hash_index[slot]
+            if not entry:
+                return None
+            if self._word(entry - 1) == word:
+                return self._ranks[entry - 1]
+            slot = (slot + 1) & mask
+
+    def prefix_matches(self, text, start, cache=None):
+        """
+        Yield (end, rank) for every word equal to text[start:end].
+        The search range narrows with each extra character and stops as soon as
+        no word starts with the current prefix, so most positions cost a few probes.
+        cache (a dict) remembers where prefixes were found across calls on similar texts.
+        """
+        lo, hi = 0, self.count
+        for end in range(start + 1, min(len(text), start + self.max_length) + 1):
+            prefix = text[start:end]
+            if end - start <= 2:
+                lo, hi = self._prefix_range(prefix)
+            elif cache is None:
+                lo = self._lower_bound(prefix, lo, hi)
+            else:
+                found = cache.get(prefix)
+                if found is None:
+                    found = cache[prefix] = self._lower_bound(prefix, lo, hi)
+                lo = found
+            if lo >= hi:
+                return
+            word = self._word(lo)
+            if word == prefix:
+                yield end, self._ranks[lo]
+            elif not word.startswith(prefix):
+                return
+
+
+def lookup_rank(rank_tables, word):
+    """
+    Return (rank, wordlist name) of the best rank of a word across tables, or (None, None).
+    Words are compared lowercased; characters outside latin-1 never match.
+    """
+    try:
+        encoded = word.lower().encode('latin-1')
+    except UnicodeEncodeError:
+        return None, None
+    best = (None, None)
+    for table in rank_tables:
+        rank = table.rank(encoded)
+        if rank is not None and (best[0] is None or rank < best[0]):
+            best = (rank, table.name)
+    return best
+
+
+def build_rank_tables(wordlist_paths, table_dir=DEFAULT_TABLE_DIR, force=False, memory_mb=DEFAULT_MEMORY_MB,
+                      temp_dir=None):
+    """Build rank tables for wordlists, skipping current ones unless forced. Returns build stats."""
+    stats = []
+    for wordlist_path in available_wordlists(wordlist_paths):
+        table_path = rank_table_path(wordlist_path, table_dir)
+        if not force and is_rank_table_current(wordlist_path, table_path):
+            stats.append({'wordlist': wordlist_path, 'table': table_path, 'words': None,
+                          'seconds': 0.0, 'size': os.path.getsize(table_path)})
+            continue
+        start_time = time.time()
+        words = build_rank_table(wordlist_path, table_path, memory_mb, temp_dir)
+        stats.append({'wordlist': wordlist_path, 'table': table_path, 'words': words,
+                      'seconds': time.time() - start_time, 'size': os.path.getsize(table_path)})
+    return stats
+
+
+def load_rank_tables(wordlist_paths, table_dir=DEFAULT_TABLE_DIR, auto_build_limit=64 * 1024 * 1024):
+    """
+    Load the rank tables for the given wordlists.
+    Missing or stale tables are built on the fly for wordlists up to auto_build_limit bytes
+    (decompressed; estimated for compressed lists). Compressed variants of missing paths are used.
+    """
+    tables = []
+    for wordlist_path in available_wordlists(wordlist_paths):
+        table_path = rank_table_path(wordlist_path, table_dir)
+        if not is_rank_table_current(wordlist_path, table_path):
+            if estimated_plain_size(wordlist_path) > auto_build_limit:
+                continue
+            build_rank_table(wordlist_path, table_path)
+        tables.append(RankTable(table_path, Path(wordlist_path).name, source=wordlist_path))
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build rank tables from wordlists.")
+    parser.add_argument("wordlists", nargs="*",
+                        help="Wordlists to index (default: the password checker's wordlists)")
+    parser.add_argument("--table-dir", default=DEFAULT_TABLE_DIR, help="Where to store rank tables")
+    parser.add_argument("--force", action="store_true", help="Rebuild tables that are up to date")
+    parser.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB,
+                        help="Memory for sorting words; larger lists are sorted in runs on disk")
+    parser.add_argument("--temp-dir", help="Directory for the sorted runs (default: system temp)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    wordlists = args.wordlists
+    if not wordlists:
+        from password_checker import PasswordChecker
+        wordlists = PasswordChecker().wordlist_paths
+
+    try:
+        stats = build_rank_tables(wordlists, args.table_dir, args.force, args.memory_mb, args.temp_dir)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    if not stats:
+        print("❌ No wordlists found!")
+        return
+    for entry in stats:
+        size_mb = entry['size'] / (1024 * 1024)
+        if entry['words'] is None:
+            print(f"• {entry['wordlist']}: up to date ({size_mb:.1f} MB)")
+        else:
+            print(f"✅ {entry['wordlist']}: {entry['words']:,} words in {entry['seconds']:.1f}s "
+                  f"({size_mb:.1f} MB) -> {entry['table']}")
+
+
+if __name__ == "__main__":
+    run_entry_point(main)
@@ -0,0 +1,135 @@
+import copy
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from strength_record import StrengthRecord
+
+DEFAULT_CACHE_PATH = os.path.join(str(Path.home()), ".ak_vault", "result_cache.json")
+DEFAULT_MAX_ENTRIES = 100000
+
+# Persisted entries older than this are dropped on load (breach counts go stale)
+DEFAULT_MAX_AGE = 24 * 3600
+
+# PBKDF2 rounds turning a persisted cache's secret into its HMAC key
+KEY_ITERATIONS = 200000
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of check_strength results.
+
+    Entries are found by an HMAC-SHA256 of the password and the check options; the
+    password itself is never kept. The HMAC key is random per process, unless the
+    cache is persisted. A persisted cache derives its key from a secret the user
+    supplies (never written to disk), so the file cannot be matched against a
+    wordlist without it. Only StrengthRecords are persisted, as JSON: they hold
+    numbers and issue codes, no pieces of the password. check_strength's entries also
+    carry its details (which contain matched tokens) and stay in memory.
+
+    Every entry belongs to a context (wordlists, policies, history). When the
+    checker's context changes, the cache starts empty. Callers get a fresh copy of a
+    result, which they may modify.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, path=None, max_age=DEFAULT_MAX_AGE, secret=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._context = None
+        self._secret = secrets.token_bytes(32)
+        if path:
+            if not secret:
+                raise ValueError("A persisted result cache needs a secret")
+            self._load(secret)
+
+    def _derive_key(self, secret, salt):
+        return hashlib.pbkdf2_hmac('sha256', secret.encode('utf-8'), salt, KEY_ITERATIONS)
+
+    def _load(self, secret):
+        saved = None
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                saved = json.load(f)
+        self._salt = bytes.fromhex(saved['salt']) if saved else secrets.token_bytes(16)
+        self._secret = self._derive_key(secret, self._salt)
+        if not saved:
+            return
+        if not hmac.compare_digest(bytes.fromhex(saved['verifier']), self._verifier()):
+            raise ValueError(f"Wrong secret for the result cache {self.path}")
+        cutoff = time.time() - self.max_age
+        self._context = saved['context']
+        for key, saved_at, record in saved['entries']:
+            if saved_at >= cutoff:
+                self._entries[bytes.fromhex(key)] = (saved_at, StrengthRecord(**record))
+
+    def _verifier(self):
+        return hmac.new(self._secret, b'verify', hashlib.sha256).digest()
+
+    def save(self):
+        """Write the cached StrengthRecords to the cache file (a no-op for in-memory caches)."""
+        if not self.path:
+            return
+        with self._lock:
+            entries = [[key.hex(), saved_at, value.to_dict()]
+                       for key, (saved_at, value) in self._entries.items() if isinstance(value, StrengthRecord)]
+            context = self._context
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'salt': self._salt.hex(), 'verifier': self._verifier().hex(),
+                       'context': context, 'entries': entries}, f)
+        os.replace(temp_path, self.path)
+
+    def key(self, password, *options):
+        """Cache key of a password checked with the given options."""
+        message = '\x00'.join([password] + [str(option) for option in options]).encode('utf-8', 'surrogatepass')
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def _check_context(self, context):
+        # Stored as a digest so it survives the JSON round trip of persisted caches
+        digest = hashlib.sha256(repr(context).encode('utf-8')).hexdigest()
+        if digest != self._context:
+            self._entries.clear()
+            self._context = digest
+
+    def get(self, key, context):
+        """The cached result for key in this context, or None."""
+        with self._lock:
+            self._check_context(context)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def put(self, key, context, result):
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._check_context(context)
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from strength_record import Issue
+
+DEFAULT_DB_PATH = os.path.join(str(Path.home()), ".ak_vault", "results.db")
+
+# PRAGMA user_version of the current schema; 1: password_audits.issues holds issue codes,
+# 2: hydra_findings passwords are redacted unless stored by choice
+SCHEMA_VERSION = 2
+
+# The password of a Hydra login line ("... login: admin   password: hunter2")
+REDACT_PASSWORD_PATTERN = re.compile(r'(password:\s+)\S+')
+REDACTED = '[redacted]'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hydra_findings (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    target TEXT NOT NULL,
+    service TEXT,
+    username TEXT,
+    password TEXT,       -- NULL unless the store was opened with store_passwords
+    full_line TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_hydra_target ON hydra_findings(target, created_at);
+CREATE INDEX IF NOT EXISTS idx_hydra_user ON hydra_findings(username, created_at);
+
+CREATE TABLE IF NOT EXISTS password_audits (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    username TEXT,
+    is_strong INTEGER NOT NULL,
+    entropy_score REAL,
+    in_wordlist INTEGER,
+    wordlist TEXT,
+    breach_count INTEGER,
+    issues TEXT          -- JSON list of strength_record.Issue names
+);
+CREATE INDEX IF NOT EXISTS idx_audit_user ON password_audits(username, created_at);
+CREATE INDEX IF NOT EXISTS idx_audit_time ON password_audits(created_at);
+
+CREATE TABLE IF NOT EXISTS hash_classifications (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    hash_types TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_hash_time ON hash_classifications(created_at);
+
+CREATE TABLE IF NOT EXISTS breach_lookups (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    email TEXT NOT NULL,
+    status TEXT,
+    breaches TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_breach_email ON breach_lookups(email, created_at);
+"""
+
+# Columns written by each record_* method, in insert order
+TABLE_COLUMNS = {
+    'hydra_findings': ('created_at', 'target', 'service', 'username', 'password', 'full_line'),
+    'password_audits': ('created_at', 'username', 'is_strong', 'entropy_score', 'in_wordlist',
+                        'wordlist', 'breach_count', 'issues'),
+    'hash_classifications': ('created_at', 'hash', 'hash_types'),
+    'breach_lookups': ('created_at', 'email', 'status', 'breaches'),
+}
+
+# Column used to filter each table by target/user
+TABLE_KEYS = {
+    'hydra_findings': ('target', 'username'),
+    'password_audits': (None, 'username'),
+    'hash_classifications': (None, None),
+    'breach_lookups': (None, 'email'),
+}
+
+
+def redact_login_line(line):
+    """A Hydra login line with its password replaced by [redacted]."""
+    return REDACT_PASSWORD_PATTERN.sub(r'\1' + REDACTED, line)
+
+
+class ResultsStore:
+    """
+    SQLite store for attack and audit results with batched inserts. The database is
+    readable by its owner only. Passwords found by Hydra are redacted unless
+    store_passwords is set.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, batch_size=1000, store_passwords=False):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.store_passwords = store_passwords
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), mode=0o700, exist_ok=True)
+            os.close(os.open(db_path, os.O_CREAT | os.O_WRONLY, 0o600))
+            os.chmod(db_path, 0o600)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._conn.commit()
+        if db_path != ":memory:":
+            # SQLite gives these the database's mode, except files left by older versions
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.chmod(db_path + suffix, 0o600)
+
+        self._lock = threading.Lock()
+        self._pending = {table: [] for table in TABLE_COLUMNS}
+        self._pending_count = 0
+
+    def _migrate(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Issue messages quoted pieces of the password (matched patterns, repeated characters)
+            self._conn.execute("UPDATE password_audits SET issues = NULL")
+        if version < 2:
+            # Found passwords used to be stored in cleartext
+            rows = self._conn.execute("SELECT id, full_line FROM hydra_findings").fetchall()
+            self._conn.executemany("UPDATE hydra_findings SET password = NULL, full_line = ? WHERE id = ?",
+                                   [(redact_login_line(line or ''), row_id) for row_id, line in rows])
+        if version < SCHEMA_VERSION:
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _now(self):
+        return datetime.now().isoformat(timespec='seconds')
+
+    def _add(self, table, row):
+        with self._lock:
+            self._pending[table].append(row)
+            self._pending_count += 1
+            if self._pending_count >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending_count:
+            return
+        with self._conn:
+            for table, rows in self._pending.items():
+                if rows:
+                    columns = TABLE_COLUMNS[table]
+                    placeholders = ', '.join('?' for _ in columns)
+                    self._conn.executemany(
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows
+                    )
+                    rows.clear()
+        self._pending_count = 0
+
+    def flush(self):
+        """Write all buffered rows in a single transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record_hydra_finding(self, target, service, login):
+        """
+        Record a credential found by Hydra (a dict from parse_hydra_output). The password
+        is only kept with store_passwords.
+        """
+        if self.store_passwords:
+            password, full_line = login['password'], login['full_line']
+        else:
+            password, full_line = None, redact_login_line(login['full_line'])
+        self._add('hydra_findings', (self._now(), target, service, login['username'], password, full_line))
+
+    def record_password_audit(self, record, username=None):
+        """
+        Record a strength check (a StrengthRecord). Issues are stored as their codes; the
+        password and the issue messages, which can quote pieces of it, are never stored.
+        """
+        self._add('password_audits', (
+            self._now(),
+            username,
+            int(record.is_strong),
+            record.score,
+            int(bool(record.issues & Issue.IN_WORDLIST)),
+            record.wordlist,
+            record.breaches,
+            json.dumps([issue.name for issue in Issue if record.issues & issue])
+        ))
+
+    def record_hash_classification(self, hash_input, hash_types):
+        """Record the possible hash types reported for a hash."""
+        self._add('hash_classifications', (self._now(), hash_input, json.dumps(hash_types)))
+
+    def record_breach_lookup(self, email, status, breaches=None):
+        """Record the outcome of an email breach lookup."""
+        self._add('breach_lookups', (self._now(), email, status, json.dumps(breaches or [])))
+
+    def query(self, table, target=None, user=None, since=None, limit=50):
+        """Return the newest rows of a table as dicts, optionally filtered by target, user and time."""
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"Unknown table: {table}")
+        self.flush()
+
+        target_column, user_column = TABLE_KEYS[table]
+        conditions, params = [], []
+        if target and target_column:
+            conditions.append(f"{target_column} = ?")
+            params.append(target)
+        if user and user_column:
+            conditions.append(f"{user_column} = ?")
+            params.append(user)
+        if since:
+            conditions.append("created_at >= ?")
+            params.append(since)
+
+        sql = f"SELECT * FROM {table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def print_query_results(rows):
+    """Print query rows as a simple table."""
+    if not rows:
+        print("No results found.")
+        return
+    for row in rows:
+        print("  " + " | ".join(f"{key}: {value}" for key, value in row.items() if key != 'id'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query stored attack and audit results.")
+    parser.add_argument("table", choices=sorted(TABLE_COLUMNS), help="Result table to query")
+    parser.add_argument("--target", help="Filter by target (hydra_findings)")
+    parser.add_argument("--user", help="Filter by username or email")
+    parser.add_argument("--since", help="Only rows at or after this ISO timestamp")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum rows to show")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Path to the results database")
+    args = parser.parse_args()
+
+    with ResultsStore(args.db) as store:
+        print_query_results(store.query(args.table, args.target, args.user, args.since, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from main import Subsystems
+from profiling import add_profile_arguments, run_entry_point
+from utils import show_status
+
+MAX_BODY_SIZE = 1024 * 1024
+MAX_BATCH_SIZE = 1000
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+
+class CheckService:
+    """
+    Long-running local HTTP service around the password, breach and hash checkers.
+
+    The subsystems, rank tables and guess estimator are loaded once and stay warm.
+    Connections are served concurrently on one event loop (with HTTP keep-alive) and
+    the checks run on a thread pool. Every endpoint takes a JSON body with a single
+    item or a list of items, which is checked as one batch.
+    """
+
+    def __init__(self, subsystems, workers=4):
+        self.subsystems = subsystems
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.started = time.time()
+        self.requests_served = 0
+        self.routes = {
+            '/strength': self.strength,
+            '/policies': self.policies,
+            '/breach': self.breach,
+            '/hash': self.hash,
+            '/suggest': self.suggest,
+            '/history': self.history,
+        }
+
+    def warm_up(self):
+        """
+        Construct the subsystems and load the indexes before the first request. Wordlists
+        too large to index on demand are indexed now: a request never scans a whole list.
+        """
+        built = self.subsystems.checker.warm_up(build_indexes=True)
+        if built:
+            show_status(f"Indexed {', '.join(built)}", "info")
+        self.subsystems.security_checker
+        self.subsystems.breach_index
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.subsystems.close()
+
+    # Endpoints: run on the thread pool, return a JSON-serializable result
+
+    def _each(self, payload, key, batch_key, check):
+        """Apply check to payload[key], or to every item of payload[batch_key] as one batch."""
+        if batch_key in payload:
+            items = payload[batch_key]
+            if not isinstance(items, list) or len(items) > MAX_BATCH_SIZE:
+                raise ValueError(f"'{batch_key}' must be a list of at most {MAX_BATCH_SIZE} items")
+        elif key in payload:
+            items = [payload[key]]
+        else:
+            raise ValueError(f"Missing '{key}' or '{batch_key}'")
+        if not all(isinstance(item, str) for item in items):
+            raise ValueError(f"'{key}' values must be strings")
+        results = [check(item) for item in items]
+        return {'results': results} if batch_key in payload else results[0]
+
+    def strength(self, payload):
+        checker = self.subsystems.checker
+        breach_check = bool(payload.get('breach_check', False))
+        short_circuit = bool(payload.get('short_circuit', True))
+        username = payload.get('username')
+        return self._each(payload, 'password', 'passwords', lambda password: checker.check_strength(
+            password, username, verbose=False, check_breaches=breach_check, short_circuit=short_circuit))
+
+    def policies(self, payload):
+        checker = self.subsystems.checker
+        username = payload.get('username')
+        return self._each(payload, 'password', 'passwords',
+                          lambda password: checker.check_policies(password, username))
+
+    def history(self, payload):
+        """Record previous passwords of payload['username'] (the anonymous history if absent)."""
+        checker = self.subsystems.checker
+        username = payload.get('username')
+        if username is not None and not isinstance(username, str):
+            raise ValueError("'username' must be a string")
+
+        def add(password):
+            checker.add_to_history(password, username)
+            return {'recorded': True}
+        return self._each(payload, 'password', 'passwords', add)
+
+    def breach(self, payload):
+        if 'email' in payload or 'emails' in payload:
+            from email_checker import check_email_breach
+            store = self.subsystems.results_store
+            index = self.subsystems.breach_index
+            return self._each(payload, 'email', 'emails',
+                              lambda email: check_email_breach(email, store, verbose=False, breach_index=index))
+
+        def check_password(password):
+            found, count = self.subsystems.checker.check_password_compromise(password, verbose=False)
+            if found is None:
+                raise RuntimeError(count)
+            return {'found': found, 'count': count}
+        return self._each(payload, 'password', 'passwords', check_password)
+
+    def hash(self, payload):
+        def identify(hash_input):
+            hash_types = self.subsystems.security_checker.identify_hash(hash_input, verbose=False)
+            if hash_types is None:
+                raise RuntimeError("hash-identifier is not available")
+            return {'hash_types': hash_types}
+        return self._each(payload, 'hash', 'hashes', identify)
+
+    def suggest(self, payload):
+        checker = self.subsystems.checker
+        breach_check = bool(payload.get('breach_check', False))
+        return self._each(payload, 'password', 'passwords', lambda password: {
+            'suggestion': checker.suggest_stronger(password, verbose=False, check_breaches=breach_check)})
+
+    def health(self):
+        return {'status': 'ok', 'uptime': round(time.time() - self.started, 1),
+                'requests_served': self.requests_served}
+
+    # HTTP handling
+
+    async def dispatch(self, method, path, body):
+        """Route a request; returns (status code, response object)."""
+        path = path.split('?', 1)[0]
+        if path == '/health':
+            return (200, self.health()) if method == 'GET' else (405, {'error': 'Use GET'})
+        handler = self.routes.get(path)
+        if handler is None:
+            return 404, {'error': f"Unknown endpoint {path}"}
+        if method != 'POST':
+            return 405, {'error': 'Use POST'}
+
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return 400, {'error': 'Body is not valid JSON'}
+        if not isinstance(payload, dict):
+            return 400, {'error': 'Body must be a JSON object'}
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, handler, payload)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+        self.requests_served += 1
+        return 200, result
+
+    async def _respond(self, writer, status, response, keep_alive):
+        body = json.dumps(response).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client closes it or asks to."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'Malformed request line'}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'Invalid Content-Length'}, False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, 413, {'error': f"Body exceeds {MAX_BODY_SIZE} bytes"}, False)
+                    break
+
+                body = await reader.readexactly(length) if length else b''
+                status, response = await self.dispatch(method, path, body)
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_path=None):
+        """Listen on a TCP port, or on a Unix socket if unix_path is given, until cancelled."""
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+            os.chmod(unix_path, 0o600)
+            show_status(f"Listening on unix:{unix_path}", "success")
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            show_status(f"Listening on http://{host}:{port}", "success")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve password, breach and hash checks over local HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port")
+    parser.add_argument("--unix", help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=4, help="Threads running checks")
+    parser.add_argument("--policy", help="YAML or JSON policy file")
+    parser.add_argument("--offline-breaches", action="store_true",
+                        help="Answer /breach email lookups from the local breach index instead of HackCheck")
+    parser.add_argument("--history", help="Previous passwords to load: one \"username<TAB>password\" per line "
+                                          "(more can be added with POST /history)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    service = CheckService(Subsystems(policy_path=args.policy, offline_breaches=args.offline_breaches),
+                           workers=args.workers)
+    start_time = time.time()
+    try:
+        service.warm_up()
+    except (FileNotFoundError, ValueError) as e:
+        show_status(str(e), "error")
+        service.close()
+        return
+    if args.history:
+        count = service.subsystems.checker.password_history.load(args.history)
+        show_status(f"Loaded {count:,} previous passwords", "info")
+    show_status(f"Indexes loaded in {time.time() - start_time:.2f}s", "info")
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    run_entry_point(main)
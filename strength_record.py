@@ -0,0 +1,310 @@
+import enum
+import json
+import struct
+import sys
+from array import array
+from collections import Counter
+
+MAGIC = b"AKRSLT\x00\x01"
+HEADER = struct.Struct("<8sI")        # magic, context bytes
+CHUNK_HEADER = struct.Struct("<II")   # record count, wordlist table bytes
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+class Issue(enum.IntFlag):
+    """Issue codes of a strength check; a record's issues are these OR-ed together."""
+    TOO_SHORT = 1 << 0
+    MISSING_CHARS = 1 << 1
+    COMMON_PATTERNS = 1 << 2
+    REPEATED_CHARS = 1 << 3
+    IN_WORDLIST = 1 << 4
+    NEAR_MATCH = 1 << 5
+    QUICK_CRACK = 1 << 6
+    BREACHED = 1 << 7
+    REUSED = 1 << 8
+    NEAR_REUSE = 1 << 9
+
+
+class Check(enum.IntFlag):
+    """Outcome flags of a strength check's stages."""
+    STRONG = 1 << 0
+    WORDLIST_SKIPPED = 1 << 1
+    WORDLIST_ERROR = 1 << 2
+    NEAR_MATCH_SKIPPED = 1 << 3
+    BREACH_CHECKED = 1 << 4
+    BREACH_SKIPPED = 1 << 5
+    BREACH_FAILED = 1 << 6
+
+
+# Short names of the issue codes, for summaries
+ISSUE_LABELS = {
+    Issue.TOO_SHORT: "Too short",
+    Issue.MISSING_CHARS: "Missing required character classes",
+    Issue.COMMON_PATTERNS: "Contains common patterns",
+    Issue.REPEATED_CHARS: "Repeated characters",
+    Issue.IN_WORDLIST: "Found in a wordlist",
+    Issue.NEAR_MATCH: "Close to a known password",
+    Issue.QUICK_CRACK: "Cracked quickly",
+    Issue.BREACHED: "Found in data breaches",
+    Issue.REUSED: "Used previously",
+    Issue.NEAR_REUSE: "Close to a previous password",
+}
+
+# Column of each record field: (name, array typecode)
+FIELDS = (
+    ('issues', 'H'),
+    ('checks', 'B'),
+    ('length', 'H'),
+    ('classes', 'H'),             # bit i: the i-th character class of the checker is present
+    ('max_run', 'H'),
+    ('max_char_count', 'H'),
+    ('guesses', 'd'),
+    ('score', 'f'),
+    ('wordlist', 'h'),            # index into the batch's wordlist names, -1 if not found
+    ('rank', 'Q'),                # 0 if unknown
+    ('near_distance', 'b'),       # -1 if no near match
+    ('near_rank', 'Q'),
+    ('breaches', 'Q'),
+    ('history_distance', 'b'),    # -1 if no previous password within the edit limit
+    ('history_similarity', 'f'),
+    ('failed_policies', 'I'),     # bit i: the i-th policy failed
+)
+
+# Largest value each integer column holds; larger counts are clamped
+_LIMITS = {'H': 0xFFFF, 'B': 0xFF, 'I': 0xFFFFFFFF, 'Q': 0xFFFFFFFFFFFFFFFF}
+
+# Bitmask columns: a clamped mask would be wrong, so values that do not fit are refused
+BITMASK_FIELDS = ('issues', 'checks', 'classes', 'failed_policies')
+
+# Context entries (see PasswordChecker.record_context) numbering the bits of a column
+CONTEXT_BITS = {'char_classes': 'classes', 'policies': 'failed_policies'}
+
+
+def check_context(context):
+    """Raise ValueError if a context has more character classes or policies than their masks hold."""
+    codes = dict(FIELDS)
+    for key, field in CONTEXT_BITS.items():
+        bits = array(codes[field]).itemsize * 8
+        if len(context.get(key, ())) > bits:
+            raise ValueError(f"{len(context[key])} {key.replace('_', ' ')} do not fit the {bits}-bit "
+                             f"'{field}' mask of a strength record")
+
+
+class StrengthRecord:
+    """
+    Compact result of one strength check: numbers and flags only, no password fragments.
+
+    Records keep the facts the policies are evaluated on, so verdicts and the
+    check_strength dict (PasswordChecker.result_dict) can be rebuilt for display.
+    """
+
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+    def __init__(self, issues=0, checks=0, length=0, classes=0, max_run=0, max_char_count=0, guesses=0.0,
+                 score=0.0, wordlist=None, rank=0, near_distance=-1, near_rank=0, breaches=0,
+                 history_distance=-1, history_similarity=0.0, failed_policies=0):
+        self.issues = issues
+        self.checks = checks
+        self.length = length
+        self.classes = classes
+        self.max_run = max_run
+        self.max_char_count = max_char_count
+        self.guesses = guesses
+        self.score = score
+        self.wordlist = wordlist
+        self.rank = rank
+        self.near_distance = near_distance
+        self.near_rank = near_rank
+        self.breaches = breaches
+        self.history_distance = history_distance
+        self.history_similarity = history_similarity
+        self.failed_policies = failed_policies
+
+    @property
+    def is_strong(self):
+        return bool(self.checks & Check.STRONG)
+
+    def to_dict(self):
+        """The record's fields as a JSON-serializable dict (StrengthRecord(**d) restores it)."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return isinstance(other, StrengthRecord) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"StrengthRecord({fields})"
+
+
+def issue_labels(issues):
+    """Labels of the issue codes set in an issues mask."""
+    return [label for issue, label in ISSUE_LABELS.items() if issues & issue]
+
+
+class ResultBatch:
+    """
+    StrengthRecords stored column-wise, one array per field (about 60 bytes a record).
+    Wordlist names are kept once per batch and referenced by index.
+    """
+
+    def __init__(self):
+        self.columns = {name: array(code) for name, code in FIELDS}
+        self.wordlists = []
+        self._wordlist_ids = {}
+
+    def __len__(self):
+        return len(self.columns['issues'])
+
+    def append(self, record):
+        for name in BITMASK_FIELDS:
+            value = getattr(record, name)
+            if value > _LIMITS[self.columns[name].typecode]:
+                raise ValueError(f"'{name}' mask {value:#x} does not fit its column")
+        for name, code in FIELDS:
+            value = getattr(record, name)
+            if name == 'wordlist':
+                value = self._wordlist_id(value)
+            elif code in _LIMITS and name not in BITMASK_FIELDS:
+                value = min(value, _LIMITS[code])
+            self.columns[name].append(value)
+
+    def _wordlist_id(self, name):
+        if name is None:
+            return -1
+        wordlist_id = self._wordlist_ids.get(name)
+        if wordlist_id is None:
+            wordlist_id = self._wordlist_ids[name] = len(self.wordlists)
+            self.wordlists.append(name)
+        return wordlist_id
+
+    def __getitem__(self, position):
+        values = {name: self.columns[name][position] for name, _ in FIELDS}
+        wordlist_id = values['wordlist']
+        values['wordlist'] = self.wordlists[wordlist_id] if wordlist_id >= 0 else None
+        # Single-precision columns: back to the precision check_strength reports
+        values['score'] = round(values['score'], 2)
+        values['history_similarity'] = round(values['history_similarity'], 3)
+        return StrengthRecord(**values)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def issue_counts(self):
+        """Number of records with each issue code."""
+        masks = Counter(self.columns['issues'])
+        return Counter({issue: sum(count for mask, count in masks.items() if mask & issue) for issue in Issue})
+
+    def clear(self):
+        for name, code in FIELDS:
+            self.columns[name] = array(code)
+        self.wordlists = []
+        self._wordlist_ids = {}
+
+    def write_to(self, f):
+        """Append this batch to an open results file as one chunk."""
+        wordlists = json.dumps(self.wordlists).encode('utf-8')
+        f.write(CHUNK_HEADER.pack(len(self), len(wordlists)))
+        f.write(wordlists)
+        for name, _ in FIELDS:
+            column = self.columns[name]
+            if sys.byteorder == 'big':
+                column = array(column.typecode, column)
+                column.byteswap()
+            f.write(column.tobytes())
+
+    @classmethod
+    def read_from(cls, f):
+        """Read the next chunk of a results file; None at the end."""
+        header = f.read(CHUNK_HEADER.size)
+        if not header:
+            return None
+        count, wordlists_size = CHUNK_HEADER.unpack(header)
+        batch = cls()
+        batch.wordlists = json.loads(f.read(wordlists_size))
+        batch._wordlist_ids = {name: i for i, name in enumerate(batch.wordlists)}
+        for name, code in FIELDS:
+            column = array(code)
+            column.frombytes(f.read(count * column.itemsize))
+            if sys.byteorder == 'big':
+                column.byteswap()
+            batch.columns[name] = column
+        return batch
+
+
+class ResultWriter:
+    """
+    Stream StrengthRecords to a results file in chunks of chunk_size records, so memory
+    stays bounded however many passwords are checked. context (a JSON-able dict, e.g.
+    PasswordChecker.record_context()) is stored in the header to interpret the bitmasks;
+    a context with more character classes or policies than the masks hold is refused.
+    """
+
+    def __init__(self, path, context=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        check_context(context or {})
+        self.path = path
+        self.chunk_size = chunk_size
+        self.count = 0
+        self._batch = ResultBatch()
+        self._file = open(path, 'wb')
+        context = json.dumps(context or {}).encode('utf-8')
+        self._file.write(HEADER.pack(MAGIC, len(context)))
+        self._file.write(context)
+
+    def write(self, record):
+        self._batch.append(record)
+        self.count += 1
+        if len(self._batch) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if len(self._batch):
+            self._batch.write_to(self._file)
+            self._batch.clear()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ResultReader:
+    """Read a results file chunk by chunk (batches()) or record by record."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        magic, context_size = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a results file")
+        self.context = json.loads(self._file.read(context_size))
+
+    def batches(self):
+        while True:
+            batch = ResultBatch.read_from(self._file)
+            if batch is None:
+                return
+            yield batch
+
+    def __iter__(self):
+        for batch in self.batches():
+            yield from batch
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
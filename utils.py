@@ -3,15 +3,29 @@ import time
 import threading
 from itertools import cycle
 
+def stdout_is_tty():
+    """Check whether stdout is an interactive terminal (progress output is skipped otherwise)."""
+    return hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()
+
+
 class ProgressIndicator:
     """A class to handle various types of progress indicators."""
     
     def __init__(self):
         self.is_running = False
         self.spinner_thread = None
+        self._stop_event = threading.Event()
+        self._last_bar_time = 0.0
     
-    def simple_progress_bar(self, current, total, bar_length=50, prefix="Progress"):
-        """Display a simple progress bar."""
+    def simple_progress_bar(self, current, total, bar_length=50, prefix="Progress", min_interval=0.1):
+        """Display a simple progress bar, redrawn at most every min_interval seconds."""
+        if not stdout_is_tty():
+            return
+        now = time.time()
+        if current != total and now - self._last_bar_time < min_interval:
+            return
+        self._last_bar_time = now
+
         percent = float(current) * 100 / total
         arrow = '█' * int(percent/100 * bar_length - 1) + '>'
         spaces = ' ' * (bar_length - len(arrow))
@@ -30,22 +44,31 @@ class ProgressIndicator:
         self.spinner_chars = cycle(spinner_chars)
         self.message = message
         self.is_running = True
-        self.spinner_thread = threading.Thread(target=self._spin)
+        if not stdout_is_tty():
+            return
+        self._stop_event.clear()
+        self.spinner_thread = threading.Thread(target=self._spin, daemon=True)
         self.spinner_thread.start()
     
     def _spin(self):
         """Internal method to run the spinner."""
-        while self.is_running:
+        while not self._stop_event.is_set():
             sys.stdout.write(f'\r{self.message} {next(self.spinner_chars)}')
             sys.stdout.flush()
-            time.sleep(0.1)
+            self._stop_event.wait(0.1)
     
     def stop_spinner(self, final_message=None):
-        """Stop the spinner animation."""
+        """Stop the spinner animation (returns at once rather than after the next frame)."""
         if self.is_running:
             self.is_running = False
-            if self.spinner_thread:
-                self.spinner_thread.join()
+            self._stop_event.set()
+            if self.spinner_thread is None:
+                # Not a terminal: nothing was drawn
+                if final_message:
+                    print(final_message)
+                return
+            self.spinner_thread.join()
+            self.spinner_thread = None
             if final_message:
                 sys.stdout.write(f'\r{final_message}\n')
             else:
@@ -86,6 +109,87 @@ class ProgressIndicator:
         else:
             return f"{remaining/3600:.1f}h remaining"
 
+class BackgroundProgress:
+    """
+    Progress line drawn by a background thread from a shared counter.
+
+    Hot loops only assign or add to `current` (and optionally `label`), with no I/O or
+    locking, and there is a single writer. The thread wakes every `interval` seconds and
+    redraws only when the line changed. When stdout is not a TTY no thread is started
+    and nothing is drawn.
+    """
+
+    def __init__(self, total=None, prefix="Progress", unit="items", unit_size=1, interval=0.25,
+                 enabled=None, bar_length=30):
+        self.total = total
+        self.prefix = prefix
+        self.unit = unit
+        self.unit_size = unit_size
+        self.interval = interval
+        self.enabled = stdout_is_tty() if enabled is None else enabled
+        self.bar_length = bar_length
+        self.current = 0
+        self.label = ''
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start_time = time.time()
+        self._last_line = ''
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        self._start_time = time.time()
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def add(self, count=1):
+        self.current += count
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._draw()
+
+    def format_line(self):
+        """The progress line for the current counter value."""
+        elapsed = max(time.time() - self._start_time, 1e-9)
+        current = self.current
+        rate = current / elapsed / self.unit_size
+        label = f" {self.label}" if self.label else ''
+        if not self.total:
+            return f"{self.prefix}: {current / self.unit_size:,.0f} {self.unit} ({rate:,.0f}/s){label}"
+        fraction = min(current / self.total, 1.0)
+        filled = int(fraction * self.bar_length)
+        bar = '█' * filled + ' ' * (self.bar_length - filled)
+        remaining = (self.total - current) / self.unit_size / rate if rate else 0
+        return (f"{self.prefix}: [{bar}] {fraction * 100:.1f}% ({rate:,.0f} {self.unit}/s, "
+                f"{format_time(max(remaining, 0))} left){label}")
+
+    def _draw(self):
+        line = self.format_line()
+        if line != self._last_line:
+            padding = ' ' * max(len(self._last_line) - len(line), 0)
+            sys.stdout.write(f'\r{line}{padding}')
+            sys.stdout.flush()
+            self._last_line = line
+
+    def stop(self, final_message=None):
+        """Stop the render thread, drawing the final state once."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+            self._draw()
+            sys.stdout.write('\n')
+            sys.stdout.flush()
+        if final_message:
+            print(final_message)
+
 def print_banner():
     """Print a welcome banner."""
     
@@ -107,6 +211,7 @@ def print_banner():
     ║ 3. Get Password Suggestions           ║
     ║ 4. Identify Hash Type                 ║
     ║ 5. Hydra Brute Force Attacks          ║
+    ║ 6. View Stored Results                ║
     ║ Q. Quit                               ║
     ╚═══════════════════════════════════════╝
     
@@ -121,7 +226,8 @@ def get_user_input():
     print("3. Suggest stronger password")
     print("4. Identify hash type")
     print("5. Hydra brute force attacks")
-    choice = input("Enter your choice (1/2/3/4/5/Q): ")
+    print("6. View stored results")
+    choice = input("Enter your choice (1/2/3/4/5/6/Q): ")
     return choice
 
 def show_status(message, status_type="info"):
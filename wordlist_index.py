@@ -0,0 +1,369 @@
+import argparse
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from profiling import add_profile_arguments, run_entry_point
+from rank_dictionary import RankTable, lookup_rank, write_rank_table_items, write_wordlist_rank_table
+from wordlist_io import is_wordlist_file, resolve_wordlist
+
+DEFAULT_INDEX_DIR = os.path.join(str(Path.home()), ".ak_vault", "wordlist_index")
+
+# Segments of one level merged into a single segment of the next level
+COMPACTION_FANOUT = 4
+
+# Source lists named in the name of a compacted segment
+NAMED_SOURCES = 3
+
+
+def merged_name(sources):
+    """Name of a segment covering the given source lists, as shown in "found in ..." messages."""
+    if len(sources) == 1:
+        return sources[0]
+    named = ', '.join(sources[:NAMED_SOURCES])
+    more = len(sources) - NAMED_SOURCES
+    if more > 0:
+        return f"one of {named} and {more} more wordlist{'s' if more > 1 else ''}"
+    return f"one of {named}"
+
+
+def merge_items(segments):
+    """Yield the (word, rank) pairs of sorted segments in word order, each word once with its best rank."""
+    last = None
+    for word, rank in heapq.merge(*(segment.items() for segment in segments)):
+        if word != last:  # merge yields equal words lowest rank first
+            yield word, rank
+            last = word
+
+
+class WordlistIndex:
+    """
+    Incremental (LSM-style) index over a growing set of wordlists.
+
+    Every ingested list, or the part appended to a list since the last ingest, becomes a
+    small sorted rank table segment at level 0. Lookups query all segments. Once a
+    level holds COMPACTION_FANOUT segments they are merged into one segment of the
+    next level, in a background thread if requested, so the segment count stays
+    logarithmic in the corpus size and nothing is ever rebuilt from scratch.
+
+    Readers take the current segment list, which is replaced (never modified) when
+    segments are added or compacted. A lookup that overlaps a compaction sees either
+    the old segments or the merged one, and both hold the same words. Readers hold the
+    segments they query (see reading()); a retired segment is closed and its file removed
+    once no reader holds it any more.
+
+    A compacted segment keeps the best (lowest) rank of each word. It does not record
+    which list each word came from, so it is named after all the lists it covers
+    ("one of a.txt, b.txt"). A list's last line without a newline is ingested, and read
+    again once the list grows, as an append may continue it.
+    """
+
+    def __init__(self, index_dir=DEFAULT_INDEX_DIR, background_compaction=True):
+        self.index_dir = index_dir
+        self.background_compaction = background_compaction
+        self.manifest_path = os.path.join(index_dir, "manifest.json")
+        os.makedirs(index_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._compacting = threading.Lock()
+        self._compactor = None
+        self._holds = {}     # Segment -> readers currently holding it
+        self._retired = {}   # Segment dropped by a compaction -> its file, closed once unheld
+        self.stats = {'ingested_words': 0, 'ingest_seconds': 0.0, 'compactions': 0,
+                      'compaction_seconds': 0.0}
+
+        manifest = {'next_id': 1, 'segments': [], 'sources': {}}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        self._next_id = manifest['next_id']
+        self._sources = manifest['sources']
+        self._segment_info = manifest['segments']
+        self._segments = [self._open_segment(info) for info in self._segment_info]
+
+    def _open_segment(self, info):
+        return RankTable(os.path.join(self.index_dir, info['file']), name=info['name'])
+
+    def _save_manifest(self):
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'next_id': self._next_id, 'segments': self._segment_info,
+                       'sources': self._sources}, f, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def _new_segment_file(self):
+        name = f"seg-{self._next_id:06d}.rank"
+        self._next_id += 1
+        return name
+
+    def segments(self):
+        """
+        Current segments as RankTables (a snapshot). Query them inside reading(): a
+        compaction may close segments that no reader holds.
+        """
+        return self._segments
+
+    @contextmanager
+    def reading(self):
+        """Hold the current segments open for querying; yields them as rank tables."""
+        with self._lock:
+            segments = self._segments
+            for segment in segments:
+                self._holds[segment] = self._holds.get(segment, 0) + 1
+        try:
+            yield segments
+        finally:
+            with self._lock:
+                for segment in segments:
+                    self._holds[segment] -= 1
+                    if not self._holds[segment]:
+                        del self._holds[segment]
+                released = self._take_unheld_retired()
+            self._close_retired(released)
+
+    def _take_unheld_retired(self):
+        """Remove and return the retired segments no reader holds (call with the lock held)."""
+        released = [(segment, path) for segment, path in self._retired.items() if segment not in self._holds]
+        for segment, _ in released:
+            del self._retired[segment]
+        return released
+
+    def _close_retired(self, released):
+        for segment, path in released:
+            segment.close()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        """Close every segment; the index must not be used afterwards."""
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            segments, self._segments = self._segments, []
+            released = list(self._retired.items())
+            self._retired = {}
+        for segment in segments:
+            segment.close()
+        self._close_retired(released)
+
+    def covers(self, wordlist_path):
+        """Check that a wordlist is fully ingested (nothing appended or changed since)."""
+        source = self._sources.get(os.path.abspath(wordlist_path))
+        return (source is not None and os.path.exists(wordlist_path)
+                and source.get('size', source['offset']) == os.path.getsize(wordlist_path))
+
+    def ingest(self, wordlist_path):
+        """
+        Ingest a new wordlist, or the part appended to a known one, as a level-0 segment.
+        A list that was rewritten rather than appended to is ingested again from the start.
+        Compressed lists are tracked by their size on disk and read from a decompressed
+        offset; appended gzip/bzip2/xz members are picked up the same way.
+        Returns the number of distinct words added (0 if nothing changed).
+        """
+        path = os.path.abspath(wordlist_path)
+        size = os.path.getsize(path)
+        source = self._sources.get(path, {'offset': 0, 'rank': 0, 'size': 0})
+        known_size = source.get('size', source['offset'])  # manifests written before 'size'
+        if known_size == size:
+            return 0
+        if known_size > size:
+            source = {'offset': 0, 'rank': 0, 'size': 0}
+
+        start_time = time.time()
+        with self._lock:
+            segment_file = self._new_segment_file()
+        words, offset, rank = write_wordlist_rank_table(path, os.path.join(self.index_dir, segment_file),
+                                                        source['offset'], source['rank'])
+
+        info = {'file': segment_file, 'level': 0, 'words': words,
+                'name': Path(path).name, 'sources': [Path(path).name]}
+        segment = self._open_segment(info)
+        with self._lock:
+            self._segment_info = self._segment_info + [info]
+            self._segments = self._segments + [segment]
+            self._sources[path] = {'offset': offset, 'rank': rank, 'size': size}
+            self._save_manifest()
+
+        self.stats['ingested_words'] += rank - source['rank']
+        self.stats['ingest_seconds'] += time.time() - start_time
+        self.maybe_compact()
+        return words
+
+    def sync(self, wordlist_paths):
+        """
+        Ingest every new or grown wordlist (files, or directories of .txt/.lst files,
+        plain or compressed). A missing path is replaced by its compressed variant if any.
+        """
+        added = 0
+        for wordlist_path in wordlist_paths:
+            path = Path(wordlist_path)
+            if path.is_dir():
+                files = sorted(p for p in path.iterdir() if p.is_file() and is_wordlist_file(p))
+            elif resolve_wordlist(path):
+                files = [resolve_wordlist(path)]
+            else:
+                continue
+            for file in files:
+                added += self.ingest(str(file))
+        return added
+
+    def lookup(self, word):
+        """Return (best rank, segment name) of a word across all segments, or (None, None)."""
+        with self.reading() as segments:
+            return lookup_rank(segments, word)
+
+    def _compaction_candidates(self):
+        """The oldest COMPACTION_FANOUT segments of the lowest level that has that many."""
+        levels = {}
+        for position, info in enumerate(self._segment_info):
+            levels.setdefault(info['level'], []).append(position)
+        for level in sorted(levels):
+            if len(levels[level]) >= COMPACTION_FANOUT:
+                return level, levels[level][:COMPACTION_FANOUT]
+        return None, []
+
+    def compact(self):
+        """Merge segments level by level until no level is full. Returns the number of merges."""
+        merges = 0
+        with self._compacting:
+            while True:
+                with self._lock:
+                    level, positions = self._compaction_candidates()
+                    if not positions:
+                        return merges
+                    merged_info = [self._segment_info[p] for p in positions]
+                    merged_segments = [self._segments[p] for p in positions]
+                    segment_file = self._new_segment_file()
+
+                # The slow part runs without the lock: lookups and ingests carry on.
+                # The merge is streamed to disk, never collected in memory.
+                start_time = time.time()
+                words = write_rank_table_items(os.path.join(self.index_dir, segment_file),
+                                               merge_items(merged_segments))
+                sources = sorted({name for info in merged_info for name in info['sources']})
+                info = {'file': segment_file, 'level': level + 1, 'words': words,
+                        'name': merged_name(sources), 'sources': sources}
+                segment = self._open_segment(info)
+
+                with self._lock:
+                    # Ingests only append, so the merged segments are still where they were
+                    first = positions[0]
+                    keep = [p for p in range(len(self._segment_info)) if p not in positions]
+                    self._segment_info = ([self._segment_info[p] for p in keep if p < first] + [info]
+                                          + [self._segment_info[p] for p in keep if p > first])
+                    self._segments = ([self._segments[p] for p in keep if p < first] + [segment]
+                                      + [self._segments[p] for p in keep if p > first])
+                    self._save_manifest()
+                    for old, old_info in zip(merged_segments, merged_info):
+                        self._retired[old] = os.path.join(self.index_dir, old_info['file'])
+                    released = self._take_unheld_retired()
+
+                self._close_retired(released)
+                merges += 1
+                self.stats['compactions'] += 1
+                self.stats['compaction_seconds'] += time.time() - start_time
+
+    def maybe_compact(self):
+        """Start a compaction if a level is full, in the background unless disabled."""
+        with self._lock:
+            if not self._compaction_candidates()[1]:
+                return
+        if not self.background_compaction:
+            self.compact()
+        elif self._compactor is None or not self._compactor.is_alive():
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
+
+    def wait_for_compaction(self):
+        """Block until a running background compaction finishes."""
+        if self._compactor is not None:
+            self._compactor.join()
+        self.compact()
+
+
+def benchmark_lookups(index, words, rounds=3):
+    """Measure lookups per second over a list of words."""
+    best = None
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        for word in words:
+            index.lookup(word)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return len(words) / best if best else 0.0
+
+
+def print_index_stats(index):
+    segments = index.segments()
+    print(f"Segments: {len(segments)} ({sum(s.count for s in segments):,} words, duplicates across levels included)")
+    for info in index._segment_info:
+        print(f"  • level {info['level']}: {info['file']} {info['words']:,} words ({', '.join(info['sources'])})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally index wordlists (LSM-style segments).")
+    parser.add_argument("command", choices=["sync", "ingest", "compact", "stats", "bench"])
+    parser.add_argument("paths", nargs="*",
+                        help="Wordlists or directories (default for sync: the password checker's wordlists)")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR, help="Where segments are stored")
+    parser.add_argument("--lookups", type=int, default=100000, help="Lookups for bench")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    index = WordlistIndex(args.index_dir)
+
+    if args.command in ("sync", "ingest"):
+        paths = args.paths
+        if not paths:
+            from password_checker import PasswordChecker
+            paths = PasswordChecker().wordlist_paths
+        start_time = time.time()
+        added = index.sync(paths)
+        elapsed = time.time() - start_time
+        words = index.stats['ingested_words']
+        if not words:
+            print("• Index is up to date")
+        else:
+            print(f"✅ Ingested {words:,} words ({added:,} new segment entries) in {elapsed:.2f}s"
+                  f" ({words / elapsed if elapsed else 0:,.0f} words/s)")
+        if index._compactor is not None:
+            print("• Compacting in the background...")
+        index.wait_for_compaction()
+        if index.stats['compactions']:
+            print(f"✅ {index.stats['compactions']} compaction(s) in {index.stats['compaction_seconds']:.2f}s")
+        print_index_stats(index)
+
+    elif args.command == "compact":
+        merges = index.compact()
+        print(f"✅ {merges} compaction(s) in {index.stats['compaction_seconds']:.2f}s")
+        print_index_stats(index)
+
+    elif args.command == "stats":
+        print_index_stats(index)
+
+    elif args.command == "bench":
+        with index.reading() as segments:
+            if not segments:
+                print("❌ Index is empty, run sync first")
+                return
+            rng = random.Random(0)
+            words = []
+            for _ in range(args.lookups):
+                segment = rng.choice(segments)
+                if segment.count and rng.random() < 0.5:
+                    words.append(segment._word(rng.randrange(segment.count)).decode('latin-1'))
+                else:
+                    words.append(f"missing-{rng.randrange(10 ** 9)}")
+        rate = benchmark_lookups(index, words)
+        print(f"✅ {rate:,.0f} lookups/s over {len(segments)} segment(s)")
+
+
+if __name__ == "__main__":
+    run_entry_point(main)
@@ -0,0 +1,199 @@
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import time
+from pathlib import Path
+
+from profiling import add_profile_arguments, run_entry_point
+
+# Decompressed bytes pulled per read; large reads keep per-call overhead out of the line loop
+READ_BUFFER_SIZE = 1024 * 1024
+
+DECOMPRESSORS = {
+    '.gz': lambda f: gzip.GzipFile(fileobj=f, mode='rb'),
+    '.bz2': lambda f: bz2.BZ2File(f, mode='rb'),
+    '.xz': lambda f: lzma.LZMAFile(f, mode='rb'),
+}
+COMPRESSED_SUFFIXES = tuple(DECOMPRESSORS)
+
+# Assumed expansion of bzip2/xz wordlists, whose headers do not record the plain size
+ESTIMATED_COMPRESSION_RATIO = 4
+
+
+def is_compressed(path):
+    """Check whether a wordlist is gzip, bzip2 or xz compressed (by suffix)."""
+    return Path(path).suffix.lower() in DECOMPRESSORS
+
+
+def estimated_plain_size(path):
+    """
+    Size of a wordlist once decompressed: the file size for plain lists, the size in
+    the gzip trailer (modulo 4 GB, so never less than the file) for .gz, and
+    ESTIMATED_COMPRESSION_RATIO times the file size for .bz2 and .xz.
+    """
+    size = os.path.getsize(path)
+    suffix = Path(path).suffix.lower()
+    if suffix == '.gz' and size >= 4:
+        with open(path, 'rb') as f:
+            f.seek(-4, os.SEEK_END)
+            trailer = int.from_bytes(f.read(4), 'little')
+        while trailer < size:
+            trailer += 1 << 32
+        return trailer
+    if suffix in DECOMPRESSORS:
+        return size * ESTIMATED_COMPRESSION_RATIO
+    return size
+
+
+def is_wordlist_file(path):
+    """Check whether a directory entry looks like a wordlist: .txt or .lst, optionally compressed."""
+    path = Path(path)
+    if is_compressed(path):
+        path = path.with_suffix('')
+    return path.suffix.lower() in ('.txt', '.lst')
+
+
+def resolve_wordlist(path):
+    """
+    Return the file to read for a wordlist path: the path itself if it exists, otherwise
+    the first of path.gz, path.bz2 or path.xz that does (Kali ships rockyou.txt.gz).
+    Returns None if there is none.
+    """
+    if os.path.isfile(path):
+        return str(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if os.path.isfile(f"{path}{suffix}"):
+            return f"{path}{suffix}"
+    return None
+
+
+def available_wordlists(paths):
+    """Resolve wordlist paths (see resolve_wordlist), dropping missing ones and duplicates."""
+    resolved = (resolve_wordlist(path) for path in paths)
+    return list(dict.fromkeys(path for path in resolved if path))
+
+
+class WordlistStream:
+    """
+    Plain or compressed wordlist opened for streaming reads.
+
+    Compressed lists are decompressed on the fly, never to disk. The file is read in
+    READ_BUFFER_SIZE blocks that are split into lines in one go. Per-line readline
+    calls on a decompressing stream cost more than the decompression itself.
+    Lines come without their newline: bytes if binary, else str decoded as latin-1
+    like every other wordlist reader here. position is the number of bytes consumed
+    from the file on disk, so progress can be measured against its size either way.
+    partial_length is the length of the last line read if it had no newline (else 0).
+    """
+
+    def __init__(self, path, binary=False, buffer_size=READ_BUFFER_SIZE):
+        self.path = str(path)
+        self.binary = binary
+        self.compressed = is_compressed(path)
+        self.buffer_size = buffer_size
+        self.partial_length = 0
+        self._file = open(path, 'rb', buffering=buffer_size)
+        self._stream = self._file
+        if self.compressed:
+            self._stream = DECOMPRESSORS[Path(path).suffix.lower()](self._file)
+
+    @property
+    def position(self):
+        return self._file.tell()
+
+    def seek(self, offset):
+        """Seek to a decompressed byte offset (emulated by reading forward if compressed)."""
+        self._stream.seek(offset)
+
+    def tell(self):
+        """Decompressed byte offset of the data read so far."""
+        return self._stream.tell()
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def blocks(self):
+        """Yield the lines of the file in lists, one list per block read."""
+        tail = b''
+        while True:
+            block = self._stream.read(self.buffer_size)
+            if not block:
+                break
+            data = tail + block
+            cut = data.rfind(b'\n') + 1
+            if not cut:
+                tail = data
+                continue
+            tail = data[cut:]
+            lines = (data[:cut] if self.binary else data[:cut].decode('latin-1')).split(
+                b'\n' if self.binary else '\n')
+            lines.pop()  # empty: the block ends with a newline
+            yield lines
+        self.partial_length = len(tail)
+        if tail:
+            yield [tail if self.binary else tail.decode('latin-1')]
+
+    def __iter__(self):
+        for lines in self.blocks():
+            yield from lines
+
+    def close(self):
+        self._stream.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def decompress_wordlist(path, output_path):
+    """Write the decompressed contents of a wordlist to output_path."""
+    with WordlistStream(path, binary=True) as source, open(output_path, 'wb') as out:
+        while True:
+            block = source.read(READ_BUFFER_SIZE)
+            if not block:
+                break
+            out.write(block)
+    return output_path
+
+
+def benchmark_read(path, rounds=3):
+    """Best-of-rounds time to stream every line of a wordlist. Returns (seconds, lines, bytes)."""
+    best = None
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        lines = size = 0
+        with WordlistStream(path) as f:
+            for line in f:
+                lines += 1
+                size += len(line)
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best, lines, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming reads of plain and compressed wordlists.")
+    parser.add_argument("wordlists", nargs="+", help="Wordlists (.txt, .gz, .bz2, .xz) to read")
+    parser.add_argument("--rounds", type=int, default=3, help="Reads per wordlist (best is reported)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    for path in args.wordlists:
+        resolved = resolve_wordlist(path)
+        if not resolved:
+            print(f"⚠️  Skipping missing wordlist: {path}")
+            continue
+        seconds, lines, size = benchmark_read(resolved, args.rounds)
+        on_disk = os.path.getsize(resolved) / (1024 * 1024)
+        print(f"• {Path(resolved).name}: {lines:,} lines, {on_disk:.1f} MB on disk, {seconds:.2f}s "
+              f"({size / (1024 * 1024) / seconds if seconds else 0:,.0f} MB/s decoded, "
+              f"{lines / seconds if seconds else 0:,.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    run_entry_point(main)
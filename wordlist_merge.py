@@ -0,0 +1,196 @@
+import argparse
+import heapq
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+
+from profiling import add_profile_arguments, run_entry_point
+from wordlist_io import WordlistStream, available_wordlists, is_wordlist_file, resolve_wordlist
+
+DEFAULT_MEMORY_MB = 256
+
+# Runs merged at once; more runs are merged in several passes
+MAX_FAN_IN = 64
+
+# Bytes a buffered line costs in memory: bytes object header plus its list slot
+LINE_OVERHEAD = sys.getsizeof(b'') + 8
+
+
+def normalize_word(raw, lowercase=False):
+    """
+    Normalize one wordlist line to the bytes the password checker would match.
+
+    The checker reads wordlists as latin-1, byte for byte. UTF-8 lines are
+    NFC-normalized and stored as latin-1 when every character fits, so 'café' in a UTF-8
+    list and in a latin-1 list becomes the same entry. Other lines are kept as they are.
+    Returns None for blank lines.
+    """
+    try:
+        text = unicodedata.normalize('NFC', raw.decode('utf-8'))
+    except UnicodeDecodeError:
+        text = raw.decode('latin-1')
+    text = text.strip()
+    if lowercase:
+        text = text.lower()
+    try:
+        return text.encode('latin-1') or None
+    except UnicodeEncodeError:
+        return text.encode('utf-8')
+
+
+class ExternalMerger:
+    """
+    Merge wordlists into one sorted, deduplicated corpus within a memory budget.
+
+    Lines are buffered until the budget is half used, then sorted, deduplicated and spilled
+    to a run file. The runs are k-way merged with a heap (MAX_FAN_IN at a time, in
+    several passes if needed), each through a read buffer sized from the budget.
+    """
+
+    def __init__(self, memory_mb=DEFAULT_MEMORY_MB, temp_dir=None, lowercase=False, max_length=None):
+        self.memory_limit = memory_mb * 1024 * 1024
+        self.temp_dir = temp_dir
+        self.lowercase = lowercase
+        self.max_length = max_length
+        self.stats = {'input_lines': 0, 'kept_lines': 0, 'runs': 0, 'merge_passes': 0,
+                      'unique_words': 0, 'peak_buffer_bytes': 0, 'seconds': 0.0}
+
+    def _spill(self, buffer, run_dir):
+        """Sort and deduplicate the buffer into a new run file."""
+        buffer.sort()
+        run_path = os.path.join(run_dir, f"run-{self.stats['runs']:06d}")
+        with open(run_path, 'wb') as f:
+            previous = None
+            for line in buffer:
+                if line != previous:
+                    f.write(line)
+                    previous = line
+        self.stats['runs'] += 1
+        return run_path
+
+    def _make_runs(self, wordlist_paths, run_dir):
+        runs = []
+        buffer = []
+        buffered = 0
+        budget = self.memory_limit // 2  # the other half is left to sorting and I/O buffers
+        for wordlist_path in wordlist_paths:
+            with WordlistStream(wordlist_path, binary=True) as f:
+                for line in f:
+                    self.stats['input_lines'] += 1
+                    word = normalize_word(line, self.lowercase)
+                    if word is None or (self.max_length and len(word) > self.max_length):
+                        continue
+                    self.stats['kept_lines'] += 1
+                    # Kept with its newline so runs sort exactly like the lines merged later
+                    buffer.append(word + b'\n')
+                    buffered += len(word) + 1 + LINE_OVERHEAD
+                    if buffered >= budget:
+                        self.stats['peak_buffer_bytes'] = max(self.stats['peak_buffer_bytes'], buffered)
+                        runs.append(self._spill(buffer, run_dir))
+                        buffer = []
+                        buffered = 0
+        self.stats['peak_buffer_bytes'] = max(self.stats['peak_buffer_bytes'], buffered)
+        if buffer or not runs:
+            runs.append(self._spill(buffer, run_dir))
+        return runs
+
+    def _merge(self, run_paths, output_path):
+        """Heap-merge sorted run files into output_path, dropping duplicates. Returns words written."""
+        buffer_size = max(64 * 1024, self.memory_limit // (4 * (len(run_paths) + 1)))
+        files = [open(path, 'rb', buffering=buffer_size) for path in run_paths]
+        written = 0
+        try:
+            with open(output_path, 'wb', buffering=buffer_size) as out:
+                previous = None
+                for line in heapq.merge(*files):
+                    if line != previous:
+                        out.write(line)
+                        previous = line
+                        written += 1
+        finally:
+            for f in files:
+                f.close()
+        return written
+
+    def merge(self, wordlist_paths, output_path):
+        """Merge the wordlists into output_path. Returns the stats dict."""
+        start_time = time.time()
+        run_dir = tempfile.mkdtemp(prefix="ak_merge_", dir=self.temp_dir)
+        try:
+            runs = self._make_runs(wordlist_paths, run_dir)
+            while len(runs) > MAX_FAN_IN:
+                self.stats['merge_passes'] += 1
+                merged = []
+                for i in range(0, len(runs), MAX_FAN_IN):
+                    batch = runs[i:i + MAX_FAN_IN]
+                    merged_path = os.path.join(run_dir, f"pass{self.stats['merge_passes']}-{i // MAX_FAN_IN:06d}")
+                    self._merge(batch, merged_path)
+                    for path in batch:
+                        os.remove(path)
+                    merged.append(merged_path)
+                runs = merged
+            self.stats['merge_passes'] += 1
+            temp_output = output_path + ".tmp"
+            self.stats['unique_words'] = self._merge(runs, temp_output)
+            os.replace(temp_output, output_path)
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+        self.stats['seconds'] = time.time() - start_time
+        return self.stats
+
+
+def default_wordlists():
+    """The wordlists known to the password checker and the Hydra integration that exist here."""
+    from password_checker import PasswordChecker
+    from hydra_integration import HydraIntegration
+    return available_wordlists(PasswordChecker().wordlist_paths + HydraIntegration().get_available_wordlists())
+
+
+def expand_paths(paths):
+    """Expand directories into the .txt/.lst files (plain or compressed) they contain."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(str(p) for p in path.iterdir() if p.is_file() and is_wordlist_file(p)))
+        elif resolve_wordlist(path):
+            files.append(resolve_wordlist(path))
+        else:
+            print(f"⚠️  Skipping missing wordlist: {path}")
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge wordlists into one sorted, deduplicated corpus.")
+    parser.add_argument("wordlists", nargs="*",
+                        help="Wordlists or directories (default: the checker's and Hydra's wordlists)")
+    parser.add_argument("-o", "--output", required=True, help="Merged corpus to write")
+    parser.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB,
+                        help="Memory budget for buffered lines and merge buffers")
+    parser.add_argument("--temp-dir", help="Where sorted runs are spilled (default: system temp)")
+    parser.add_argument("--lowercase", action="store_true",
+                        help="Fold case, as the checker compares words lowercased")
+    parser.add_argument("--max-length", type=int, help="Drop words longer than this many bytes")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    wordlists = expand_paths(args.wordlists) if args.wordlists else default_wordlists()
+    if not wordlists:
+        print("❌ No wordlists found!")
+        return
+
+    print(f"Merging {len(wordlists)} wordlist(s) with a {args.memory_mb} MB budget...")
+    merger = ExternalMerger(args.memory_mb, args.temp_dir, args.lowercase, args.max_length)
+    stats = merger.merge(wordlists, args.output)
+    rate = stats['input_lines'] / stats['seconds'] if stats['seconds'] else 0
+    print(f"✅ {stats['unique_words']:,} unique words from {stats['input_lines']:,} lines "
+          f"in {stats['seconds']:.1f}s ({rate:,.0f} lines/s) -> {args.output}")
+    print(f"• {stats['runs']} sorted run(s), {stats['merge_passes']} merge pass(es), "
+          f"peak buffer {stats['peak_buffer_bytes'] / (1024 * 1024):.1f} MB")
+
+
+if __name__ == "__main__":
+    run_entry_point(main)